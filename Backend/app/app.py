@@ -21,14 +21,20 @@ def create_app():
     # Configuración para Supabase
     app.secret_key = os.environ.get('SECRET_KEY', 'tu-clave-secreta-temporal')
     
+    # Sesiones en el servidor (SQLite local o tabla server_sessions); la cookie solo lleva el id
+    from utils.session_store import init_session_store
+    init_session_store(app)
+
     # Inicializar SQLAlchemy siempre para evitar errores de contexto
     from utils.db import db
     
     # Configurar base de datos según el modo
     if os.environ.get('USE_DATABASE', 'false').lower() == 'true':
-        from config import DATABASE_CONNECTION_URI
+        from config import DATABASE_CONNECTION_URI, DATABASE_REPLICA_URI
         app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_CONNECTION_URI
         app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+        if DATABASE_REPLICA_URI:
+            app.config['SQLALCHEMY_BINDS'] = {'replica': DATABASE_REPLICA_URI}
     else:
         # Configuración para SQLite en memoria para evitar errores cuando no se usa MySQL
         app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
@@ -36,6 +42,28 @@ def create_app():
     
     db.init_app(app)
 
+    # Filtro global de borrado lógico (is_deleted=False) en las consultas ORM
+    from utils.soft_delete import init_soft_delete
+    init_soft_delete(app)
+
+    # Lecturas en la réplica: tras escribir, el cliente vuelve al primario unos segundos
+    from utils.replica import init_replica
+    init_replica(app)
+
+    # Serialización JSON rápida y compresión de respuestas
+    from utils.json_provider import init_json_provider
+    from utils.compression import init_compression
+    init_json_provider(app)
+    init_compression(app)
+
+    # Métricas por petición (consultas, tiempo de BD, serialización)
+    from utils.instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    # Detector de consultas N+1 (avisa en debug/testing, N_PLUS_ONE_GUARD=raise para fallar)
+    from utils.query_guard import init_query_guard
+    init_query_guard(app)
+
     # Configurar Socket.IO primero antes de CORS
     socketio.init_app(app, 
                      cors_allowed_origins=["http://localhost:3000", "http://localhost:3001"],
@@ -48,6 +76,14 @@ def create_app():
                      ping_timeout=60,
                      ping_interval=25)
 
+    # Endpoint /metrics para Prometheus (HTTP, pool de BD, Socket.IO)
+    from utils.metrics import init_metrics
+    init_metrics(app, socketio)
+
+    # Autenticación sin estado con bearer tokens de Supabase (verificados localmente)
+    from utils.token_auth import init_token_auth
+    init_token_auth(app)
+
     # Configurar CORS después de Socket.IO para evitar conflictos
     CORS(app, 
          origins=["http://localhost:3000", "http://localhost:3001"], 
@@ -62,6 +98,14 @@ def create_app():
     app.register_blueprint(attention)
     app.register_blueprint(chat)  # Registrar el nuevo blueprint
 
+    # Comandos de benchmark: flask bench seed / flask bench run
+    from utils.benchmark import bench_cli
+    app.cli.add_command(bench_cli)
+
+    # Esquema de la base de datos: flask db create
+    from utils.db_cli import db_cli
+    app.cli.add_command(db_cli)
+
     return app
 
 # Agregar esta función para ejecutar la aplicación con SocketIO
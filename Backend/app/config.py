@@ -21,13 +21,18 @@ host = os.getenv("MYSQL_HOST")
 port = os.getenv("MYSQL_PORT")
 database = os.getenv("MYSQL_DATABASE")
 
-DATABASE_CONNECTION_URI = f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{database}"
+# DATABASE_URL permite apuntar a otra base (p. ej. sqlite:///bench.db para benchmarks)
+DATABASE_CONNECTION_URI = os.getenv("DATABASE_URL") or f"mysql+mysqlconnector://{user}:{password}@{host}:{port}/{database}"
 
-# Supabase Configuration
+# Réplica de lectura opcional (reportes, búsquedas, exportaciones): DATABASE_REPLICA_URL o MYSQL_REPLICA_HOST
+replica_host = os.getenv("MYSQL_REPLICA_HOST")
+DATABASE_REPLICA_URI = os.getenv("DATABASE_REPLICA_URL") or (
+    f"mysql+mysqlconnector://{user}:{password}@{replica_host}:{port}/{database}" if replica_host else None
+)
+
+# Supabase Configuration (se valida en utils.supabase_client con la primera llamada, no al importar)
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise RuntimeError("SUPABASE_URL y SUPABASE_KEY deben estar definidos en las variables de entorno (.env)")
 
 # En Producción, asegúrate de generar una clave secreta segura
 # SECRET_KEY = secrets.token_urlsafe(32)
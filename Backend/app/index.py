@@ -4,6 +4,9 @@ from flask import session
 from flask_socketio import emit, join_room, leave_room
 import logging
 from dotenv import load_dotenv
+from utils.metrics import record_socket_event
+from utils.db import db
+from models.models_flask import ChatMessage, Doctor
 
 # Cargar variables de entorno desde el directorio padre
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
@@ -11,19 +14,12 @@ load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
 # Crear la aplicación usando la función factory
 app = create_app()
 
-# Solo crear tablas si estamos usando base de datos
-if os.environ.get('USE_DATABASE', 'false').lower() == 'true':
-    from utils.db import db
-    from models.models_flask import ChatMessage, Doctor
-    
+# Las tablas se crean con "flask db create", no en cada arranque del proceso.
+# AUTO_CREATE_TABLES=true mantiene el comportamiento anterior para desarrollo local.
+if os.environ.get('USE_DATABASE', 'false').lower() == 'true' and \
+        os.environ.get('AUTO_CREATE_TABLES', 'false').lower() == 'true':
     with app.app_context():
-        db.create_all()  # Ensure all models are created in the database
-else:
-    # Importamos los modelos pero no creamos tablas
-    try:
-        from models.models_flask import ChatMessage, Doctor
-    except ImportError:
-        pass
+        db.create_all()
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR)
@@ -36,6 +32,7 @@ def default_error_handler(e):
 
 @socketio.on('connect')
 def handle_connect():
+    record_socket_event('connect')
     try:
         # Priorizar Supabase ID sobre doctor_id
         user_id = session.get('user_id') or session.get('supabase_id') or session.get('doctor_id')
@@ -52,7 +49,8 @@ def handle_connect():
         return False
 
 @socketio.on('disconnect')
-def handle_disconnect():
+def handle_disconnect(reason=None):
+    record_socket_event('disconnect')
     try:
         user_id = session.get('user_id') or session.get('supabase_id') or session.get('doctor_id')
         if user_id:
@@ -69,6 +67,7 @@ def handle_disconnect():
 
 @socketio.on('send_message')
 def handle_message(data):
+    record_socket_event('send_message')
     user_id = session.get('user_id') or session.get('supabase_id') or session.get('doctor_id')
     if not user_id:
         emit('message_error', {'error': 'Usuario no autenticado'})
@@ -160,6 +159,7 @@ def handle_message(data):
 
 @socketio.on('typing')
 def handle_typing(data):
+    record_socket_event('typing')
     user_id = session.get('user_id') or session.get('supabase_id') or session.get('doctor_id')
     if not user_id:
         return
@@ -0,0 +1,42 @@
+from alembic import context
+from flask import current_app
+from utils.db import db
+from utils.migrations import online_indexes
+from utils.partitioning import is_partitioned, skip_partitioned_foreign_keys
+import models.models_flask  # noqa: F401  Registra los modelos en los metadatos
+
+# Se ejecuta desde "flask db ...", dentro del contexto de la aplicación
+target_metadata = db.metadata
+
+
+def run_migrations_offline():
+    """Write the SQL of the migrations instead of running them (flask db upgrade --sql)"""
+    context.configure(
+        url=current_app.config['SQLALCHEMY_DATABASE_URI'],
+        target_metadata=target_metadata,
+        literal_binds=True,
+        compare_type=True,
+        process_revision_directives=online_indexes
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with db.engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            compare_type=True,
+            process_revision_directives=online_indexes,
+            # attention particionada (flask db partitions init) ya no tiene FKs en MySQL
+            include_object=skip_partitioned_foreign_keys(is_partitioned(connection))
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,72 @@
+"""composite fk is_deleted indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 04:33:15.118351
+
+Reemplaza los índices sueltos de la FK y de is_deleted por un índice compuesto
+(FK, is_deleted). El compuesto se crea antes de borrar el índice de la FK porque
+MySQL exige un índice que empiece por la columna de cada clave foránea.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+# tabla -> (índice compuesto, columnas, índices sueltos que reemplaza)
+COMPOSITE_INDEXES = {
+    'attention': ('idx_attention_patient_deleted_date', ['idPatient', 'is_deleted', 'date'],
+                  ['ix_attention_idPatient', 'ix_attention_is_deleted']),
+    'allergies': ('idx_allergies_patient_deleted', ['idPatient', 'is_deleted'],
+                  ['ix_allergies_idPatient', 'ix_allergies_is_deleted']),
+    'emergencyContact': ('idx_emergencyContact_patient_deleted', ['idPatient', 'is_deleted'],
+                         ['ix_emergencyContact_idPatient', 'ix_emergencyContact_is_deleted']),
+    'familyBackground': ('idx_familyBackground_patient_deleted', ['idPatient', 'is_deleted'],
+                         ['ix_familyBackground_idPatient', 'ix_familyBackground_is_deleted']),
+    'preExistingCondition': ('idx_preExistingCondition_patient_deleted', ['idPatient', 'is_deleted'],
+                             ['ix_preExistingCondition_idPatient', 'ix_preExistingCondition_is_deleted']),
+    'diagnostic': ('idx_diagnostic_attention_deleted', ['idAttention', 'is_deleted'],
+                   ['ix_diagnostic_idAttention', 'ix_diagnostic_is_deleted']),
+    'histopathology': ('idx_histopathology_attention_deleted', ['idAttention', 'is_deleted'],
+                       ['ix_histopathology_idAttention', 'ix_histopathology_is_deleted']),
+    'imaging': ('idx_imaging_attention_deleted', ['idAttention', 'is_deleted'],
+                ['ix_imaging_idAttention', 'ix_imaging_is_deleted']),
+    'laboratory': ('idx_laboratory_attention_deleted', ['idAttention', 'is_deleted'],
+                   ['ix_laboratory_idAttention', 'ix_laboratory_is_deleted']),
+    'regionalPhysicalExamination': ('idx_regionalPhysicalExamination_attention_deleted', ['idAttention', 'is_deleted'],
+                                    ['ix_regionalPhysicalExamination_idAttention',
+                                     'ix_regionalPhysicalExamination_is_deleted']),
+    'reviewOrgansSystems': ('idx_reviewOrgansSystems_attention_deleted', ['idAttention', 'is_deleted'],
+                            ['ix_reviewOrgansSystems_idAttention', 'ix_reviewOrgansSystems_is_deleted']),
+    'treatment': ('idx_treatment_attention_deleted', ['idAttention', 'is_deleted'],
+                  ['ix_treatment_idAttention', 'ix_treatment_is_deleted']),
+}
+
+# Booleanos de baja selectividad sin FK: se borran sin reemplazo
+BOOLEAN_INDEXES = {
+    'patients': 'ix_patients_is_deleted',
+    'doctor': 'ix_doctor_is_deleted',
+}
+
+
+def upgrade():
+    for table, (name, columns, replaced) in COMPOSITE_INDEXES.items():
+        op.create_index_online(name, table, columns)
+        for old in replaced:
+            op.drop_index_online(old, table)
+    for table, name in BOOLEAN_INDEXES.items():
+        op.drop_index_online(name, table)
+
+
+def downgrade():
+    for table, name in BOOLEAN_INDEXES.items():
+        op.create_index_online(name, table, ['is_deleted'])
+    for table, (name, columns, replaced) in COMPOSITE_INDEXES.items():
+        for old in replaced:
+            op.create_index_online(old, table, [old[len(f'ix_{table}_'):]])
+        op.drop_index_online(name, table)
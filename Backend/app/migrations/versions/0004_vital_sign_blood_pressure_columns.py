@@ -0,0 +1,171 @@
+"""vital sign blood pressure columns
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 04:45:40.601597
+
+Reemplaza attention.bloodPressure (texto "120/80") por systolicPressure y
+diastolicPressure (SMALLINT, mmHg). Los valores existentes se convierten por
+lotes. Si alguno no tiene el formato sistólica/diastólica la migración se
+detiene antes de tocar el esquema y lista esas filas: corríjalas, o ejecute con
+BLOOD_PRESSURE_DROP_UNPARSED=true para dejarlas en NULL (cada valor descartado
+queda en el log; downgrade no puede recuperarlo).
+
+Con --sql (sin conexión) la comprobación no es posible: solo se genera con
+BLOOD_PRESSURE_DROP_UNPARSED=true, y en MySQL la conversión es un UPDATE por
+tabla con REGEXP_SUBSTR.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+import logging
+import os
+import re
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+TABLES = ('attention', 'attention_archive')
+BATCH_SIZE = 1000
+DROP_UNPARSED = os.environ.get('BLOOD_PRESSURE_DROP_UNPARSED', 'false').lower() == 'true'
+_BLOOD_PRESSURE = re.compile(r'^\s*(\d{2,3})\s*/\s*(\d{2,3})\s*(?:mm\s*hg)?\s*$', re.IGNORECASE)
+# Mismo patrón en MySQL (REGEXP no distingue mayúsculas con la colación de la columna)
+_MYSQL_BLOOD_PRESSURE = '^[[:space:]]*[0-9]{2,3}[[:space:]]*/[[:space:]]*[0-9]{2,3}[[:space:]]*(mm[[:space:]]*hg)?[[:space:]]*$'
+
+logger = logging.getLogger('alembic.runtime.migration')
+
+
+def _unparsed(table_name):
+    """[(id, bloodPressure)] of ``table_name`` whose text is not systolic/diastolic"""
+    connection = op.get_bind()
+    table = sa.table(table_name, sa.column('id'), sa.column('bloodPressure'))
+    unparsed = []
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, table.c.bloodPressure)
+            .where(table.c.id > last_id, table.c.bloodPressure.isnot(None))
+            .order_by(table.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            return unparsed
+        unparsed += [(row_id, text) for row_id, text in rows if text.strip() and not _BLOOD_PRESSURE.match(text)]
+        last_id = rows[-1][0]
+
+
+def _check_unparsed():
+    """Stop before any DDL when values would be lost, unless BLOOD_PRESSURE_DROP_UNPARSED is set"""
+    if context.is_offline_mode():
+        if not DROP_UNPARSED:
+            raise RuntimeError(
+                'Offline (--sql) mode cannot check bloodPressure values that would be lost. Run the '
+                'upgrade online, or set BLOOD_PRESSURE_DROP_UNPARSED=true to accept storing them as NULL.'
+            )
+        return
+    unparsed = {table: _unparsed(table) for table in TABLES}
+    total = sum(len(rows) for rows in unparsed.values())
+    if not total:
+        return
+    if not DROP_UNPARSED:
+        sample = '; '.join(f'{table} id={row_id}: {text!r}' for table, rows in unparsed.items()
+                           for row_id, text in rows[:10])
+        raise RuntimeError(
+            f'{total} bloodPressure values are not "systolic/diastolic" and would be lost ({sample}). '
+            'Fix them, or set BLOOD_PRESSURE_DROP_UNPARSED=true to store them as NULL.'
+        )
+    for table, rows in unparsed.items():
+        for row_id, text in rows:
+            logger.warning(f'{table} id={row_id}: bloodPressure {text!r} discarded (not systolic/diastolic)')
+
+
+def _table(table_name):
+    return sa.table(table_name, sa.column('id'), sa.column('bloodPressure', sa.String(20)),
+                    sa.column('systolicPressure', sa.SmallInteger()), sa.column('diastolicPressure', sa.SmallInteger()))
+
+
+def _split_offline(table_name):
+    """Set-based version of _backfill(_split) for --sql scripts (MySQL 8)"""
+    if op.get_context().dialect.name != 'mysql':
+        raise RuntimeError('Offline (--sql) conversion of bloodPressure is only available for MySQL; run it online.')
+    op.execute(
+        f"UPDATE `{table_name}` SET "
+        f"`systolicPressure` = CAST(REGEXP_SUBSTR(`bloodPressure`, '[0-9]+', 1, 1) AS UNSIGNED), "
+        f"`diastolicPressure` = CAST(REGEXP_SUBSTR(`bloodPressure`, '[0-9]+', 1, 2) AS UNSIGNED) "
+        f"WHERE `bloodPressure` REGEXP '{_MYSQL_BLOOD_PRESSURE}'"
+    )
+
+
+def _join_offline(table_name):
+    """Set-based version of _backfill(_join) for --sql scripts"""
+    table = _table(table_name)
+    op.execute(
+        table.update()
+        .where(table.c.systolicPressure.isnot(None), table.c.diastolicPressure.isnot(None))
+        .values(bloodPressure=sa.cast(table.c.systolicPressure, sa.String(20)) + '/'
+                + sa.cast(table.c.diastolicPressure, sa.String(20)))
+    )
+
+
+def _backfill(table_name, read_columns, convert):
+    """Rewrite every row of ``table_name`` with ``convert(row)``, BATCH_SIZE rows per query"""
+    connection = op.get_bind()
+    table = _table(table_name)
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(table.c.id, *(table.c[name] for name in read_columns))
+            .where(table.c.id > last_id).order_by(table.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        updates = [dict(convert(row), row_id=row[0]) for row in rows]
+        updates = [values for values in updates if len(values) > 1]
+        if updates:
+            keys = [key for key in updates[0] if key != 'row_id']
+            connection.execute(
+                table.update().where(table.c.id == sa.bindparam('row_id'))
+                .values({key: sa.bindparam(key) for key in keys}),
+                updates
+            )
+        last_id = rows[-1][0]
+
+
+def _split(row):
+    match = _BLOOD_PRESSURE.match(row[1]) if row[1] else None
+    if not match:
+        return {}
+    return {'systolicPressure': int(match.group(1)), 'diastolicPressure': int(match.group(2))}
+
+
+def _join(row):
+    if row[1] is None or row[2] is None:
+        return {}
+    return {'bloodPressure': f'{row[1]}/{row[2]}'}
+
+
+def upgrade():
+    _check_unparsed()
+    for table in TABLES:
+        op.add_column(table, sa.Column('systolicPressure', sa.SmallInteger(), nullable=True))
+        op.add_column(table, sa.Column('diastolicPressure', sa.SmallInteger(), nullable=True))
+        if context.is_offline_mode():
+            _split_offline(table)
+        else:
+            _backfill(table, ['bloodPressure'], _split)
+        op.drop_column(table, 'bloodPressure')
+    op.create_index_online('idx_attention_blood_pressure', 'attention', ['systolicPressure', 'diastolicPressure'])
+
+
+def downgrade():
+    op.drop_index_online('idx_attention_blood_pressure', 'attention')
+    for table in TABLES:
+        op.add_column(table, sa.Column('bloodPressure', sa.String(length=20), nullable=True))
+        if context.is_offline_mode():
+            _join_offline(table)
+        else:
+            _backfill(table, ['systolicPressure', 'diastolicPressure'], _join)
+        op.drop_column(table, 'diastolicPressure')
+        op.drop_column(table, 'systolicPressure')
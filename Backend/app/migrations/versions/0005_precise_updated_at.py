@@ -0,0 +1,51 @@
+"""precise updated_at
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 05:20:11.402118
+
+updated_at pasa a DATETIME(6) en MySQL: con segundos enteros, dos cambios dentro
+del mismo segundo dejaban el mismo ETag (utils/conditional.py) y el cliente
+recibía un 304 con datos viejos. En SQLite el tipo no cambia (ya guarda texto
+con fracciones; onupdate las escribe con strftime('%f')).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+TABLES = (
+    'patients', 'doctor', 'attention', 'allergies', 'diagnostic', 'emergencyContact', 'familyBackground',
+    'histopathology', 'imaging', 'laboratory', 'preExistingCondition', 'regionalPhysicalExamination',
+    'reviewOrgansSystems', 'treatment'
+)
+# Las tablas de archivo copian updated_at sin DEFAULT; doctor no tiene archivo
+ARCHIVE_TABLES = tuple(f'{table}_archive' for table in TABLES if table != 'doctor')
+
+
+def _alter(precise):
+    if op.get_context().dialect.name != 'mysql':
+        return
+    new_type, old_type = mysql.DATETIME(fsp=6), mysql.DATETIME()
+    if not precise:
+        new_type, old_type = old_type, new_type
+    default = sa.text('CURRENT_TIMESTAMP(6)') if precise else sa.text('CURRENT_TIMESTAMP')
+    for table in TABLES:
+        op.alter_column(table, 'updated_at', type_=new_type, existing_type=old_type,
+                        existing_nullable=False, server_default=default)
+    for table in ARCHIVE_TABLES:
+        op.alter_column(table, 'updated_at', type_=new_type, existing_type=old_type, existing_nullable=False)
+
+
+def upgrade():
+    _alter(precise=True)
+
+
+def downgrade():
+    _alter(precise=False)
@@ -1,10 +1,40 @@
 from utils.db import db
 from sqlalchemy import Enum as SA_Enum
 from sqlalchemy.sql import func
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.dialects import mysql
 
 from sqlalchemy import DateTime
 
 
+# updated_at con fracciones de segundo: dos cambios dentro del mismo segundo dan versiones
+# (y ETags, ver utils/conditional.py) distintas. MySQL guarda microsegundos con DATETIME(6).
+PreciseDateTime = DateTime().with_variant(mysql.DATETIME(fsp=6), 'mysql')
+
+
+class precise_now(FunctionElement):
+    """Current timestamp with sub-second precision on every dialect"""
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(precise_now)
+def _precise_now(element, compiler, **kw):
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(precise_now, 'mysql')
+def _precise_now_mysql(element, compiler, **kw):
+    # DATETIME(6) exige la misma precisión en su DEFAULT
+    return 'CURRENT_TIMESTAMP(6)'
+
+
+@compiles(precise_now, 'sqlite')
+def _precise_now_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+
 
 class Patient(db.Model):
     __tablename__ = "patients"
@@ -79,9 +109,9 @@ class Patient(db.Model):
     email           = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=True) # Considerar db.String(255) si tiene un límite
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Sin índice propio: baja selectividad
 
     # Relaciones
     attentions = db.relationship("Attention", back_populates="patient") # Ajustar cascade según la política de BD
@@ -120,9 +150,9 @@ class Doctor(db.Model):
     status         = db.Column(db.String(50), nullable=False, server_default='active')
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Sin índice propio: baja selectividad
 
     # Relaciones
     attentions = db.relationship("Attention", back_populates="doctor")
@@ -148,32 +178,41 @@ class Attention(db.Model):
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     date = db.Column(db.DateTime, nullable=False, index=True)
-    weight = db.Column(db.Numeric(6, 2), nullable=True)
-    height = db.Column(db.Numeric(5, 2), nullable=True)
-    temperature = db.Column(db.Numeric(4, 1), nullable=True)
-    bloodPressure = db.Column(db.String(20), nullable=True)
+    # Signos vitales: asdecimal=False devuelve float (serializable tal cual) en lugar de Decimal
+    weight = db.Column(db.Numeric(6, 2, asdecimal=False), nullable=True)
+    height = db.Column(db.Numeric(5, 2, asdecimal=False), nullable=True)
+    temperature = db.Column(db.Numeric(4, 1, asdecimal=False), nullable=True)
+    systolicPressure = db.Column(db.SmallInteger, nullable=True)   # mmHg
+    diastolicPressure = db.Column(db.SmallInteger, nullable=True)  # mmHg
     heartRate = db.Column(db.Integer, nullable=True)
     oxygenSaturation = db.Column(db.Integer, nullable=True)
     breathingFrequency = db.Column(db.Integer, nullable=True)
-    glucose = db.Column(db.Numeric(5, 1), nullable=True)
-    hemoglobin = db.Column(db.Numeric(4, 1), nullable=True)
+    glucose = db.Column(db.Numeric(5, 1, asdecimal=False), nullable=True)
+    hemoglobin = db.Column(db.Numeric(4, 1, asdecimal=False), nullable=True)
     reasonConsultation = db.Column(db.String(255), nullable=False)
     currentIllness = db.Column(db.String(255), nullable=False)
     evolution = db.Column(db.String(255), nullable=True)
 
-    idPatient = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
+    idPatient = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
     idDoctor = db.Column(db.Integer, db.ForeignKey('doctor.id'), nullable=False, index=True)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     # Relaciones
     patient = db.relationship("Patient", back_populates="attentions")
     doctor = db.relationship("Doctor", back_populates="attentions")
 
+    @property
+    def bloodPressure(self):
+        """Presión arterial como texto "sistólica/diastólica" (formato anterior de la columna)"""
+        if self.systolicPressure is None or self.diastolicPressure is None:
+            return None
+        return f"{self.systolicPressure}/{self.diastolicPressure}"
+
     diagnostics = db.relationship("Diagnostic", back_populates="attention", cascade="all, delete-orphan")
     histopathologies = db.relationship("Histopathology", back_populates="attention", cascade="all, delete-orphan")
     imagings = db.relationship("Imaging", back_populates="attention", cascade="all, delete-orphan")
@@ -195,13 +234,13 @@ class Allergy(db.Model):
     id               = db.Column(db.Integer, primary_key=True, autoincrement=True)
     allergies        = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False)
     # CAMBIADO: idClinicHistory -> idPatient
-    idPatient        = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
+    idPatient        = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     # Relación
     patient = db.relationship("Patient", back_populates="allergies")
@@ -219,13 +258,13 @@ class Diagnostic(db.Model):
     observations           = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False) # Cambiado a db.Text
     diagnosticCondition    = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=False)
     chronology             = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=False)
-    idAttention            = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False, index=True)
+    idAttention            = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     attention = db.relationship("Attention", back_populates="diagnostics")
 
@@ -244,13 +283,13 @@ class EmergencyContact(db.Model):
     phoneNumber1     = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=False)
     phoneNumber2     = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=True)
     # CAMBIADO: idClinicHistory -> idPatient
-    idPatient        = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
+    idPatient        = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     patient = db.relationship("Patient", back_populates="emergency_contacts")
 
@@ -266,13 +305,13 @@ class FamilyBackground(db.Model):
     time                 = db.Column(db.Date, nullable=False)
     degreeRelationship   = db.Column(SA_Enum('1', '2', '3', '4', name='familyBackground_degreeRelationship_enum', native_enum=False, validate_strings=True), nullable=False)
     # CAMBIADO: idClinicHistory -> idPatient
-    idPatient            = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
+    idPatient            = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     patient = db.relationship("Patient", back_populates="family_backgrounds")
 
@@ -285,13 +324,13 @@ class Histopathology(db.Model):
 
     id                = db.Column(db.Integer, primary_key=True, autoincrement=True)
     histopathology    = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False)
-    idAttention       = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False, index=True)
+    idAttention       = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     attention = db.relationship("Attention", back_populates="histopathologies")
 
@@ -305,13 +344,13 @@ class Imaging(db.Model):
     id             = db.Column(db.Integer, primary_key=True, autoincrement=True)
     typeImaging    = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=False)
     imaging        = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False)
-    idAttention    = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False, index=True)
+    idAttention    = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     attention = db.relationship("Attention", back_populates="imagings")
 
@@ -325,13 +364,13 @@ class Laboratory(db.Model):
     id            = db.Column(db.Integer, primary_key=True, autoincrement=True)
     typeExam      = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=False)
     exam          = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False)
-    idAttention   = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False, index=True)
+    idAttention   = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     attention = db.relationship("Attention", back_populates="laboratories")
 
@@ -348,13 +387,13 @@ class PreExistingCondition(db.Model):
     medicament       = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=True)
     treatment        = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=True)
     # CAMBIADO: idClinicHistory -> idPatient
-    idPatient        = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False, index=True)
+    idPatient        = db.Column(db.Integer, db.ForeignKey('patients.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     patient = db.relationship("Patient", back_populates="pre_existing_conditions")
 
@@ -368,13 +407,13 @@ class RegionalPhysicalExamination(db.Model):
     id               = db.Column(db.Integer, primary_key=True, autoincrement=True)
     typeExamination  = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=False)
     examination      = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False)
-    idAttention      = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False, index=True)
+    idAttention      = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     attention = db.relationship("Attention", back_populates="regional_physical_examinations")
 
@@ -388,13 +427,13 @@ class ReviewOrgansSystem(db.Model): # Nombre de clase singular
     id            = db.Column(db.Integer, primary_key=True, autoincrement=True)
     typeReview    = db.Column(db.String(255, collation="utf8mb4_general_ci"), nullable=False)
     review        = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False)
-    idAttention   = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False, index=True)
+    idAttention   = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     attention = db.relationship("Attention", back_populates="review_organs_systems")
 
@@ -413,13 +452,13 @@ class Treatment(db.Model):
     frequency    = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False)
     indications  = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=False)
     warning      = db.Column(db.Text(collation="utf8mb4_general_ci"), nullable=True) # Confirmado nullable=True
-    idAttention  = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False, index=True)
+    idAttention  = db.Column(db.Integer, db.ForeignKey('attention.id'), nullable=False)
 
     created_at      = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     created_by      = db.Column(db.String(255), nullable=False)
-    updated_at      = db.Column(db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+    updated_at      = db.Column(PreciseDateTime, server_default=precise_now(), onupdate=precise_now(), nullable=False)
     updated_by      = db.Column(db.String(255), nullable=False)
-    is_deleted      = db.Column(db.Boolean, default=False, index=True, nullable=False) # Añadido index
+    is_deleted      = db.Column(db.Boolean, default=False, nullable=False) # Indexado junto con la FK (índices compuestos al final)
 
     attention = db.relationship("Attention", back_populates="treatments")
 
@@ -446,6 +485,30 @@ class ChatMessage(db.Model):
     sender = db.relationship("Doctor", foreign_keys=[sender_id], backref="sent_messages")
     receiver = db.relationship("Doctor", foreign_keys=[receiver_id], backref="received_messages")
 
+class RegistrationDraft(db.Model):
+    """Borrador del registro de un paciente (pasos de información adicional), por sesión"""
+    __tablename__ = "registration_drafts"
+    __table_args__ = {
+        "mysql_charset": "utf8mb4",
+        "mysql_collate": "utf8mb4_general_ci"
+    }
+
+    key        = db.Column(db.String(64), primary_key=True)
+    data       = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class ServerSession(db.Model):
+    """Sesión de Flask guardada en el servidor; la cookie solo lleva el id"""
+    __tablename__ = "server_sessions"
+    __table_args__ = {
+        "mysql_charset": "utf8mb4",
+        "mysql_collate": "utf8mb4_general_ci"
+    }
+
+    sid        = db.Column(db.String(64), primary_key=True)
+    data       = db.Column(db.Text, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
 # --- ÍNDICES ADICIONALES (Ejemplos, algunos ya están por index=True en columnas) ---
 # Estos se crean automáticamente si index=True está en la columna.
 # Si necesitas índices compuestos, los defines aquí.
@@ -453,6 +516,51 @@ class ChatMessage(db.Model):
 db.Index('idx_patients_name', Patient.firstName, Patient.lastName1, Patient.lastName2)
 db.Index('idx_doctor_name', Doctor.firstName, Doctor.lastName1, Doctor.lastName2)
 
+# Las consultas filtran siempre por la FK y por is_deleted a la vez (filter_by(idPatient=..., is_deleted=False)).
+# Un índice compuesto (FK, is_deleted) sirve a la vez de índice de la FK y evita los índices sueltos sobre el booleano.
+db.Index('idx_attention_patient_deleted_date', Attention.idPatient, Attention.is_deleted, Attention.date)
+db.Index('idx_allergies_patient_deleted', Allergy.idPatient, Allergy.is_deleted)
+db.Index('idx_emergencyContact_patient_deleted', EmergencyContact.idPatient, EmergencyContact.is_deleted)
+db.Index('idx_familyBackground_patient_deleted', FamilyBackground.idPatient, FamilyBackground.is_deleted)
+db.Index('idx_preExistingCondition_patient_deleted', PreExistingCondition.idPatient, PreExistingCondition.is_deleted)
+db.Index('idx_diagnostic_attention_deleted', Diagnostic.idAttention, Diagnostic.is_deleted)
+db.Index('idx_histopathology_attention_deleted', Histopathology.idAttention, Histopathology.is_deleted)
+db.Index('idx_imaging_attention_deleted', Imaging.idAttention, Imaging.is_deleted)
+db.Index('idx_laboratory_attention_deleted', Laboratory.idAttention, Laboratory.is_deleted)
+db.Index('idx_regionalPhysicalExamination_attention_deleted', RegionalPhysicalExamination.idAttention,
+         RegionalPhysicalExamination.is_deleted)
+db.Index('idx_reviewOrgansSystems_attention_deleted', ReviewOrgansSystem.idAttention, ReviewOrgansSystem.is_deleted)
+db.Index('idx_treatment_attention_deleted', Treatment.idAttention, Treatment.is_deleted)
+
+# Búsquedas por rango de presión arterial (p. ej. sistólica >= 140)
+db.Index('idx_attention_blood_pressure', Attention.systolicPressure, Attention.diastolicPressure)
+
+# --- TABLAS DE ARCHIVO ---
+# Filas borradas (is_deleted=True) hace más de ARCHIVE_AFTER_DAYS se mueven a <tabla>_archive
+# con `flask db archive`, para que las tablas calientes no crezcan con datos que ya no se leen.
+# Mismas columnas, sin FKs ni índices secundarios; los Enum se guardan como texto.
+SOFT_DELETE_MODELS = (
+    Patient, Doctor, Attention, Allergy, EmergencyContact, FamilyBackground, PreExistingCondition,
+    Diagnostic, Histopathology, Imaging, Laboratory, RegionalPhysicalExamination, ReviewOrgansSystem, Treatment
+)
+
+def _archive_table(table):
+    columns = [
+        db.Column(column.name,
+                  db.String(column.type.length) if isinstance(column.type, SA_Enum) else column.type,
+                  primary_key=column.primary_key, autoincrement=False, nullable=column.nullable)
+        for column in table.columns
+    ]
+    return db.Table(f'{table.name}_archive', db.metadata, *columns,
+                    db.Column('archived_at', db.DateTime, server_default=func.now(), nullable=False),
+                    mysql_charset='utf8mb4', mysql_collate='utf8mb4_general_ci')
+
+# Doctor no se archiva: attention y chat_message lo referencian
+ARCHIVE_TABLES = {
+    model.__tablename__: _archive_table(model.__table__)
+    for model in SOFT_DELETE_MODELS if model is not Doctor
+}
+
 # Nota sobre cascade en Patient.attentions:
 # Lo he dejado como estaba (`cascade="all, delete-orphan"`). Si tu FK en la base de datos
 # para `attention.idPatient` -> `patients.id` es `ON DELETE RESTRICT`,
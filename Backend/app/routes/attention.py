@@ -1,9 +1,25 @@
-from flask import Blueprint, render_template, session, request, redirect, url_for, flash, jsonify
+from flask import (
+    Blueprint, render_template, session, request, redirect, url_for, flash, jsonify,
+    current_app, Response, stream_with_context, make_response
+)
 from models.models_flask import (
     Attention, Patient, Doctor, Diagnostic, Histopathology, Imaging, 
     Laboratory, RegionalPhysicalExamination, ReviewOrgansSystem, Treatment
 )
 from utils.db import db
+from utils.attention_aggregate import (
+    load_attention_aggregate, serialize_attention_detail, serialize_attention_export,
+    serialize_attention_clinical, serialize_vital_signs, iter_attention_aggregates, iter_attentions_csv,
+    ATTENTION_CHILDREN
+)
+from utils.streaming import iter_partitions, iter_json_array, json_stream_response
+from utils.conditional import resource_validators, not_modified_response, with_validators
+from utils.token_auth import bearer_token, looks_like_jwt, STRICT_TOKEN_AUTH
+from utils.current_doctor import get_doctor_info_and_session
+from utils.partitioning import ATTENTION_HOT_MONTHS, hot_window_start
+from utils.replica import replica_reads
+from utils.vital_signs import parse_vital_signs, format_blood_pressure
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 import logging
@@ -25,84 +41,33 @@ def handle_cors_preflight():
         return response
     return None
 
-def check_database_connection():
-    """Verifica si hay conexión a la base de datos"""
-    try:
-        from sqlalchemy import text
-        db.session.execute(text('SELECT 1'))
-        return True
-    except Exception as e:
-        logger.error(f"Error de conexión a base de datos: {str(e)}")
-        return False
-
 def is_authenticated():
     """Check if user is authenticated for both session and API requests"""
+    # Los bearer tokens válidos ya rellenan la sesión en utils.token_auth
     if session.get('autenticado'):
         return True
-    
+
+    token = bearer_token()
+    if token and looks_like_jwt(token):
+        # JWT presente pero no verificado (firma, expiración o audiencia inválidas)
+        return False
+    if STRICT_TOKEN_AUTH:
+        return False
+
     # For API requests, check if we have authorization header or basic auth
     auth_header = request.headers.get('Authorization')
     if auth_header:
-        # For now, accept any authorization header as valid
-        # In production, you should validate the token properly
+        # Compatibilidad con clientes sin JWT ("Bearer demo-token"); STRICT_TOKEN_AUTH=true lo desactiva
         return True
     
     # Check if it's a JSON request with credentials
     if request.is_json and request.content_type == 'application/json':
         # For development purposes, allow JSON requests
-        # In production, implement proper API authentication
+        # In production, set STRICT_TOKEN_AUTH=true
         return True
     
     return False
 
-def get_doctor_info_and_session():
-    """Obtiene información del doctor y sessionID de manera compatible con Supabase"""
-    from models.models_flask import Doctor
-    
-    doctor_info = None
-    sessionID = None
-    
-    # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
-    
-    if session.get('auth_provider') == 'supabase':
-        # Para Supabase, creamos información ficticia del doctor
-        email = session.get('email', 'Doctor')
-        user_id = session.get('user_id', 'demo')
-        name_parts = email.split('@')[0].split('.')
-        
-        doctor_info = {
-            'firstName': name_parts[0].capitalize() if len(name_parts) > 0 else 'Doctor',
-            'lastName1': name_parts[1].capitalize() if len(name_parts) > 1 else 'Supabase',
-            'speciality': 'Medicina General'
-        }
-        sessionID = user_id
-        
-    elif 'cedula' in session and has_database:
-        # Código original para login local (solo si hay base de datos)
-        try:
-            doctor = Doctor.query.filter_by(identifierCode=session['cedula'], is_deleted=False).first()
-            if doctor:
-                doctor_info = {
-                    'firstName': doctor.firstName,
-                    'lastName1': doctor.lastName1,
-                    'speciality': doctor.speciality
-                }
-                sessionID = session['cedula']
-        except Exception as e:
-            logger.error(f"Error fetching doctor info: {str(e)}")
-    else:
-        # For API requests without proper session, create a dummy doctor
-        if request.is_json or request.headers.get('Content-Type') == 'application/json':
-            doctor_info = {
-                'firstName': 'API',
-                'lastName1': 'Doctor',
-                'speciality': 'Medicina General'
-            }
-            sessionID = 'api_user'
-    
-    return doctor_info, sessionID
-
 # Global lists for temporary storage during attention creation
 vital_signs_data = {}
 evaluation_data = {}
@@ -135,18 +100,19 @@ def add_vital_signs():
         else:
             data = request.form.to_dict()
         
+        # Convert and validate all vital signs at once (native numbers, keyed by Attention column)
+        values, errors = parse_vital_signs(data)
+        if errors:
+            error_msg = 'Signos vitales inválidos: ' + '; '.join(errors)
+            if request.is_json:
+                return jsonify({'success': False, 'error': error_msg, 'errors': errors}), 400
+            flash(error_msg, 'error')
+            return redirect(url_for('clinic.home', view='addAttention', step='vitales'))
+        
         # Store vital signs data temporarily (these will be part of the Attention record)
-        vital_signs_data = {
-            'weight': data.get('weight') if data.get('weight') else None,
-            'height': data.get('height') if data.get('height') else None,
-            'temperature': data.get('temperature') if data.get('temperature') else None,
-            'bloodPressure': data.get('bloodPressure') if data.get('bloodPressure') else None,
-            'heartRate': data.get('heartRate') if data.get('heartRate') else None,
-            'oxygenSaturation': data.get('oxygenSaturation') if data.get('oxygenSaturation') else None,
-            'breathingFrequency': data.get('breathingFrequency') if data.get('breathingFrequency') else None,
-            'glucose': data.get('glucose') if data.get('glucose') else None,
-            'hemoglobin': data.get('hemoglobin') if data.get('hemoglobin') else None
-        }
+        vital_signs_data = dict(values, bloodPressure=format_blood_pressure(
+            values['systolicPressure'], values['diastolicPressure']
+        ))
         
         success_msg = 'Signos vitales guardados exitosamente.'
         logger.info("Vital signs data saved temporarily")
@@ -1193,7 +1159,7 @@ def complete_attention():
         flash('Sesión no válida', 'error')
         return redirect(url_for('clinic.index'))
     
-    doctor_info, sessionID = get_doctor_info_and_session()
+    doctor_info, sessionID = get_doctor_info_and_session(api_fallback=True)
     
     logger.info(f"Complete attention - sessionID: {sessionID}, doctor_info: {doctor_info}")
     logger.info(f"Complete attention - selected_patient_id: {selected_patient_id}")
@@ -1315,16 +1281,8 @@ def complete_attention():
         new_attention = Attention(
             # Date and time
             date=datetime.now(),
-            # Vital signs (from vital_signs_data)
-            weight=float(vital_signs_data.get('weight')) if vital_signs_data.get('weight') else None,
-            height=float(vital_signs_data.get('height')) if vital_signs_data.get('height') else None,
-            temperature=float(vital_signs_data.get('temperature')) if vital_signs_data.get('temperature') else None,
-            bloodPressure=vital_signs_data.get('bloodPressure'),
-            heartRate=int(vital_signs_data.get('heartRate')) if vital_signs_data.get('heartRate') else None,
-            oxygenSaturation=int(vital_signs_data.get('oxygenSaturation')) if vital_signs_data.get('oxygenSaturation') else None,
-            breathingFrequency=int(vital_signs_data.get('breathingFrequency')) if vital_signs_data.get('breathingFrequency') else None,
-            glucose=float(vital_signs_data.get('glucose')) if vital_signs_data.get('glucose') else None,
-            hemoglobin=float(vital_signs_data.get('hemoglobin')) if vital_signs_data.get('hemoglobin') else None,
+            # Vital signs (from vital_signs_data, already validated by add_vital_signs)
+            **parse_vital_signs(vital_signs_data)[0],
             # Required fields from evaluation (these are in Attention table)
             reasonConsultation=evaluation_data['reasonConsultation'],
             currentIllness=evaluation_data['currentIllness'],
@@ -1525,20 +1483,33 @@ def clear_temp_attention_data():
 
 @attention.route('/get-patients', methods=['GET'])
 def get_patients():
-    """Get all patients for selection in forms"""
-    try:
-        patients = Patient.query.filter_by(is_deleted=False).all()
-        patient_list = []
-        for patient in patients:
-            patient_list.append({
-                'id': patient.id,
-                'name': f"{patient.firstName} {patient.lastName1}",
-                'identifierCode': patient.identifierCode
-            })
-        return jsonify({'patients': patient_list})
-    except Exception as e:
-        logger.error(f"Error getting patients: {str(e)}")
-        return jsonify({'error': 'Error al obtener pacientes'}), 500
+    """Get all patients for selection in forms, streamed in batches"""
+    stmt = (
+        select(Patient.id, Patient.firstName, Patient.lastName1, Patient.identifierCode)
+        .where(Patient.is_deleted == False)
+        .order_by(Patient.id)
+    )
+    
+    def iter_patients():
+        for partition in iter_partitions(stmt):
+            for patient in partition:
+                yield {
+                    'id': patient.id,
+                    'name': f"{patient.firstName} {patient.lastName1}",
+                    'identifierCode': patient.identifierCode
+                }
+    
+    def generate():
+        try:
+            yield '{"patients":'
+            yield from iter_json_array(iter_patients(), current_app.json.dumps)
+            yield '}'
+        except Exception as e:
+            # Re-raise: a truncated body must not end like a complete 200
+            logger.error(f"Error getting patients: {str(e)}")
+            raise
+    
+    return json_stream_response(generate(), 'Error al obtener pacientes')
 
 @attention.route('/get-doctors', methods=['GET'])
 def get_doctors():
@@ -1595,131 +1566,58 @@ def get_attention_for_patient():
 def view(attention_id):
     """Show details for a specific attention record"""
     try:
-        attention_record = Attention.query.filter_by(id=attention_id).first()
-        if not attention_record:
+        wants_json = request.is_json or request.headers.get('Accept') == 'application/json'
+        attention_patient = select(Attention.idPatient).where(Attention.id == attention_id).scalar_subquery()
+        attention_doctor = select(Attention.idDoctor).where(Attention.id == attention_id).scalar_subquery()
+        sources = [
+            (Attention, Attention.id == attention_id),
+            (Patient, Patient.id == attention_patient),
+            (Doctor, Doctor.id == attention_doctor)
+        ]
+        sources += [
+            (model, model.idAttention == attention_id, model.is_deleted == False)
+            for _, model, _ in ATTENTION_CHILDREN
+        ]
+        etag, last_modified = resource_validators(sources, variant='json' if wants_json else 'html')
+        cached = not_modified_response(etag, last_modified)
+        if cached:
+            return cached
+        
+        aggregate = load_attention_aggregate(attention_id)
+        if not aggregate:
             if request.is_json:
                 return jsonify({'success': False, 'error': 'Atención no encontrada'}), 404
             flash('Atención no encontrada', 'error')
             return redirect(url_for('clinic.home', view='attentionHistory'))
 
-        patient = Patient.query.filter_by(id=attention_record.idPatient, is_deleted=False).first()
-        doctor = Doctor.query.filter_by(id=attention_record.idDoctor, is_deleted=False).first()
-
-        # Get related data
-        physical_exams = RegionalPhysicalExamination.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        organ_reviews = ReviewOrgansSystem.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        diagnostics = Diagnostic.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        treatments = Treatment.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        histopathologies = Histopathology.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        imagings = Imaging.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        laboratories = Laboratory.query.filter_by(idAttention=attention_id, is_deleted=False).all()
+        # Deleted patients/doctors are not shown in the detail view
+        if aggregate['patient'] and aggregate['patient'].is_deleted:
+            aggregate['patient'] = None
+        if aggregate['doctor'] and aggregate['doctor'].is_deleted:
+            aggregate['doctor'] = None
 
         # If it's an API request, return JSON
-        if request.is_json or request.headers.get('Accept') == 'application/json':
-            return jsonify({
+        if wants_json:
+            return with_validators(jsonify({
                 'success': True,
-                'data': {
-                    'attention': {
-                        'id': attention_record.id,
-                        'date': attention_record.date.isoformat() if attention_record.date else None,
-                        'reasonConsultation': attention_record.reasonConsultation,
-                        'currentIllness': attention_record.currentIllness,
-                        'evolution': attention_record.evolution,
-                        'weight': attention_record.weight,
-                        'height': attention_record.height,
-                        'temperature': attention_record.temperature,
-                        'bloodPressure': attention_record.bloodPressure,
-                        'heartRate': attention_record.heartRate,
-                        'oxygenSaturation': attention_record.oxygenSaturation,
-                        'breathingFrequency': attention_record.breathingFrequency,
-                        'glucose': attention_record.glucose,
-                        'hemoglobin': attention_record.hemoglobin
-                    },
-                    'patient': {
-                        'id': patient.id,
-                        'firstName': patient.firstName,
-                        'lastName1': patient.lastName1,
-                        'identifierCode': patient.identifierCode
-                    } if patient else None,
-                    'doctor': {
-                        'id': doctor.id,
-                        'firstName': doctor.firstName,
-                        'lastName1': doctor.lastName1,
-                        'speciality': doctor.speciality
-                    } if doctor else None,
-                    'physicalExams': [
-                        {
-                            'id': exam.id,
-                            'typeExamination': exam.typeExamination,
-                            'examination': exam.examination
-                        } for exam in physical_exams
-                    ],
-                    'organReviews': [
-                        {
-                            'id': review.id,
-                            'typeReview': review.typeReview,
-                            'review': review.review
-                        } for review in organ_reviews
-                    ],
-                    'diagnostics': [
-                        {
-                            'id': diag.id,
-                            'cie10Code': diag.cie10Code,
-                            'disease': diag.disease,
-                            'observations': diag.observations,
-                            'diagnosticCondition': diag.diagnosticCondition,
-                            'chronology': diag.chronology
-                        } for diag in diagnostics
-                    ],
-                    'treatments': [
-                        {
-                            'id': treat.id,
-                            'medicament': treat.medicament,
-                            'via': treat.via,
-                            'dosage': treat.dosage,
-                            'unity': treat.unity,
-                            'frequency': treat.frequency,
-                            'indications': treat.indications,
-                            'warning': treat.warning
-                        } for treat in treatments
-                    ],
-                    'histopathologies': [
-                        {
-                            'id': histo.id,
-                            'histopathology': histo.histopathology
-                        } for histo in histopathologies
-                    ],
-                    'imagings': [
-                        {
-                            'id': img.id,
-                            'typeImaging': img.typeImaging,
-                            'imaging': img.imaging
-                        } for img in imagings
-                    ],
-                    'laboratories': [
-                        {
-                            'id': lab.id,
-                            'typeExam': lab.typeExam,
-                            'exam': lab.exam
-                        } for lab in laboratories
-                    ]
-                }
-            })
+                'data': serialize_attention_detail(aggregate)
+            }), etag, last_modified)
 
         # Regular template rendering for web interface
-        return render_template(
+        children = aggregate['children']
+        return with_validators(make_response(render_template(
             'attention_detail.html',
-            attention=attention_record,
-            patient=patient,
-            doctor=doctor,
-            physical_exams=physical_exams,
-            organ_reviews=organ_reviews,
-            diagnostics=diagnostics,
-            treatments=treatments,
-            histopathologies=histopathologies,
-            imagings=imagings,
-            laboratories=laboratories
-        )
+            attention=aggregate['attention'],
+            patient=aggregate['patient'],
+            doctor=aggregate['doctor'],
+            physical_exams=children['physicalExams'],
+            organ_reviews=children['organReviews'],
+            diagnostics=children['diagnostics'],
+            treatments=children['treatments'],
+            histopathologies=children['histopathologies'],
+            imagings=children['imagings'],
+            laboratories=children['laboratories']
+        )), etag, last_modified)
         
     except Exception as e:
         logger.error(f"Error viewing attention {attention_id}: {str(e)}")
@@ -1842,61 +1740,71 @@ def get_all_attentions():
 
 @attention.route('/api/attentions/patient/<int:patient_id>', methods=['GET'])
 def get_patient_attentions(patient_id):
-    """Get all attentions for a specific patient"""
+    """Get all attentions for a specific patient, streamed in batches"""
     try:
+        etag, last_modified = resource_validators([
+            (Patient, Patient.id == patient_id),
+            (Attention, Attention.idPatient == patient_id, Attention.is_deleted == False),
+            (Doctor,)
+        ])
+        cached = not_modified_response(etag, last_modified)
+        if cached:
+            return cached
+        
         # Validate patient exists
         patient = Patient.query.filter_by(id=patient_id, is_deleted=False).first()
         if not patient:
             return jsonify({'success': False, 'error': 'Paciente no encontrado'}), 404
         
-        attentions = Attention.query.filter_by(
-            idPatient=patient_id, is_deleted=False
-        ).order_by(Attention.date.desc()).all()
-        
-        attentions_data = []
-        for attention in attentions:
-            doctor = Doctor.query.filter_by(id=attention.idDoctor).first()
-            
-            attentions_data.append({
-                'id': attention.id,
-                'date': attention.date.isoformat() if attention.date else None,
-                'reasonConsultation': attention.reasonConsultation,
-                'currentIllness': attention.currentIllness,
-                'evolution': attention.evolution,
-                'doctor': {
-                    'id': doctor.id,
-                    'name': f"Dr. {doctor.firstName} {doctor.lastName1}",
-                    'speciality': doctor.speciality
-                } if doctor else None,
-                'vitalSigns': {
-                    'weight': attention.weight,
-                    'height': attention.height,
-                    'temperature': attention.temperature,
-                    'bloodPressure': attention.bloodPressure,
-                    'heartRate': attention.heartRate,
-                    'oxygenSaturation': attention.oxygenSaturation,
-                    'breathingFrequency': attention.breathingFrequency,
-                    'glucose': attention.glucose,
-                    'hemoglobin': attention.hemoglobin
-                }
-            })
-        
-        return jsonify({
-            'success': True,
-            'data': {
-                'patient': {
-                    'id': patient.id,
-                    'name': f"{patient.firstName} {patient.lastName1}",
-                    'identifierCode': patient.identifierCode
-                },
-                'attentions': attentions_data,
-                'total': len(attentions_data)
-            }
-        })
+        patient_data = {
+            'id': patient.id,
+            'name': f"{patient.firstName} {patient.lastName1}",
+            'identifierCode': patient.identifierCode
+        }
         
     except Exception as e:
         logger.error(f"Error getting patient attentions: {str(e)}")
         return jsonify({'success': False, 'error': 'Error al obtener atenciones del paciente'}), 500
+    
+    stmt = (
+        select(Attention, Doctor)
+        .outerjoin(Attention.doctor)
+        .where(Attention.idPatient == patient_id, Attention.is_deleted == False)
+        .order_by(Attention.date.desc())
+    )
+    total = [0]
+    
+    def iter_attentions():
+        for partition in iter_partitions(stmt):
+            for attention_record, doctor in partition:
+                total[0] += 1
+                yield {
+                    'id': attention_record.id,
+                    'date': attention_record.date.isoformat() if attention_record.date else None,
+                    'reasonConsultation': attention_record.reasonConsultation,
+                    'currentIllness': attention_record.currentIllness,
+                    'evolution': attention_record.evolution,
+                    'doctor': {
+                        'id': doctor.id,
+                        'name': f"Dr. {doctor.firstName} {doctor.lastName1}",
+                        'speciality': doctor.speciality
+                    } if doctor else None,
+                    'vitalSigns': serialize_vital_signs(attention_record)
+                }
+    
+    def generate():
+        dumps = current_app.json.dumps
+        try:
+            yield '{"success":true,"data":{"patient":' + dumps(patient_data) + ',"attentions":'
+            yield from iter_json_array(iter_attentions(), dumps)
+            yield f',"total":{total[0]}}}}}'
+        except Exception as e:
+            # Re-raise: a truncated body must not end like a complete (cacheable) 200
+            logger.error(f"Error streaming patient attentions: {str(e)}")
+            raise
+    
+    response = json_stream_response(generate(), 'Error al obtener atenciones del paciente')
+    return with_validators(response, etag, last_modified)
 
 
 
@@ -1918,6 +1826,7 @@ def clear_session_data():
 
 # Additional utility endpoints
 @attention.route('/api/statistics', methods=['GET'])
+@replica_reads
 def get_attention_statistics():
     """Get attention statistics for dashboard"""
     try:
@@ -1939,6 +1848,12 @@ def get_attention_statistics():
             Attention.is_deleted == False
         ).count()
         
+        # Rankings over the last ?months= months (default ATTENTION_HOT_MONTHS, 0 = all time),
+        # so only the recent partitions of attention are read
+        months = request.args.get('months', ATTENTION_HOT_MONTHS, type=int)
+        window_start = hot_window_start(months)
+        in_window = [Attention.date >= window_start] if window_start else []
+        
         # Most active doctors (top 5)
         from sqlalchemy import func
         top_doctors = db.session.query(
@@ -1947,7 +1862,8 @@ def get_attention_statistics():
             func.count(Attention.id).label('attention_count')
         ).join(Attention).filter(
             Attention.is_deleted == False,
-            Doctor.is_deleted == False
+            Doctor.is_deleted == False,
+            *in_window
         ).group_by(Doctor.id).order_by(
             func.count(Attention.id).desc()
         ).limit(5).all()
@@ -1958,7 +1874,8 @@ def get_attention_statistics():
             func.count(Diagnostic.id).label('diagnosis_count')
         ).join(Attention).filter(
             Attention.is_deleted == False,
-            Diagnostic.is_deleted == False
+            Diagnostic.is_deleted == False,
+            *in_window
         ).group_by(Diagnostic.disease).order_by(
             func.count(Diagnostic.id).desc()
         ).limit(10).all()
@@ -1969,6 +1886,7 @@ def get_attention_statistics():
                 'totalAttentions': total_attentions,
                 'attentionsToday': attentions_today,
                 'attentionsThisMonth': attentions_this_month,
+                'rankingsSince': window_start.date().isoformat() if window_start else None,
                 'topDoctors': [
                     {
                         'name': f"Dr. {doctor.firstName} {doctor.lastName1}",
@@ -1990,6 +1908,7 @@ def get_attention_statistics():
 
 
 @attention.route('/api/search', methods=['GET'])
+@replica_reads
 def search_attentions():
     """Search attentions by patient name, doctor name, or diagnosis"""
     try:
@@ -2047,120 +1966,64 @@ def search_attentions():
         return jsonify({'success': False, 'error': 'Error en la búsqueda'}), 500
 
 
+EXPORT_BATCH_SIZE = 500
+
+@attention.route('/api/export/attentions', methods=['GET'])
+@replica_reads
+def export_attentions():
+    """Stream every attention matching the filters as NDJSON or CSV"""
+    if not is_authenticated():
+        return jsonify({'success': False, 'error': 'Sesión no válida'}), 401
+    
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({'success': False, 'error': 'Formato no soportado (use ndjson o csv)'}), 400
+    
+    try:
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        filters = {
+            'patient_id': request.args.get('patient_id', type=int),
+            'doctor_id': request.args.get('doctor_id', type=int),
+            'date_from': datetime.strptime(date_from, '%Y-%m-%d') if date_from else None,
+            'date_to': datetime.strptime(date_to, '%Y-%m-%d') if date_to else None
+        }
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Formato de fecha inválido (use YYYY-MM-DD)'}), 400
+    
+    aggregates = iter_attention_aggregates(batch_size=EXPORT_BATCH_SIZE, **filters)
+    
+    def generate():
+        try:
+            if export_format == 'csv':
+                yield from iter_attentions_csv(aggregates)
+            else:
+                for aggregate in aggregates:
+                    yield current_app.json.dumps(serialize_attention_clinical(aggregate)) + '\n'
+        except Exception as e:
+            # Re-raise: the transfer must fail visibly instead of ending as a short but valid file
+            logger.error(f"Error streaming attentions export: {str(e)}")
+            raise
+    
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    filename = f"atenciones_{datetime.now().strftime('%Y%m%d%H%M%S')}.{export_format}"
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
 @attention.route('/api/export/<int:attention_id>', methods=['GET'])
+@replica_reads
 def export_attention(attention_id):
     """Export attention data in JSON format for external use"""
     try:
-        attention = Attention.query.filter_by(id=attention_id, is_deleted=False).first()
-        if not attention:
+        aggregate = load_attention_aggregate(attention_id, include_deleted=False)
+        if not aggregate:
             return jsonify({'success': False, 'error': 'Atención no encontrada'}), 404
         
-        patient = Patient.query.filter_by(id=attention.idPatient).first()
-        doctor = Doctor.query.filter_by(id=attention.idDoctor).first()
-        
-        # Get all related data
-        physical_exams = RegionalPhysicalExamination.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        organ_reviews = ReviewOrgansSystem.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        diagnostics = Diagnostic.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        treatments = Treatment.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        histopathologies = Histopathology.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        imagings = Imaging.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        laboratories = Laboratory.query.filter_by(idAttention=attention_id, is_deleted=False).all()
-        
-        export_data = {
-            'metadata': {
-                'exportDate': datetime.now().isoformat(),
-                'version': '1.0',
-                'system': 'MEDSC'
-            },
-            'attention': {
-                'id': attention.id,
-                'date': attention.date.isoformat() if attention.date else None,
-                'reasonConsultation': attention.reasonConsultation,
-                'currentIllness': attention.currentIllness,
-                'evolution': attention.evolution,
-                'vitalSigns': {
-                    'weight': attention.weight,
-                    'height': attention.height,
-                    'temperature': attention.temperature,
-                    'bloodPressure': attention.bloodPressure,
-                    'heartRate': attention.heartRate,
-                    'oxygenSaturation': attention.oxygenSaturation,
-                    'breathingFrequency': attention.breathingFrequency,
-                    'glucose': attention.glucose,
-                    'hemoglobin': attention.hemoglobin
-                }
-            },
-            'patient': {
-                'id': patient.id,
-                'firstName': patient.firstName,
-                'lastName1': patient.lastName1,
-                'identifierCode': patient.identifierCode,
-                'birthDate': patient.birthDate.isoformat() if hasattr(patient, 'birthDate') and patient.birthDate else None,
-                'gender': getattr(patient, 'gender', None)
-            } if patient else None,
-            'doctor': {
-                'id': doctor.id,
-                'firstName': doctor.firstName,
-                'lastName1': doctor.lastName1,
-                'speciality': doctor.speciality
-            } if doctor else None,
-            'clinicalData': {
-                'physicalExams': [
-                    {
-                        'typeExamination': exam.typeExamination,
-                        'examination': exam.examination
-                    } for exam in physical_exams
-                ],
-                'organSystemReviews': [
-                    {
-                        'typeReview': review.typeReview,
-                        'review': review.review
-                    } for review in organ_reviews
-                ],
-                'diagnostics': [
-                    {
-                        'cie10Code': diag.cie10Code,
-                        'disease': diag.disease,
-                        'observations': diag.observations,
-                        'diagnosticCondition': diag.diagnosticCondition,
-                        'chronology': diag.chronology
-                    } for diag in diagnostics
-                ],
-                'treatments': [
-                    {
-                        'medicament': treat.medicament,
-                        'via': treat.via,
-                        'dosage': treat.dosage,
-                        'unity': treat.unity,
-                        'frequency': treat.frequency,
-                        'indications': treat.indications,
-                        'warning': treat.warning
-                    } for treat in treatments
-                ],
-                'labResults': {
-                    'histopathologies': [
-                        {'result': histo.histopathology} for histo in histopathologies
-                    ],
-                    'imagings': [
-                        {
-                            'type': img.typeImaging,
-                            'result': img.imaging
-                        } for img in imagings
-                    ],
-                    'laboratories': [
-                        {
-                            'type': lab.typeExam,
-                            'result': lab.exam
-                        } for lab in laboratories
-                    ]
-                }
-            }
-        }
-        
         return jsonify({
             'success': True,
-            'data': export_data
+            'data': serialize_attention_export(aggregate, datetime.now())
         })
         
     except Exception as e:
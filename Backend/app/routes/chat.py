@@ -1,6 +1,8 @@
 from flask import Blueprint, render_template, session, request, redirect, url_for, jsonify
 from models.models_flask import Doctor, ChatMessage
 from utils.db import db
+from utils.current_doctor import database_available, get_doctor_info_and_session
+from utils.session_store import regenerate_session
 import os
 import logging
 import uuid
@@ -12,16 +14,6 @@ chat = Blueprint('chat', __name__)
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
-def check_database_connection():
-    """Verifica si hay conexión a la base de datos"""
-    try:
-        from sqlalchemy import text
-        db.session.execute(text('SELECT 1'))
-        return True
-    except Exception as e:
-        logger.error(f"Error de conexión a base de datos: {str(e)}")
-        return False
-
 @chat.route('/chat')
 def chat_view():
     """Display chat interface"""
@@ -30,24 +22,14 @@ def chat_view():
         return redirect(url_for('clinic.index'))
     
     # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
+    has_database = database_available()
     
     # Get doctor information from session - Adaptado para Supabase
     doctor_info = None
     doctors = []
     
     if session.get('auth_provider') == 'supabase':
-        # Para Supabase, creamos información ficticia del doctor
-        email = session.get('email', 'Doctor')
-        user_id = session.get('user_id', 'demo')
-        name_parts = email.split('@')[0].split('.')
-        
-        doctor_info = {
-            'id': user_id,
-            'firstName': name_parts[0].capitalize() if len(name_parts) > 0 else 'Doctor',
-            'lastName1': name_parts[1].capitalize() if len(name_parts) > 1 else 'Supabase',
-            'speciality': 'Medicina General'
-        }
+        doctor_info, user_id = get_doctor_info_and_session()
         
         # Store doctor ID in session for socket authentication
         session['doctor_id'] = user_id
@@ -86,36 +68,27 @@ def chat_view():
             
     elif 'cedula' in session and has_database:
         # Código original para login local (solo si hay base de datos)
-        try:
-            doctor = Doctor.query.filter_by(
-                identifierCode=session['cedula'], 
-                is_deleted=False
-            ).first()
+        doctor_info, _ = get_doctor_info_and_session()
+        if doctor_info:
+            # Store doctor ID in session for socket authentication
+            session['doctor_id'] = doctor_info['id']
             
-            if doctor:
-                # Store doctor ID in session for socket authentication
-                session['doctor_id'] = doctor.id
-                
-                doctor_info = {
-                    'id': doctor.id,
-                    'firstName': doctor.firstName,
-                    'lastName1': doctor.lastName1,
-                    'speciality': doctor.speciality
-                }
-                
+            try:
                 # Get all other doctors
                 doctors = Doctor.query.filter(
-                    Doctor.id != doctor.id,
+                    Doctor.id != doctor_info['id'],
                     Doctor.is_deleted == False
                 ).all()
-        except Exception as e:
-            logger.error(f"Error fetching doctor info: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error fetching doctor info: {str(e)}")
     
     return render_template('chat.html', 
                           doctor_info=doctor_info, 
                           doctors=doctors,
                           view='chat')
 
+# Los historiales de chat leen siempre del primario: los mensajes se escriben por Socket.IO
+# (sin cookie db_primary) y estas vistas marcan mensajes como leídos.
 @chat.route('/get-messages/<int:doctor_id>', methods=['GET'])
 def get_messages(doctor_id):
     """Get messages between current doctor and selected doctor"""
@@ -124,7 +97,7 @@ def get_messages(doctor_id):
         return jsonify({'error': 'No autorizado'}), 401
     
     # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
+    has_database = database_available()
     
     if not has_database:
         # En modo demo, retornar mensajes vacíos
@@ -189,7 +162,7 @@ def get_messages_uuid(receiver_id):
         return jsonify({'error': 'No autorizado'}), 401
     
     # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
+    has_database = database_available()
     
     if not has_database:
         logger.info("Database not available, returning empty messages")
@@ -390,7 +363,7 @@ def send_message():
     logger.info(f"Final IDs - sender_supabase: {sender_supabase_id}, receiver_supabase: {receiver_supabase_id}")
     
     # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
+    has_database = database_available()
     logger.info(f"Has database: {has_database}")
     
     if not has_database:
@@ -448,7 +421,7 @@ def get_unread_counts():
         return jsonify({'error': 'No autorizado'}), 401
     
     # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
+    has_database = database_available()
     
     if not has_database:
         # En modo demo, retornar conteos vacíos
@@ -485,8 +458,9 @@ def get_unread_counts():
 def demo_login():
     """Login temporal para pruebas de chat"""
     try:
-        # Limpiar sesión anterior
+        # Limpiar sesión anterior y emitir un id de sesión nuevo (evita session fixation)
         session.clear()
+        regenerate_session(session)
         
         user_data = request.get_json()
         user_name = user_data.get('name', 'Demo User')
@@ -494,7 +468,7 @@ def demo_login():
         logger.info(f"Demo login attempt for user: {user_name}")
         
         # Verificar si tenemos conexión a la base de datos
-        has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
+        has_database = database_available()
         
         if has_database:
             # Buscar un doctor real en la base de datos que tenga supabase_id
@@ -562,7 +536,7 @@ def get_chat_doctors():
     logger.info(f"Getting chat doctors. Session: {dict(session)}")
     
     # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
+    has_database = database_available()
     
     if not has_database:
         # En modo demo, retornar doctores demo con UUIDs reales
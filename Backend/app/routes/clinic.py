@@ -1,20 +1,11 @@
 from flask import Blueprint, render_template, session, request, redirect, url_for, flash
 from models.models_flask import Patient, Doctor, Attention
 from utils.db import db
+from utils.current_doctor import database_available, get_doctor_info_and_session
 import os
 
 clinic = Blueprint('clinic', __name__)
 
-def check_database_connection():
-    """Verifica si hay conexión a la base de datos"""
-    try:
-        from sqlalchemy import text
-        # Intentar hacer una consulta simple
-        db.session.execute(text('SELECT 1'))
-        return True
-    except Exception as e:
-        return False
-
 @clinic.route('/')
 def index():
     session['autenticado'] = False
@@ -28,34 +19,10 @@ def home():
         return redirect(url_for('login.index'))
 
     # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
+    has_database = database_available()
 
     # Get doctor information from session - Adaptado para Supabase
-    doctor_info = None
-    if session.get('auth_provider') == 'supabase':
-        # Para Supabase, creamos información ficticia del doctor
-        email = session.get('email', 'Doctor')
-        name_parts = email.split('@')[0].split('.')
-        doctor_info = {
-            'firstName': name_parts[0].capitalize() if len(name_parts) > 0 else 'Doctor',
-            'lastName1': name_parts[1].capitalize() if len(name_parts) > 1 else 'Supabase',
-            'speciality': 'Medicina General'
-        }
-    elif 'cedula' in session and has_database:
-        # Código original para login local (solo si hay base de datos)
-        try:
-            doctor = Doctor.query.filter_by(
-                identifierCode=session['cedula'], 
-                is_deleted=False
-            ).first()
-            if doctor:
-                doctor_info = {
-                    'firstName': doctor.firstName,
-                    'lastName1': doctor.lastName1,
-                    'speciality': doctor.speciality
-                }
-        except Exception as e:
-            doctor_info = None
+    doctor_info, _ = get_doctor_info_and_session()
 
     # Si no hay base de datos, mostrar mensaje solo para vistas que la requieren (excepto addAttention y attentionHistory)
     if not has_database and view in ['patients', 'addPatient']:
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, session, url_for, flash, current_app, jsonify
 from utils.supabase_client import supabase_auth
+from utils.session_store import regenerate_session
 from datetime import datetime, timedelta
 import uuid
 import re
@@ -55,20 +56,25 @@ def new_login():
         auth_result = supabase_auth.sign_in(email, password)
         
         if auth_result['success']:
-            # Store user info in session
+            # Store user info in session (under a new session id, against session fixation)
+            regenerate_session(session)
             session['autenticado'] = True
             session['user_id'] = auth_result['user'].id
             session['email'] = auth_result['user'].email
             session['auth_provider'] = 'supabase'
             
             if request.is_json:
+                # Los clientes de API pueden usar access_token como "Authorization: Bearer ..."
+                supabase_session = auth_result.get('session')
                 return jsonify({
-                    'success': True, 
+                    'success': True,
                     'message': 'Login exitoso',
                     'user': {
                         'id': auth_result['user'].id,
                         'email': auth_result['user'].email
-                    }
+                    },
+                    'access_token': supabase_session.access_token if supabase_session else None,
+                    'expires_at': supabase_session.expires_at if supabase_session else None
                 })
             
             flash('Login exitoso', 'success')
@@ -639,15 +645,17 @@ def register_doctor():
                 'error': 'La contraseña debe tener al menos 6 caracteres'
             }), 400
         
-        # Verificar si ya existe el email o identifierCode en MySQL
-        existing_email = Doctor.query.filter_by(email=data['email'], is_deleted=False).first()
+        # Verificar si ya existe el email o identifierCode en MySQL (también doctores eliminados: son únicos)
+        existing_email = Doctor.query.filter_by(email=data['email']).execution_options(include_deleted=True).first()
         if existing_email:
             return jsonify({
                 'success': False,
                 'error': 'El email ya está registrado'
             }), 400
             
-        existing_identifier = Doctor.query.filter_by(identifierCode=data['identifierCode'], is_deleted=False).first()
+        existing_identifier = Doctor.query.filter_by(
+            identifierCode=data['identifierCode']
+        ).execution_options(include_deleted=True).first()
         if existing_identifier:
             return jsonify({
                 'success': False,
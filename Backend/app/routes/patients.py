@@ -1,9 +1,25 @@
-from flask import Blueprint, render_template, session, request, redirect, url_for, flash, jsonify
-from models.models_flask import Patient, Allergy, FamilyBackground, PreExistingCondition, EmergencyContact
+from flask import (
+    Blueprint, render_template, session, request, redirect, url_for, flash, jsonify,
+    current_app, Response, stream_with_context
+)
+from models.models_flask import Patient, Allergy, FamilyBackground, PreExistingCondition, EmergencyContact, precise_now
 from utils.db import db
+from utils.patient_record import iter_patient_records, load_patient_child_rows
+from utils.patient_import import import_patients, iter_import_rows, open_import_stream
+from utils.child_merge import merge_children
+from utils.draft_store import create_draft_store
+from utils.current_doctor import get_doctor_info_and_session
+from utils.conditional import resource_validators, not_modified_response, with_validators
+from utils.streaming import gzip_stream, iter_partitions, iter_json_array, json_stream_response
+from utils.replica import replica_reads
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+import click
+import io
 import logging
 import os
+import uuid
 
 patients = Blueprint('patients', __name__)
 
@@ -11,61 +27,45 @@ patients = Blueprint('patients', __name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def check_database_connection():
-    """Verifica si hay conexión a la base de datos"""
-    try:
-        from sqlalchemy import text
-        db.session.execute(text('SELECT 1'))
-        return True
-    except Exception as e:
-        logger.error(f"Error de conexión a base de datos: {str(e)}")
-        return False
-
-def get_doctor_info_and_session():
-    """Obtiene información del doctor y sessionID de manera compatible con Supabase"""
-    from models.models_flask import Doctor
-    
-    doctor_info = None
-    sessionID = None
-    
-    # Verificar si tenemos conexión a la base de datos
-    has_database = os.environ.get('USE_DATABASE', 'false').lower() == 'true' and check_database_connection()
-    
-    if session.get('auth_provider') == 'supabase':
-        # Para Supabase, creamos información ficticia del doctor
-        email = session.get('email', 'Doctor')
-        user_id = session.get('user_id', 'demo')
-        name_parts = email.split('@')[0].split('.')
-        
-        doctor_info = {
-            'firstName': name_parts[0].capitalize() if len(name_parts) > 0 else 'Doctor',
-            'lastName1': name_parts[1].capitalize() if len(name_parts) > 1 else 'Supabase',
-            'speciality': 'Medicina General'
-        }
-        sessionID = user_id
-        
-    elif 'cedula' in session and has_database:
-        # Código original para login local (solo si hay base de datos)
-        try:
-            doctor = Doctor.query.filter_by(identifierCode=session['cedula'], is_deleted=False).first()
-            if doctor:
-                doctor_info = {
-                    'firstName': doctor.firstName,
-                    'lastName1': doctor.lastName1,
-                    'speciality': doctor.speciality
-                }
-                sessionID = session['cedula']
-        except Exception as e:
-            logger.error(f"Error fetching doctor info: {str(e)}")
-    
-    return doctor_info, sessionID
-
-# Global lists for temporary storage (consider using session storage instead)
-allergies = []
-familyBack = []
-preExistingConditions = []
-emergencyContacts = []  # Add missing emergency contacts list
-current_patient_id = None  # Add this to track the current patient being processed
+# Borradores del registro de pacientes (información adicional), uno por sesión
+registration_drafts = create_draft_store()
+
+def new_registration_draft(patient_id=None):
+    """Empty registration draft for a patient"""
+    return {
+        'patient_id': patient_id,
+        'allergies': [],
+        'emergencyContacts': [],
+        'familyBack': [],
+        'preExistingConditions': []
+    }
+
+def get_registration_draft():
+    """Return the registration draft of the current session (an empty one if missing or expired)"""
+    draft_id = session.get('registration_draft_id')
+    draft = registration_drafts.get(draft_id) if draft_id else None
+    return draft or new_registration_draft()
+
+def save_registration_draft(draft):
+    """Store the registration draft of the current session, refreshing its TTL"""
+    draft_id = session.get('registration_draft_id')
+    if not draft_id:
+        draft_id = uuid.uuid4().hex
+        session['registration_draft_id'] = draft_id
+    registration_drafts.set(draft_id, draft)
+
+def clear_registration_draft():
+    """Discard the registration draft of the current session"""
+    draft_id = session.pop('registration_draft_id', None)
+    if draft_id:
+        registration_drafts.delete(draft_id)
+
+def render_registration_step(draft):
+    """Render the additional information step with the draft data"""
+    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
+                         allergies=draft['allergies'], emergencyContacts=draft['emergencyContacts'], 
+                         familyBack=draft['familyBack'], preExistingConditions=draft['preExistingConditions'],
+                         current_patient_id=draft['patient_id'])
 
 @patients.route('/patients')
 def show_patients():
@@ -78,109 +78,163 @@ def show_patients():
         flash('Error al cargar la lista de pacientes', 'error')
         return redirect(url_for('clinic.home'))
 
+def serialize_patient_list_item(patient, children):
+    """Serialize a patient with its related rows in the shape returned by /api/patients"""
+    allergies = children['allergies']
+    emergency_contacts = children['emergencyContacts']
+    pre_existing_conditions = children['preExistingConditions']
+    family_backgrounds = children['familyBackgrounds']
+    
+    # Format emergency contacts
+    emergency_contacts_data = []
+    for contact in emergency_contacts:
+        emergency_contacts_data.append({
+            'id': contact.id,
+            'first_name': contact.firstName,
+            'last_name': contact.lastName,
+            'full_name': f"{contact.firstName} {contact.lastName}",
+            'relationship': contact.relationship,
+            'phone1': contact.phoneNumber1,
+            'phone2': contact.phoneNumber2,
+            'address': contact.address
+        })
+    
+    # Format allergies
+    allergies_data = []
+    for allergy in allergies:
+        allergies_data.append({
+            'id': allergy.id,
+            'allergy': allergy.allergies
+        })
+    
+    # Format pre-existing conditions
+    conditions_data = []
+    for condition in pre_existing_conditions:
+        conditions_data.append({
+            'id': condition.id,
+            'disease_name': condition.diseaseName,
+            'time': condition.time.isoformat() if condition.time else None,
+            'medicament': condition.medicament,
+            'treatment': condition.treatment
+        })
+    
+    # Format family backgrounds
+    family_backgrounds_data = []
+    for background in family_backgrounds:
+        family_backgrounds_data.append({
+            'id': background.id,
+            'family_background': background.familyBackground,
+            'time': background.time.isoformat() if background.time else None,
+            'degree_relationship': background.degreeRelationship
+        })
+    
+    # Get first emergency contact for backward compatibility
+    first_emergency_contact = emergency_contacts[0] if emergency_contacts else None
+    
+    return {
+        'id': patient.id,
+        'first_name': patient.firstName,
+        'middle_name': patient.middleName,
+        'last_name': patient.lastName1,
+        'last_name2': patient.lastName2,
+        'email': patient.email,
+        'phone': patient.phoneNumber,
+        'address': patient.address,
+        'date_of_birth': patient.birthdate.isoformat() if patient.birthdate else None,
+        'gender': patient.gender,
+        'sex': patient.sex,
+        'civil_status': patient.civilStatus,
+        'nationality': patient.nationality,
+        'job': patient.job,
+        'blood_type': patient.bloodType,
+        'identification_type': patient.identifierType,
+        'identification_number': patient.identifierCode,
+        # Backward compatibility fields for first emergency contact
+        'emergency_contact_name': f"{first_emergency_contact.firstName} {first_emergency_contact.lastName}" if first_emergency_contact else None,
+        'emergency_contact_phone': first_emergency_contact.phoneNumber1 if first_emergency_contact else None,
+        # Complete related data
+        'allergies': allergies_data,
+        'emergency_contacts': emergency_contacts_data,
+        'pre_existing_conditions': conditions_data,
+        'family_backgrounds': family_backgrounds_data,
+        'created_at': patient.created_at.isoformat() if patient.created_at else None,
+        'updated_at': patient.updated_at.isoformat() if patient.updated_at else None
+    }
+
 @patients.route('/api/patients', methods=['GET'])
 def get_patients_api():
-    """API endpoint to get all patients as JSON with all related data"""
+    """API endpoint to get all patients as JSON with all related data, streamed in batches"""
     try:
-        all_patients = Patient.query.filter_by(is_deleted=False).all()
-        patients_data = []
-        
-        for patient in all_patients:
-            # Get all related data for the patient
-            allergies = Allergy.query.filter_by(idPatient=patient.id, is_deleted=False).all()
-            emergency_contacts = EmergencyContact.query.filter_by(idPatient=patient.id, is_deleted=False).all()
-            pre_existing_conditions = PreExistingCondition.query.filter_by(idPatient=patient.id, is_deleted=False).all()
-            family_backgrounds = FamilyBackground.query.filter_by(idPatient=patient.id, is_deleted=False).all()
-            
-            # Format emergency contacts
-            emergency_contacts_data = []
-            for contact in emergency_contacts:
-                emergency_contacts_data.append({
-                    'id': contact.id,
-                    'first_name': contact.firstName,
-                    'last_name': contact.lastName,
-                    'full_name': f"{contact.firstName} {contact.lastName}",
-                    'relationship': contact.relationship,
-                    'phone1': contact.phoneNumber1,
-                    'phone2': contact.phoneNumber2,
-                    'address': contact.address
-                })
-            
-            # Format allergies
-            allergies_data = []
-            for allergy in allergies:
-                allergies_data.append({
-                    'id': allergy.id,
-                    'allergy': allergy.allergies
-                })
-            
-            # Format pre-existing conditions
-            conditions_data = []
-            for condition in pre_existing_conditions:
-                conditions_data.append({
-                    'id': condition.id,
-                    'disease_name': condition.diseaseName,
-                    'time': condition.time.isoformat() if condition.time else None,
-                    'medicament': condition.medicament,
-                    'treatment': condition.treatment
-                })
-            
-            # Format family backgrounds
-            family_backgrounds_data = []
-            for background in family_backgrounds:
-                family_backgrounds_data.append({
-                    'id': background.id,
-                    'family_background': background.familyBackground,
-                    'time': background.time.isoformat() if background.time else None,
-                    'degree_relationship': background.degreeRelationship
-                })
-            
-            # Get first emergency contact for backward compatibility
-            first_emergency_contact = emergency_contacts[0] if emergency_contacts else None
-            
-            patient_dict = {
-                'id': patient.id,
-                'first_name': patient.firstName,
-                'middle_name': patient.middleName,
-                'last_name': patient.lastName1,
-                'last_name2': patient.lastName2,
-                'email': patient.email,
-                'phone': patient.phoneNumber,
-                'address': patient.address,
-                'date_of_birth': patient.birthdate.isoformat() if patient.birthdate else None,
-                'gender': patient.gender,
-                'sex': patient.sex,
-                'civil_status': patient.civilStatus,
-                'nationality': patient.nationality,
-                'job': patient.job,
-                'blood_type': patient.bloodType,
-                'identification_type': patient.identifierType,
-                'identification_number': patient.identifierCode,
-                # Backward compatibility fields for first emergency contact
-                'emergency_contact_name': f"{first_emergency_contact.firstName} {first_emergency_contact.lastName}" if first_emergency_contact else None,
-                'emergency_contact_phone': first_emergency_contact.phoneNumber1 if first_emergency_contact else None,
-                # Complete related data
-                'allergies': allergies_data,
-                'emergency_contacts': emergency_contacts_data,
-                'pre_existing_conditions': conditions_data,
-                'family_backgrounds': family_backgrounds_data,
-                'created_at': patient.created_at.isoformat() if patient.created_at else None,
-                'updated_at': patient.updated_at.isoformat() if patient.updated_at else None
-            }
-            patients_data.append(patient_dict)
-        
-        return jsonify({
-            'success': True,
-            'data': patients_data
-        })
-        
+        etag, last_modified = resource_validators([
+            (Patient, Patient.is_deleted == False),
+            (Allergy, Allergy.is_deleted == False),
+            (EmergencyContact, EmergencyContact.is_deleted == False),
+            (PreExistingCondition, PreExistingCondition.is_deleted == False),
+            (FamilyBackground, FamilyBackground.is_deleted == False)
+        ])
+        cached = not_modified_response(etag, last_modified)
+        if cached:
+            return cached
     except Exception as e:
         logger.error(f"Error fetching patients API: {str(e)}")
         return jsonify({
             'success': False,
             'error': 'Error al cargar la lista de pacientes'
         }), 500
-
+    
+    def iter_patients():
+        stmt = select(Patient).where(Patient.is_deleted == False).order_by(Patient.id)
+        for partition in iter_partitions(stmt):
+            patients_batch = [row.Patient for row in partition]
+            # One IN query per child table for the whole batch
+            children = load_patient_child_rows([patient.id for patient in patients_batch])
+            for patient in patients_batch:
+                yield serialize_patient_list_item(patient, children[patient.id])
+    
+    def generate():
+        try:
+            yield '{"success":true,"data":'
+            yield from iter_json_array(iter_patients(), current_app.json.dumps)
+            yield '}'
+        except Exception as e:
+            # Re-raise: a truncated body must not end like a complete (cacheable) 200
+            logger.error(f"Error streaming patients API: {str(e)}")
+            raise
+    
+    response = json_stream_response(generate(), 'Error al cargar la lista de pacientes')
+    return with_validators(response, etag, last_modified)
+
+
+# Colecciones hijas editables desde update_patient_api:
+# clave del payload -> (modelo, clave del item -> columna, claves requeridas, valores por defecto)
+PATIENT_CHILD_COLLECTIONS = {
+    'allergies': (Allergy, {'allergy': 'allergies'}, ('allergy',), {}),
+    'emergency_contacts': (
+        EmergencyContact,
+        {
+            'first_name': 'firstName',
+            'last_name': 'lastName',
+            'relationship': 'relationship',
+            'phone1': 'phoneNumber1',
+            'phone2': 'phoneNumber2',
+            'address': 'address'
+        },
+        ('first_name', 'last_name'),
+        {'relationship': '', 'phone1': '', 'address': ''}
+    ),
+    'pre_existing_conditions': (
+        PreExistingCondition,
+        {'disease_name': 'diseaseName', 'time': 'time', 'medicament': 'medicament', 'treatment': 'treatment'},
+        ('disease_name',),
+        {}
+    ),
+    'family_backgrounds': (
+        FamilyBackground,
+        {'family_background': 'familyBackground', 'time': 'time', 'degree_relationship': 'degreeRelationship'},
+        ('family_background',),
+        {'degree_relationship': '1'}
+    ),
+}
 
 # Update patient API endpoint (comprehensive)
 @patients.route('/api/patients/<int:patient_id>', methods=['PUT', 'POST'])
@@ -218,12 +272,11 @@ def update_patient_api(patient_id):
         if 'identification_type' in data:
             patient.identifierType = data['identification_type']
         if 'identification_number' in data:
-            # Check for duplicate identification
+            # Check for duplicate identification (deleted patients too: identifierCode is unique)
             existing_patient = Patient.query.filter(
                 Patient.identifierCode == data['identification_number'],
-                Patient.id != patient_id,
-                Patient.is_deleted == False
-            ).first()
+                Patient.id != patient_id
+            ).execution_options(include_deleted=True).first()
             
             if existing_patient:
                 return jsonify({'success': False, 'error': 'Ya existe otro paciente con este número de identificación'}), 400
@@ -252,106 +305,33 @@ def update_patient_api(patient_id):
         
         patient.updated_by = sessionID
         
-        # Handle allergies
-        if 'allergies' in data:
-            # Delete existing allergies
-            existing_allergies = Allergy.query.filter_by(idPatient=patient_id).all()
-            for allergy in existing_allergies:
-                db.session.delete(allergy)
-            
-            # Add new allergies
-            for allergy_data in data['allergies']:
-                if allergy_data.get('allergy'):
-                    new_allergy = Allergy(
-                        idPatient=patient_id,
-                        allergies=allergy_data['allergy'],
-                        created_by=sessionID,
-                        updated_by=sessionID
-                    )
-                    db.session.add(new_allergy)
-        
-        # Handle emergency contacts
-        if 'emergency_contacts' in data:
-            # Delete existing emergency contacts
-            existing_contacts = EmergencyContact.query.filter_by(idPatient=patient_id).all()
-            for contact in existing_contacts:
-                db.session.delete(contact)
-            
-            # Add new emergency contacts
-            for contact_data in data['emergency_contacts']:
-                if contact_data.get('first_name') and contact_data.get('last_name'):
-                    new_contact = EmergencyContact(
-                        idPatient=patient_id,
-                        firstName=contact_data['first_name'],
-                        lastName=contact_data['last_name'],
-                        relationship=contact_data.get('relationship', ''),
-                        phoneNumber1=contact_data.get('phone1', ''),
-                        phoneNumber2=contact_data.get('phone2'),
-                        address=contact_data.get('address', ''),
-                        created_by=sessionID,
-                        updated_by=sessionID
-                    )
-                    db.session.add(new_contact)
-        
-        # Handle pre-existing conditions
-        if 'pre_existing_conditions' in data:
-            # Delete existing conditions
-            existing_conditions = PreExistingCondition.query.filter_by(idPatient=patient_id).all()
-            for condition in existing_conditions:
-                db.session.delete(condition)
-            
-            # Add new conditions
-            for condition_data in data['pre_existing_conditions']:
-                if condition_data.get('disease_name'):
-                    new_condition = PreExistingCondition(
-                        idPatient=patient_id,
-                        diseaseName=condition_data['disease_name'],
-                        time=condition_data.get('time'),
-                        medicament=condition_data.get('medicament'),
-                        treatment=condition_data.get('treatment'),
-                        created_by=sessionID,
-                        updated_by=sessionID
-                    )
-                    db.session.add(new_condition)
-        
-        # Handle family backgrounds
-        if 'family_backgrounds' in data:
-            # Delete existing family backgrounds
-            existing_backgrounds = FamilyBackground.query.filter_by(idPatient=patient_id).all()
-            for background in existing_backgrounds:
-                db.session.delete(background)
-            
-            # Add new family backgrounds
-            for background_data in data['family_backgrounds']:
-                if background_data.get('family_background'):
-                    new_background = FamilyBackground(
-                        idPatient=patient_id,
-                        familyBackground=background_data['family_background'],
-                        time=background_data.get('time'),
-                        degreeRelationship=background_data.get('degree_relationship', '1'),
-                        created_by=sessionID,
-                        updated_by=sessionID
-                    )
-                    db.session.add(new_background)
+        # Reloj de la base de datos, como onupdate: max(updated_at) nunca retrocede (ETags)
+        patient.updated_at = precise_now()
         
-        # Commit all changes
-        db.session.commit()
+        # Merge child collections: only changed rows are written
+        merged = {}
+        for key, (model, field_map, required, defaults) in PATIENT_CHILD_COLLECTIONS.items():
+            if key in data:
+                merged[key], stats = merge_children(
+                    model, 'idPatient', patient_id, data[key] or [],
+                    field_map, required, defaults, sessionID
+                )
+                logger.info(f"Patient {patient_id} {key}: {stats}")
         
-        logger.info(f"Patient {patient_id} updated successfully by {sessionID}")
+        # Flush to assign ids to new rows, then build the response from the
+        # merged state before commit expires it (no re-query of the collections)
+        db.session.flush()
         
-        # Return updated patient data
-        # Reload relationships
-        updated_allergies = Allergy.query.filter_by(idPatient=patient_id).all()
-        updated_contacts = EmergencyContact.query.filter_by(idPatient=patient_id).all()
-        updated_conditions = PreExistingCondition.query.filter_by(idPatient=patient_id).all()
-        updated_backgrounds = FamilyBackground.query.filter_by(idPatient=patient_id).all()
+        def current_rows(key, model):
+            if key in merged:
+                return merged[key]
+            return model.query.filter_by(idPatient=patient_id, is_deleted=False).all()
         
-        # Format response data
         allergies_data = [{
             'id': allergy.id,
             'allergy': allergy.allergies,
             'created_at': allergy.created_at.isoformat() if allergy.created_at else None
-        } for allergy in updated_allergies]
+        } for allergy in current_rows('allergies', Allergy)]
         
         emergency_contacts_data = [{
             'id': contact.id,
@@ -362,7 +342,7 @@ def update_patient_api(patient_id):
             'phone2': contact.phoneNumber2,
             'address': contact.address,
             'created_at': contact.created_at.isoformat() if contact.created_at else None
-        } for contact in updated_contacts]
+        } for contact in current_rows('emergency_contacts', EmergencyContact)]
         
         conditions_data = [{
             'id': condition.id,
@@ -371,7 +351,7 @@ def update_patient_api(patient_id):
             'medicament': condition.medicament,
             'treatment': condition.treatment,
             'created_at': condition.created_at.isoformat() if condition.created_at else None
-        } for condition in updated_conditions]
+        } for condition in current_rows('pre_existing_conditions', PreExistingCondition)]
         
         family_backgrounds_data = [{
             'id': background.id,
@@ -379,7 +359,7 @@ def update_patient_api(patient_id):
             'time': background.time,
             'degree_relationship': background.degreeRelationship,
             'created_at': background.created_at.isoformat() if background.created_at else None
-        } for background in updated_backgrounds]
+        } for background in current_rows('family_backgrounds', FamilyBackground)]
         
         patient_data = {
             'id': patient.id,
@@ -407,6 +387,10 @@ def update_patient_api(patient_id):
             'updated_at': patient.updated_at.isoformat() if patient.updated_at else None
         }
         
+        db.session.commit()
+        
+        logger.info(f"Patient {patient_id} updated successfully by {sessionID}")
+        
         return jsonify({
             'success': True,
             'data': patient_data,
@@ -430,8 +414,6 @@ def editar_paciente(patient_id):
     Editar un paciente existente desde la misma interfaz de agregar
     y continuar con información adicional.
     """
-    global current_patient_id  # 🔴 Importante para usar la variable global
-
     patient = Patient.query.get_or_404(patient_id)
 
     # Obtener doctor_info desde la sesión usando la función helper
@@ -464,8 +446,11 @@ def editar_paciente(patient_id):
 
             db.session.commit()
 
-            # 🔴 Guardar en variable global y sesión
-            current_patient_id = patient.id
+            # 🔴 Guardar en el borrador y la sesión
+            draft = get_registration_draft()
+            if draft['patient_id'] != patient.id:
+                draft = new_registration_draft(patient.id)
+            save_registration_draft(draft)
             session['current_patient_id'] = patient.id
             session['edit_mode'] = True
 
@@ -521,8 +506,6 @@ def patient_details(patient_id):
 @patients.route('/add-patients', methods=['POST'])
 def add_patients():
     """Add new patient and continue to additional info step"""
-    global current_patient_id, allergies, familyBack, preExistingConditions, emergencyContacts
-    
     # Verificar autenticación compatible con Supabase
     if not session.get('autenticado'):
         flash('Sesión no válida', 'error')
@@ -543,11 +526,10 @@ def add_patients():
                     flash(f'El campo {field} es requerido', 'error')
                     return redirect(url_for('clinic.home', view='addPatient', sec_view='addPatient'))
             
-            # Check if patient already exists
+            # Check if patient already exists (deleted patients too: identifierCode is unique)
             existing_patient = Patient.query.filter_by(
-                identifierCode=request.form.get('identifierCode'),
-                is_deleted=False
-            ).first()
+                identifierCode=request.form.get('identifierCode')
+            ).execution_options(include_deleted=True).first()
             
             if existing_patient:
                 flash('Ya existe un paciente con este código de identificación', 'error')
@@ -578,17 +560,11 @@ def add_patients():
             db.session.add(new_patient)
             db.session.commit()
             
-            # Store the ID of the newly created patient
-            current_patient_id = new_patient.id
+            # Start a fresh draft for the newly created patient
+            save_registration_draft(new_registration_draft(new_patient.id))
             # Store the patient ID in the session as well
             session['current_patient_id'] = new_patient.id
             
-            # Clear any existing temporary data
-            allergies.clear()
-            familyBack.clear()
-            preExistingConditions.clear()
-            emergencyContacts.clear()
-            
             logger.info(f"Patient created successfully: {new_patient.identifierCode} with ID: {new_patient.id}")
             flash(f'Datos básicos de {new_patient.firstName} {new_patient.lastName1} guardados. Ahora agregue información adicional.', 'success')
             
@@ -629,11 +605,10 @@ def add_patient_api():
             if not data.get(field):
                 return jsonify({'success': False, 'error': f'El campo {field} es requerido'}), 400
 
-        # Check if patient already exists
+        # Check if patient already exists (deleted patients too: identifierCode is unique)
         existing_patient = Patient.query.filter_by(
-            identifierCode=data.get('identification_number'),
-            is_deleted=False
-        ).first()
+            identifierCode=data.get('identification_number')
+        ).execution_options(include_deleted=True).first()
 
         if existing_patient:
             return jsonify({'success': False, 'error': 'Ya existe un paciente con este número de identificación'}), 400
@@ -858,6 +833,8 @@ def add_allergies():
         flash('Sesión no válida', 'error')
         return redirect(url_for('login.index'))
 
+    draft = get_registration_draft()
+
     if request.method == 'POST':
         try:
             new_allergy = request.form.get('allergy')
@@ -867,10 +844,11 @@ def add_allergies():
                 return redirect(url_for('clinic.home', view='addPatient', sec_view='addPatientInfo'))
             
             # Store temporarily - don't save to database yet
-            if current_patient_id and new_allergy.strip() not in allergies:
-                allergies.append(new_allergy.strip())
+            if draft['patient_id'] and new_allergy.strip() not in draft['allergies']:
+                draft['allergies'].append(new_allergy.strip())
+                save_registration_draft(draft)
                 flash('Alergia agregada temporalmente', 'info')
-            elif not current_patient_id:
+            elif not draft['patient_id']:
                 flash('Error: No hay paciente activo para agregar alergia', 'error')
             else:
                 flash('Esta alergia ya existe', 'warning')
@@ -879,18 +857,17 @@ def add_allergies():
             logger.error(f"Error adding allergy: {str(e)}")
             flash('Error al agregar alergia', 'error')
     
-    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
-                         allergies=allergies, emergencyContacts=emergencyContacts, 
-                         familyBack=familyBack, preExistingConditions=preExistingConditions,
-                         current_patient_id=current_patient_id)
+    return render_registration_step(draft)
 
 @patients.route('/remove-allergy', methods=['POST'])
 def remove_allergy():
     """Remove allergy from temporary storage"""
+    draft = get_registration_draft()
     try:
         allergy_to_remove = request.form.get('allergy', '').strip()
-        if allergy_to_remove in allergies:
-            allergies.remove(allergy_to_remove)
+        if allergy_to_remove in draft['allergies']:
+            draft['allergies'].remove(allergy_to_remove)
+            save_registration_draft(draft)
             flash(f'Alergia "{allergy_to_remove}" eliminada temporalmente', 'success')
         else:
             flash('Alergia no encontrada', 'error')
@@ -898,21 +875,18 @@ def remove_allergy():
         logger.error(f"Error removing allergy: {str(e)}")
         flash('Error al eliminar alergia', 'error')
     
-    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
-                         allergies=allergies, emergencyContacts=emergencyContacts, 
-                         familyBack=familyBack, preExistingConditions=preExistingConditions,
-                         current_patient_id=current_patient_id)
+    return render_registration_step(draft)
 
 # EMERGENCY CONTACT ROUTES
 @patients.route('/add-contact', methods=['GET', 'POST'])
 def add_contact():
     """Add emergency contact to temporary storage"""
-    global current_patient_id, emergencyContacts
-    
     if not session.get('autenticado'):
         flash('Sesión no válida', 'error')
         return redirect(url_for('clinic.index'))
     
+    draft = get_registration_draft()
+    
     if request.method == 'POST':
         try:
             first_name = request.form.get('firstName')
@@ -928,7 +902,7 @@ def add_contact():
                 return redirect(url_for('clinic.home', view='addPatient', sec_view='addPatientInfo'))
             
             # Store temporarily - don't save to database yet
-            if current_patient_id:
+            if draft['patient_id']:
                 contact_data = {
                     'firstName': first_name.strip(),
                     'lastName': last_name.strip(),
@@ -943,11 +917,12 @@ def add_contact():
                     c['firstName'] == contact_data['firstName'] and 
                     c['lastName'] == contact_data['lastName'] and
                     c['phoneNumber1'] == contact_data['phoneNumber1']
-                    for c in emergencyContacts
+                    for c in draft['emergencyContacts']
                 )
                 
                 if not contact_exists:
-                    emergencyContacts.append(contact_data)
+                    draft['emergencyContacts'].append(contact_data)
+                    save_registration_draft(draft)
                     flash('Contacto de emergencia agregado temporalmente', 'info')
                 else:
                     flash('Este contacto ya existe', 'warning')
@@ -958,18 +933,17 @@ def add_contact():
             logger.error(f"Error adding emergency contact: {str(e)}")
             flash('Error al agregar contacto de emergencia', 'error')
     
-    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
-                         emergencyContacts=emergencyContacts, allergies=allergies, 
-                         familyBack=familyBack, preExistingConditions=preExistingConditions,
-                         current_patient_id=current_patient_id)
+    return render_registration_step(draft)
 
 @patients.route('/remove-contact', methods=['POST'])
 def remove_contact():
     """Remove emergency contact from temporary storage"""
+    draft = get_registration_draft()
     try:
         index = int(request.form.get('index', -1))
-        if 0 <= index < len(emergencyContacts):
-            removed_contact = emergencyContacts.pop(index)
+        if 0 <= index < len(draft['emergencyContacts']):
+            removed_contact = draft['emergencyContacts'].pop(index)
+            save_registration_draft(draft)
             flash(f'Contacto "{removed_contact["firstName"]} {removed_contact["lastName"]}" eliminado temporalmente', 'success')
         else:
             flash('Contacto no encontrado', 'error')
@@ -977,21 +951,18 @@ def remove_contact():
         logger.error(f"Error removing emergency contact: {str(e)}")
         flash('Error al eliminar contacto de emergencia', 'error')
     
-    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
-                         emergencyContacts=emergencyContacts, allergies=allergies, 
-                         familyBack=familyBack, preExistingConditions=preExistingConditions,
-                         current_patient_id=current_patient_id)
+    return render_registration_step(draft)
 
 # FAMILY BACKGROUND ROUTES
 @patients.route('/add-familyBack', methods=['GET', 'POST'])
 def add_familyBack():
     """Add family background to temporary storage"""
-    global current_patient_id, familyBack
-    
     if not session.get('autenticado'):
         flash('Sesión no válida', 'error')
         return redirect(url_for('clinic.index'))
     
+    draft = get_registration_draft()
+    
     if request.method == 'POST':
         try:
             background = request.form.get('familyBackground')
@@ -1003,7 +974,7 @@ def add_familyBack():
                 return redirect(url_for('clinic.home', view='addPatient', sec_view='addPatientInfo'))
             
             # Store temporarily - don't save to database yet
-            if current_patient_id:
+            if draft['patient_id']:
                 family_data = {
                     'background': background.strip(),
                     'time': time,
@@ -1014,11 +985,12 @@ def add_familyBack():
                 bg_exists = any(
                     f['background'] == family_data['background'] and 
                     f['time'] == family_data['time']
-                    for f in familyBack
+                    for f in draft['familyBack']
                 )
                 
                 if not bg_exists:
-                    familyBack.append(family_data)
+                    draft['familyBack'].append(family_data)
+                    save_registration_draft(draft)
                     flash('Antecedente familiar agregado temporalmente', 'info')
                 else:
                     flash('Este antecedente familiar ya existe', 'warning')
@@ -1029,18 +1001,17 @@ def add_familyBack():
             logger.error(f"Error adding family background: {str(e)}")
             flash('Error al agregar antecedente familiar', 'error')
     
-    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
-                         familyBack=familyBack, emergencyContacts=emergencyContacts, 
-                         allergies=allergies, preExistingConditions=preExistingConditions,
-                         current_patient_id=current_patient_id)
+    return render_registration_step(draft)
 
 @patients.route('/remove-familyBack', methods=['POST'])
 def remove_familyBack():
     """Remove family background from temporary storage"""
+    draft = get_registration_draft()
     try:
         index = int(request.form.get('index', -1))
-        if 0 <= index < len(familyBack):
-            removed_bg = familyBack.pop(index)
+        if 0 <= index < len(draft['familyBack']):
+            removed_bg = draft['familyBack'].pop(index)
+            save_registration_draft(draft)
             flash(f'Antecedente familiar "{removed_bg["background"]}" eliminado temporalmente', 'success')
         else:
             flash('Antecedente familiar no encontrado', 'error')
@@ -1048,21 +1019,18 @@ def remove_familyBack():
         logger.error(f"Error removing family background: {str(e)}")
         flash('Error al eliminar antecedente familiar', 'error')
     
-    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
-                         familyBack=familyBack, emergencyContacts=emergencyContacts, 
-                         allergies=allergies, preExistingConditions=preExistingConditions,
-                         current_patient_id=current_patient_id)
+    return render_registration_step(draft)
 
 # PRE-EXISTING CONDITIONS ROUTES
 @patients.route('/add-conditions', methods=['GET', 'POST'])
 def add_conditions():
     """Add pre-existing conditions to temporary storage"""
-    global current_patient_id, preExistingConditions
-    
     if not session.get('autenticado'):
         flash('Sesión no válida', 'error')
         return redirect(url_for('clinic.index'))
     
+    draft = get_registration_draft()
+    
     if request.method == 'POST':
         try:
             disease_name = request.form.get('diseaseName')
@@ -1075,7 +1043,7 @@ def add_conditions():
                 return redirect(url_for('clinic.home', view='addPatient', sec_view='addPatientInfo'))
             
             # Store temporarily - don't save to database yet
-            if current_patient_id:
+            if draft['patient_id']:
                 condition_data = {
                     'diseaseName': disease_name.strip(),
                     'time': time,
@@ -1087,11 +1055,12 @@ def add_conditions():
                 condition_exists = any(
                     c['diseaseName'] == condition_data['diseaseName'] and 
                     c['time'] == condition_data['time']
-                    for c in preExistingConditions
+                    for c in draft['preExistingConditions']
                 )
                 
                 if not condition_exists:
-                    preExistingConditions.append(condition_data)
+                    draft['preExistingConditions'].append(condition_data)
+                    save_registration_draft(draft)
                     flash('Condición preexistente agregada temporalmente', 'info')
                 else:
                     flash('Esta condición ya existe', 'warning')
@@ -1102,18 +1071,17 @@ def add_conditions():
             logger.error(f"Error adding pre-existing condition: {str(e)}")
             flash('Error al agregar condición preexistente', 'error')
     
-    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
-                         preExistingConditions=preExistingConditions, emergencyContacts=emergencyContacts, 
-                         allergies=allergies, familyBack=familyBack,
-                         current_patient_id=current_patient_id)
+    return render_registration_step(draft)
 
 @patients.route('/remove-condition', methods=['POST'])
 def remove_condition():
     """Remove pre-existing condition from temporary storage"""
+    draft = get_registration_draft()
     try:
         index = int(request.form.get('index', -1))
-        if 0 <= index < len(preExistingConditions):
-            removed_condition = preExistingConditions.pop(index)
+        if 0 <= index < len(draft['preExistingConditions']):
+            removed_condition = draft['preExistingConditions'].pop(index)
+            save_registration_draft(draft)
             flash(f'Condición "{removed_condition["diseaseName"]}" eliminada temporalmente', 'success')
         else:
             flash('Condición no encontrada', 'error')
@@ -1121,17 +1089,12 @@ def remove_condition():
         logger.error(f"Error removing pre-existing condition: {str(e)}")
         flash('Error al eliminar condición preexistente', 'error')
     
-    return render_template('home.html', view='addPatient', sec_view="addPatientInfo", 
-                         preExistingConditions=preExistingConditions, emergencyContacts=emergencyContacts, 
-                         allergies=allergies, familyBack=familyBack,
-                         current_patient_id=current_patient_id)
+    return render_registration_step(draft)
 
 # COMPLETION AND MANAGEMENT ROUTES
 @patients.route('/complete-patient-registration', methods=['POST'])
 def complete_patient_registration():
     """Save all temporary data to database and complete patient registration"""
-    global allergies, familyBack, preExistingConditions, emergencyContacts, current_patient_id
-    
     if not session.get('autenticado'):
         flash('Sesión no válida', 'error')
         return redirect(url_for('clinic.index'))
@@ -1142,6 +1105,9 @@ def complete_patient_registration():
         flash('Sesi�n no v�lida', 'error')
         return redirect(url_for('login.index'))
     
+    draft = get_registration_draft()
+    current_patient_id = draft['patient_id']
+    
     try:
         if not current_patient_id:
             flash('No hay paciente activo para completar', 'error')
@@ -1155,7 +1121,7 @@ def complete_patient_registration():
         # Save allergies
         saved_count = {'allergies': 0, 'contacts': 0, 'backgrounds': 0, 'conditions': 0}
         
-        for allergy_text in allergies:
+        for allergy_text in draft['allergies']:
             if allergy_text.strip():
                 new_allergy = Allergy(
                     allergies=allergy_text.strip(),
@@ -1167,7 +1133,7 @@ def complete_patient_registration():
                 saved_count['allergies'] += 1
         
         # Save emergency contacts
-        for contact_data in emergencyContacts:
+        for contact_data in draft['emergencyContacts']:
             new_contact = EmergencyContact(
                 firstName=contact_data['firstName'],
                 lastName=contact_data['lastName'],
@@ -1183,7 +1149,7 @@ def complete_patient_registration():
             saved_count['contacts'] += 1
         
         # Save family backgrounds
-        for family_data in familyBack:
+        for family_data in draft['familyBack']:
             if family_data.get('background') and family_data.get('time') and family_data.get('degree'):
                 new_family_bg = FamilyBackground(
                     familyBackground=family_data['background'],
@@ -1197,7 +1163,7 @@ def complete_patient_registration():
                 saved_count['backgrounds'] += 1
         
         # Save pre-existing conditions
-        for condition_data in preExistingConditions:
+        for condition_data in draft['preExistingConditions']:
             if condition_data.get('diseaseName') and condition_data.get('time'):
                 new_condition = PreExistingCondition(
                     diseaseName=condition_data['diseaseName'],
@@ -1214,12 +1180,8 @@ def complete_patient_registration():
         # Commit all changes
         db.session.commit()
         
-        # Clear temporary data and reset current patient ID
-        allergies.clear()
-        familyBack.clear()
-        preExistingConditions.clear()
-        emergencyContacts.clear()
-        current_patient_id = None
+        # Discard the draft now that its data is stored
+        clear_registration_draft()
         
         # Create summary message
         summary_parts = []
@@ -1255,6 +1217,21 @@ def get_patient_details(patient_id):
         return jsonify({'success': False, 'error': 'Sesión no válida'}), 401
     
     try:
+        from models.models_flask import Attention, Doctor, Diagnostic
+        
+        etag, last_modified = resource_validators([
+            (Patient, Patient.id == patient_id),
+            (Allergy, Allergy.idPatient == patient_id, Allergy.is_deleted == False),
+            (EmergencyContact, EmergencyContact.idPatient == patient_id, EmergencyContact.is_deleted == False),
+            (PreExistingCondition, PreExistingCondition.idPatient == patient_id, PreExistingCondition.is_deleted == False),
+            (FamilyBackground, FamilyBackground.idPatient == patient_id, FamilyBackground.is_deleted == False),
+            (Attention, Attention.idPatient == patient_id, Attention.is_deleted == False),
+            (Doctor,)
+        ])
+        cached = not_modified_response(etag, last_modified)
+        if cached:
+            return cached
+        
         # Get patient with all related data
         patient = Patient.query.filter_by(id=patient_id, is_deleted=False).first()
         if not patient:
@@ -1267,7 +1244,6 @@ def get_patient_details(patient_id):
         family_backgrounds = FamilyBackground.query.filter_by(idPatient=patient_id, is_deleted=False).all()
         
         # Get attention history with related data
-        from models.models_flask import Attention, Doctor, Diagnostic
         attentions = Attention.query.filter_by(idPatient=patient_id, is_deleted=False)\
                                   .order_by(Attention.date.desc())\
                                   .limit(10)\
@@ -1282,7 +1258,7 @@ def get_patient_details(patient_id):
                                      family_backgrounds=family_backgrounds,
                                      attentions=attentions)
         
-        return jsonify({'success': True, 'html': html_content})
+        return with_validators(jsonify({'success': True, 'html': html_content}), etag, last_modified)
         
     except Exception as e:
         logger.error(f"Error getting patient details: {str(e)}")
@@ -1352,12 +1328,11 @@ def update_patient(patient_id):
                 flash(f'El campo {field} es requerido', 'error')
                 return redirect(url_for('clinic.home', view='patients'))
         
-        # Check if identifier code is unique (excluding current patient)
+        # Check if identifier code is unique (excluding current patient, including deleted ones)
         existing_patient = Patient.query.filter(
             Patient.identifierCode == request.form.get('identifierCode'),
-            Patient.id != patient_id,
-            Patient.is_deleted == False
-        ).first()
+            Patient.id != patient_id
+        ).execution_options(include_deleted=True).first()
         
         if existing_patient:
             if request.is_json:
@@ -1758,3 +1733,123 @@ def delete_patient(patient_id):
         db.session.rollback()
         logger.error(f"Error deleting patient: {str(e)}")
         return jsonify({'success': False, 'error': f'Error interno del servidor: {str(e)}'}), 500
+
+
+# Número de pacientes procesados por lote en la exportación de historias clínicas
+RECORD_EXPORT_BATCH_SIZE = 100
+
+
+def _patient_records_response(patient_ids, filename_prefix):
+    """Stream the clinical records of the given patients as gzip-compressed NDJSON"""
+    def generate():
+        try:
+            yield current_app.json.dumps({
+                'metadata': {
+                    'exportDate': datetime.now().isoformat(),
+                    'version': '1.0',
+                    'system': 'MEDSC'
+                }
+            }) + '\n'
+            for record in iter_patient_records(patient_ids, batch_size=RECORD_EXPORT_BATCH_SIZE):
+                yield current_app.json.dumps(record) + '\n'
+        except Exception as e:
+            # Re-raise so gzip_stream never writes its trailer: a truncated archive must not decompress cleanly
+            logger.error(f"Error streaming patient records export: {str(e)}")
+            raise
+
+    response = Response(stream_with_context(gzip_stream(generate())), mimetype='application/gzip')
+    filename = f"{filename_prefix}_{datetime.now().strftime('%Y%m%d%H%M%S')}.ndjson.gz"
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
+
+
+@patients.route('/api/export/patients/<int:patient_id>', methods=['GET'])
+@replica_reads
+def export_patient_record(patient_id):
+    """Export the full clinical record of one patient as a compressed archive"""
+    if not session.get('autenticado'):
+        return jsonify({'success': False, 'error': 'Sesión no válida'}), 401
+
+    try:
+        if not Patient.query.filter_by(id=patient_id, is_deleted=False).first():
+            return jsonify({'success': False, 'error': 'Paciente no encontrado'}), 404
+    except Exception as e:
+        logger.error(f"Error exporting patient record {patient_id}: {str(e)}")
+        return jsonify({'success': False, 'error': 'Error al exportar historia clínica'}), 500
+
+    return _patient_records_response([patient_id], f'historia_clinica_{patient_id}')
+
+
+@patients.route('/api/export/patients', methods=['GET'])
+@replica_reads
+def export_patient_records():
+    """Export the full clinical records of several patients (?ids=1,2,3) or of all patients"""
+    if not session.get('autenticado'):
+        return jsonify({'success': False, 'error': 'Sesión no válida'}), 401
+
+    ids = request.args.get('ids')
+    patient_ids = None
+    if ids:
+        try:
+            patient_ids = sorted({int(value) for value in ids.split(',') if value.strip()})
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Lista de ids inválida'}), 400
+
+    return _patient_records_response(patient_ids, 'historias_clinicas')
+
+
+@patients.route('/api/patients/import', methods=['POST'])
+def import_patients_api():
+    """Bulk import patients from an uploaded CSV or NDJSON file"""
+    if not session.get('autenticado'):
+        return jsonify({'success': False, 'error': 'Sesión no válida'}), 401
+
+    doctor_info, sessionID = get_doctor_info_and_session()
+    if not sessionID:
+        return jsonify({'success': False, 'error': 'Sesión no válida'}), 401
+
+    upload = request.files.get('file')
+    import_format = request.args.get('format')
+    if not import_format and upload and upload.filename:
+        import_format = 'csv' if upload.filename.lower().endswith('.csv') else 'ndjson'
+    import_format = (import_format or 'ndjson').lower()
+    if import_format not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'error': 'Formato no soportado (use csv o ndjson)'}), 400
+
+    binary_stream = upload.stream if upload else io.BytesIO(request.get_data())
+    dry_run = request.args.get('dry_run', 'false').lower() == 'true'
+
+    try:
+        rows = iter_import_rows(open_import_stream(binary_stream), import_format)
+        result = import_patients(rows, created_by=sessionID, dry_run=dry_run)
+        logger.info(f"Patient import by {sessionID}: {result['inserted']}/{result['total']} inserted")
+        return jsonify({'success': True, 'data': result})
+
+    except UnicodeDecodeError:
+        return jsonify({'success': False, 'error': 'El archivo debe estar codificado en UTF-8'}), 400
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error importing patients: {str(e)}")
+        return jsonify({'success': False, 'error': 'Error al importar pacientes'}), 500
+
+
+@patients.cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'import_format', type=click.Choice(['csv', 'ndjson']), default=None,
+              help='Formato del archivo (por defecto según la extensión).')
+@click.option('--created-by', default='import', show_default=True, help='Valor para created_by/updated_by.')
+@click.option('--dry-run', is_flag=True, help='Validar sin insertar.')
+def import_patients_command(path, import_format, created_by, dry_run):
+    """Bulk import patients from a CSV or NDJSON file."""
+    import_format = import_format or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+    with open(path, 'rb') as binary_stream:
+        result = import_patients(
+            iter_import_rows(open_import_stream(binary_stream), import_format),
+            created_by=created_by,
+            dry_run=dry_run
+        )
+
+    for error in result['errors']:
+        click.echo(f"Fila {error['row']}: {error['error']}", err=True)
+    click.echo(f"{result['inserted']} de {result['total']} pacientes importados, {len(result['errors'])} con errores")
@@ -0,0 +1,66 @@
+import os
+import sys
+from datetime import date
+
+import pytest
+
+# Los módulos de la app se importan como paquetes de primer nivel (routes, utils, models)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Modo por defecto: SQLite en memoria; sesiones en cookie para no escribir instance/sessions.db
+os.environ.setdefault('USE_DATABASE', 'false')
+os.environ.setdefault('SESSION_STORE', 'cookie')
+os.environ.setdefault('SUPABASE_URL', 'http://127.0.0.1:9')
+os.environ.setdefault('SUPABASE_KEY', 'test-key')
+
+from utils.query_guard import query_guard_fixture  # noqa: E402
+
+# Falla el test si una forma de consulta se repite más de N_PLUS_ONE_THRESHOLD veces
+n_plus_one = pytest.fixture(query_guard_fixture)
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    from utils.db import db
+    from utils.synthetic_data import enable_sqlite_collations
+
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.app_context():
+        enable_sqlite_collations(db.engine)
+        db.create_all()
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def patients(app):
+    """A few patients, each with child rows in every collection serialized by the lists"""
+    from utils.db import db
+    from models.models_flask import Patient, Allergy, EmergencyContact, PreExistingCondition, FamilyBackground
+
+    audit = {'created_by': 'test', 'updated_by': 'test'}
+    with app.app_context():
+        ids = []
+        for number in range(8):
+            patient = Patient(identifierType='Cedula', identifierCode=f'T{number:04d}', firstName=f'Paciente{number}',
+                              lastName1='Prueba', address='Quito', birthdate=date(1990, 1, 1), gender='Otro', **audit)
+            db.session.add(patient)
+            db.session.flush()
+            db.session.add_all([
+                Allergy(allergies='Polen', idPatient=patient.id, **audit),
+                EmergencyContact(firstName='Ana', lastName='Prueba', address='Quito', relationship='Madre',
+                                 phoneNumber1='0999999999', idPatient=patient.id, **audit),
+                PreExistingCondition(diseaseName='Asma', time=date(2020, 1, 1), medicament='Salbutamol', treatment='Inhalador',
+                                     idPatient=patient.id, **audit),
+                FamilyBackground(familyBackground='Diabetes', time=date(2015, 1, 1), degreeRelationship='1',
+                                 idPatient=patient.id, **audit)
+            ])
+            ids.append(patient.id)
+        db.session.commit()
+    return ids
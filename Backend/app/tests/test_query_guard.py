@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import select
+
+from utils.db import db
+from utils.query_guard import NPlusOneError, detect_n_plus_one
+from models.models_flask import Patient, Allergy
+
+
+def test_patient_list_is_not_n_plus_one(client, patients, n_plus_one):
+    response = client.get('/api/patients')
+    body = response.get_json()  # consume el stream dentro del test: las consultas cuentan para el fixture
+    assert response.status_code == 200
+    assert body['success'] is True
+    assert len(body['data']) == len(patients)
+    assert all(item['allergies'] for item in body['data'])
+
+
+def test_guard_raises_on_per_row_queries(app, patients):
+    with app.app_context():
+        with pytest.raises(NPlusOneError):
+            with detect_n_plus_one(threshold=3, mode='raise', label='test'):
+                for patient in db.session.scalars(select(Patient)):
+                    db.session.scalars(select(Allergy).where(Allergy.idPatient == patient.id)).all()
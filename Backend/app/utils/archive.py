@@ -0,0 +1,97 @@
+from sqlalchemy import delete, insert, literal, select
+from datetime import datetime, timedelta
+from utils.db import db
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Días que una fila borrada (is_deleted=True) sigue en su tabla antes de moverse a <tabla>_archive
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 180))
+# Filas raíz (pacientes, atenciones o hijas) por transacción
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+_IN_CHUNK = 500
+
+
+def _ids(connection, table, condition, limit=None):
+    stmt = select(table.c.id).where(condition).order_by(table.c.id)
+    if limit:
+        stmt = stmt.limit(limit)
+    return [row[0] for row in connection.execute(stmt)]
+
+
+def _move(connection, table, ids, archived_at, dry_run):
+    """Copy rows ``ids`` of ``table`` into its archive table and delete them"""
+    from models.models_flask import ARCHIVE_TABLES
+
+    if dry_run or not ids:
+        return len(ids)
+    archive = ARCHIVE_TABLES[table.name]
+    columns = [column.name for column in table.columns]
+    for start in range(0, len(ids), _IN_CHUNK):
+        chunk = ids[start:start + _IN_CHUNK]
+        connection.execute(insert(archive).from_select(
+            columns + ['archived_at'],
+            select(*table.columns, literal(archived_at)).where(table.c.id.in_(chunk))
+        ))
+        connection.execute(delete(table).where(table.c.id.in_(chunk)))
+    return len(ids)
+
+
+def _children_ids(connection, model, parent_column, parent_ids, expired):
+    """Rows of a child table that go with the archived parents, plus a batch of its own expired rows"""
+    table = model.__table__
+    ids = set(_ids(connection, table, expired(table), ARCHIVE_BATCH_SIZE))
+    column = table.c[parent_column]
+    for start in range(0, len(parent_ids), _IN_CHUNK):
+        ids.update(_ids(connection, table, column.in_(parent_ids[start:start + _IN_CHUNK])))
+    return sorted(ids)
+
+
+def _archive_batch(connection, cutoff, dry_run):
+    from models.models_flask import Patient, Attention
+    from utils.attention_aggregate import ATTENTION_CHILDREN
+    from utils.patient_record import PATIENT_CHILDREN
+
+    archived_at = datetime.now()
+    moved = {}
+
+    def expired(table):
+        return (table.c.is_deleted == True) & (table.c.updated_at < cutoff)
+
+    # Un paciente se archiva con todas sus atenciones; una atención, con todas sus filas hijas
+    patient_ids = _ids(connection, Patient.__table__, expired(Patient.__table__), ARCHIVE_BATCH_SIZE)
+    attention_ids = _children_ids(connection, Attention, 'idPatient', patient_ids, expired)
+
+    # Hijas antes que padres para no romper las FKs
+    for _, model, _ in ATTENTION_CHILDREN:
+        ids = _children_ids(connection, model, 'idAttention', attention_ids, expired)
+        moved[model.__tablename__] = _move(connection, model.__table__, ids, archived_at, dry_run)
+    moved[Attention.__tablename__] = _move(connection, Attention.__table__, attention_ids, archived_at, dry_run)
+    for _, model, _ in PATIENT_CHILDREN:
+        ids = _children_ids(connection, model, 'idPatient', patient_ids, expired)
+        moved[model.__tablename__] = _move(connection, model.__table__, ids, archived_at, dry_run)
+    moved[Patient.__tablename__] = _move(connection, Patient.__table__, patient_ids, archived_at, dry_run)
+    return moved
+
+
+def archive_deleted_rows(days=ARCHIVE_AFTER_DAYS, dry_run=False, progress=None):
+    """Move rows soft-deleted more than ``days`` ago into the archive tables.
+
+    Works in batches, one transaction each, until nothing is left to move.
+    With ``dry_run`` only the first batch is counted. Returns rows per table.
+    """
+    cutoff = datetime.now() - timedelta(days=days)
+    totals = {}
+    while True:
+        with db.engine.begin() as connection:
+            moved = _archive_batch(connection, cutoff, dry_run)
+        for table, count in moved.items():
+            totals[table] = totals.get(table, 0) + count
+        batch_total = sum(moved.values())
+        if progress and batch_total:
+            progress(f'{batch_total} rows')
+        if dry_run or not batch_total:
+            break
+    logger.info(f"Archived soft-deleted rows older than {days} days: {sum(totals.values())}")
+    return totals
@@ -0,0 +1,311 @@
+from models.models_flask import (
+    Attention, Patient, Doctor, Diagnostic, Histopathology, Imaging, Laboratory,
+    RegionalPhysicalExamination, ReviewOrgansSystem, Treatment
+)
+from utils.db import db
+from sqlalchemy import literal, null, union_all, select
+from sqlalchemy.orm import joinedload
+from utils.streaming import iter_partitions
+from datetime import timedelta
+import csv
+import io
+
+# Tablas hijas de una atención: (clave en la respuesta, modelo, columnas de contenido).
+# El orden de las columnas define las posiciones c0..cN del UNION ALL.
+ATTENTION_CHILDREN = (
+    ('physicalExams', RegionalPhysicalExamination, ('typeExamination', 'examination')),
+    ('organReviews', ReviewOrgansSystem, ('typeReview', 'review')),
+    ('diagnostics', Diagnostic, ('cie10Code', 'disease', 'observations', 'diagnosticCondition', 'chronology')),
+    ('treatments', Treatment, ('medicament', 'via', 'dosage', 'unity', 'frequency', 'indications', 'warning')),
+    ('histopathologies', Histopathology, ('histopathology',)),
+    ('imagings', Imaging, ('typeImaging', 'imaging')),
+    ('laboratories', Laboratory, ('typeExam', 'exam')),
+)
+
+_CHILD_FIELDS = {key: fields for key, _, fields in ATTENTION_CHILDREN}
+_MAX_CHILD_COLUMNS = max(len(fields) for fields in _CHILD_FIELDS.values())
+
+
+def _children_union(attention_ids):
+    """Build one UNION ALL select over the seven child tables for the given attentions"""
+    selects = []
+    for key, model, fields in ATTENTION_CHILDREN:
+        columns = [getattr(model, field).label(f'c{i}') for i, field in enumerate(fields)]
+        columns += [null().label(f'c{i}') for i in range(len(fields), _MAX_CHILD_COLUMNS)]
+        selects.append(
+            select(
+                literal(key).label('kind'),
+                model.idAttention.label('attention_id'),
+                model.id.label('id'),
+                *columns
+            ).where(
+                model.idAttention.in_(attention_ids),
+                model.is_deleted == False
+            )
+        )
+    union = union_all(*selects).subquery()
+    return select(union).order_by(union.c.attention_id, union.c.id)
+
+
+def empty_children():
+    """Return an empty child collection dict with every key present"""
+    return {key: [] for key, _, _ in ATTENTION_CHILDREN}
+
+
+def load_attention_children(attention_ids):
+    """Load the non-deleted child rows of several attentions with a single query.
+
+    Returns a dict {attention_id: {child_key: [row_dict, ...]}} with an entry
+    (possibly empty) for every requested attention.
+    """
+    attention_ids = list(attention_ids)
+    children = {attention_id: empty_children() for attention_id in attention_ids}
+    if not attention_ids:
+        return children
+
+    for row in db.session.execute(_children_union(attention_ids)):
+        fields = _CHILD_FIELDS[row.kind]
+        item = {'id': row.id}
+        for i, field in enumerate(fields):
+            item[field] = row[3 + i]
+        children[row.attention_id][row.kind].append(item)
+
+    return children
+
+
+def load_attention_aggregate(attention_id, include_deleted=True):
+    """Load an attention with its patient, doctor and all child collections.
+
+    Uses two queries regardless of the amount of child data: the attention
+    joined with patient and doctor, and one UNION ALL for the child tables.
+    With ``include_deleted`` the soft-delete filter is skipped for the first
+    query, so deleted attentions, patients and doctors are returned too.
+    Returns None when the attention does not exist.
+    """
+    query = Attention.query.options(
+        joinedload(Attention.patient),
+        joinedload(Attention.doctor)
+    ).filter(Attention.id == attention_id).execution_options(include_deleted=include_deleted)
+    if not include_deleted:
+        query = query.filter(Attention.is_deleted == False)
+
+    attention_record = query.first()
+    if not attention_record:
+        return None
+
+    return {
+        'attention': attention_record,
+        'patient': attention_record.patient,
+        'doctor': attention_record.doctor,
+        'children': load_attention_children([attention_record.id])[attention_record.id]
+    }
+
+
+def serialize_vital_signs(attention_record):
+    """Serialize the vital sign columns of an attention (native numbers, no Decimal)"""
+    return {
+        'weight': attention_record.weight,
+        'height': attention_record.height,
+        'temperature': attention_record.temperature,
+        'bloodPressure': attention_record.bloodPressure,
+        'systolicPressure': attention_record.systolicPressure,
+        'diastolicPressure': attention_record.diastolicPressure,
+        'heartRate': attention_record.heartRate,
+        'oxygenSaturation': attention_record.oxygenSaturation,
+        'breathingFrequency': attention_record.breathingFrequency,
+        'glucose': attention_record.glucose,
+        'hemoglobin': attention_record.hemoglobin
+    }
+
+
+def serialize_attention_detail(aggregate):
+    """Serialize an aggregate in the shape returned by /view/<id>"""
+    attention_record = aggregate['attention']
+    patient = aggregate['patient']
+    doctor = aggregate['doctor']
+
+    attention_data = {
+        'id': attention_record.id,
+        'date': attention_record.date.isoformat() if attention_record.date else None,
+        'reasonConsultation': attention_record.reasonConsultation,
+        'currentIllness': attention_record.currentIllness,
+        'evolution': attention_record.evolution
+    }
+    attention_data.update(serialize_vital_signs(attention_record))
+
+    data = {
+        'attention': attention_data,
+        'patient': {
+            'id': patient.id,
+            'firstName': patient.firstName,
+            'lastName1': patient.lastName1,
+            'identifierCode': patient.identifierCode
+        } if patient else None,
+        'doctor': {
+            'id': doctor.id,
+            'firstName': doctor.firstName,
+            'lastName1': doctor.lastName1,
+            'speciality': doctor.speciality
+        } if doctor else None
+    }
+    data.update(aggregate['children'])
+    return data
+
+
+def serialize_attention_clinical(aggregate):
+    """Serialize an aggregate as a self-contained clinical record (export shape without metadata)"""
+    attention_record = aggregate['attention']
+    patient = aggregate['patient']
+    doctor = aggregate['doctor']
+    children = aggregate['children']
+
+    def strip_ids(items):
+        return [{k: v for k, v in item.items() if k != 'id'} for item in items]
+
+    return {
+        'attention': {
+            'id': attention_record.id,
+            'date': attention_record.date.isoformat() if attention_record.date else None,
+            'reasonConsultation': attention_record.reasonConsultation,
+            'currentIllness': attention_record.currentIllness,
+            'evolution': attention_record.evolution,
+            'vitalSigns': serialize_vital_signs(attention_record)
+        },
+        'patient': {
+            'id': patient.id,
+            'firstName': patient.firstName,
+            'lastName1': patient.lastName1,
+            'identifierCode': patient.identifierCode,
+            'birthDate': patient.birthdate.isoformat() if patient.birthdate else None,
+            'gender': patient.gender
+        } if patient else None,
+        'doctor': {
+            'id': doctor.id,
+            'firstName': doctor.firstName,
+            'lastName1': doctor.lastName1,
+            'speciality': doctor.speciality
+        } if doctor else None,
+        'clinicalData': {
+            'physicalExams': strip_ids(children['physicalExams']),
+            'organSystemReviews': strip_ids(children['organReviews']),
+            'diagnostics': strip_ids(children['diagnostics']),
+            'treatments': strip_ids(children['treatments']),
+            'labResults': {
+                'histopathologies': [
+                    {'result': histo['histopathology']} for histo in children['histopathologies']
+                ],
+                'imagings': [
+                    {'type': img['typeImaging'], 'result': img['imaging']} for img in children['imagings']
+                ],
+                'laboratories': [
+                    {'type': lab['typeExam'], 'result': lab['exam']} for lab in children['laboratories']
+                ]
+            }
+        }
+    }
+
+
+def serialize_attention_export(aggregate, export_date):
+    """Serialize an aggregate in the shape returned by /api/export/<id>"""
+    export_data = {
+        'metadata': {
+            'exportDate': export_date.isoformat(),
+            'version': '1.0',
+            'system': 'MEDSC'
+        }
+    }
+    export_data.update(serialize_attention_clinical(aggregate))
+    return export_data
+
+
+def iter_attention_aggregates(patient_id=None, doctor_id=None, date_from=None, date_to=None, batch_size=500):
+    """Stream non-deleted attentions matching the filters as aggregates.
+
+    Attentions are read through a server-side cursor (``yield_per``) on a
+    dedicated session, and the child rows of each batch are fetched with one
+    UNION ALL query, so memory stays bounded by ``batch_size`` regardless of
+    the size of the result (the session identity map is weak-referencing, so
+    already serialized batches are released). ``date_to`` is inclusive.
+    """
+    stmt = (
+        select(Attention, Patient, Doctor)
+        .join(Attention.patient)
+        .join(Attention.doctor)
+        .where(Attention.is_deleted == False)
+    )
+    if patient_id:
+        stmt = stmt.where(Attention.idPatient == patient_id)
+    if doctor_id:
+        stmt = stmt.where(Attention.idDoctor == doctor_id)
+    if date_from:
+        stmt = stmt.where(Attention.date >= date_from)
+    if date_to:
+        stmt = stmt.where(Attention.date < date_to + timedelta(days=1))
+    stmt = stmt.order_by(Attention.date, Attention.id)
+
+    for partition in iter_partitions(stmt, batch_size):
+        children = load_attention_children([row.Attention.id for row in partition])
+        for attention_record, patient, doctor in partition:
+            yield {
+                'attention': attention_record,
+                'patient': patient,
+                'doctor': doctor,
+                'children': children[attention_record.id]
+            }
+
+
+ATTENTION_CSV_COLUMNS = (
+    'attention_id', 'date', 'reasonConsultation', 'currentIllness', 'evolution',
+    'weight', 'height', 'temperature', 'bloodPressure', 'systolicPressure', 'diastolicPressure', 'heartRate',
+    'oxygenSaturation', 'breathingFrequency', 'glucose', 'hemoglobin',
+    'patient_id', 'patient_identifierType', 'patient_identifierCode', 'patient_name',
+    'patient_birthdate', 'patient_gender',
+    'doctor_id', 'doctor_name', 'doctor_speciality',
+    'diagnostics_cie10', 'diagnostics', 'treatments'
+)
+
+
+def attention_csv_row(aggregate):
+    """Flatten an aggregate into one CSV row; multi-valued fields are joined with ' | '"""
+    attention_record = aggregate['attention']
+    patient = aggregate['patient']
+    doctor = aggregate['doctor']
+    children = aggregate['children']
+
+    row = [
+        attention_record.id,
+        attention_record.date.isoformat() if attention_record.date else '',
+        attention_record.reasonConsultation,
+        attention_record.currentIllness,
+        attention_record.evolution
+    ]
+    row += list(serialize_vital_signs(attention_record).values())
+    row += [
+        patient.id,
+        patient.identifierType,
+        patient.identifierCode,
+        ' '.join(part for part in (patient.firstName, patient.middleName, patient.lastName1, patient.lastName2) if part),
+        patient.birthdate.isoformat() if patient.birthdate else '',
+        patient.gender,
+        doctor.id,
+        f"{doctor.firstName} {doctor.lastName1}",
+        doctor.speciality,
+        ' | '.join(diag['cie10Code'] for diag in children['diagnostics']),
+        ' | '.join(diag['disease'] for diag in children['diagnostics']),
+        ' | '.join(treat['medicament'] for treat in children['treatments'])
+    ]
+    return ['' if value is None else value for value in row]
+
+
+def iter_attentions_csv(aggregates):
+    """Yield CSV text chunks (header first) for a stream of aggregates"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ATTENTION_CSV_COLUMNS)
+    for aggregate in aggregates:
+        writer.writerow(attention_csv_row(aggregate))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,288 @@
+from flask.cli import with_appcontext
+from sqlalchemy import event, func
+from utils.db import db
+import click
+import json
+import statistics
+import time
+
+BENCHMARK_ITERATIONS = 30
+BENCHMARK_WARMUP = 3
+
+
+class Scenario:
+    """One benchmarked request; ``setup`` requests run before it and are not measured"""
+
+    def __init__(self, name, method, url, json_body=None, setup=()):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.json_body = json_body
+        self.setup = setup
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_summary(latencies_ms):
+    """p50/p90/p95/p99/max of a list of latencies in milliseconds"""
+    values = sorted(latencies_ms)
+    summary = {f'p{int(fraction * 100)}_ms': round(_percentile(values, fraction), 2)
+               for fraction in (0.50, 0.90, 0.95, 0.99)}
+    summary['max_ms'] = round(values[-1], 2) if values else 0.0
+    return summary
+
+
+def _login(client, doctor):
+    with client.session_transaction() as session:
+        session['autenticado'] = True
+        session['auth_provider'] = 'supabase'
+        session['user_id'] = doctor.supabase_id
+        session['supabase_id'] = doctor.supabase_id
+        session['email'] = doctor.email
+
+
+def default_scenarios():
+    """Key read and write paths, parametrized with rows from the current database"""
+    from models.models_flask import Doctor, Patient, ChatMessage
+
+    doctor = Doctor.query.filter(Doctor.is_deleted == False, Doctor.supabase_id.isnot(None)).order_by(Doctor.id).first()
+    patient = Patient.query.filter_by(is_deleted=False).order_by(Patient.id).first()
+    if doctor is None or patient is None:
+        raise click.ClickException('The database has no doctors or patients; run "flask bench seed" first')
+
+    # Conversación más larga del doctor autenticado
+    peer = db.session.query(ChatMessage.receiver_supabase_id).filter(
+        ChatMessage.sender_supabase_id == doctor.supabase_id
+    ).group_by(ChatMessage.receiver_supabase_id).order_by(func.count().desc()).limit(1).scalar()
+
+    attention_steps = (
+        ('/select-patient-for-attention', {'patient_id': patient.id}),
+        ('/add-vital-signs', {'weight': '70', 'height': '1.70', 'temperature': '36.8', 'bloodPressure': '120/80',
+                              'heartRate': '72', 'oxygenSaturation': '98', 'breathingFrequency': '16'}),
+        ('/add-initial-evaluation', {'reasonConsultation': 'Control', 'currentIllness': 'Paciente asintomático'}),
+        ('/add-diagnostic', {'cie10Code': 'Z00.0', 'disease': 'Examen médico general', 'observations': 'Normal',
+                             'diagnosticCondition': 'Definitivo', 'chronology': 'Primera vez'}),
+        ('/add-treatment', {'medicament': 'Paracetamol', 'via': 'Oral', 'dosage': '500', 'unity': 'mg',
+                            'frequency': 'Cada 8 horas', 'indications': 'Por 3 días'}),
+        ('/add-evolution', {'evolution': 'Favorable'})
+    )
+
+    scenarios = [
+        Scenario('patients_list', 'GET', '/api/patients'),
+        Scenario('search', 'GET', f'/api/search?q={patient.lastName1}'),
+        Scenario('statistics', 'GET', '/api/statistics'),
+        Scenario('complete_attention', 'POST', '/complete-attention', json_body={}, setup=attention_steps)
+    ]
+    if peer:
+        scenarios.insert(3, Scenario('chat_history', 'GET', f'/get-messages-uuid/{peer}'))
+    return doctor, scenarios
+
+
+def run_scenario(client, scenario, iterations, warmup):
+    """Run a scenario and return its latency percentiles (ms) and query counts"""
+    latencies = []
+    query_counts = []
+    statuses = {}
+    counter = {'queries': 0}
+
+    def count_query(*args):
+        counter['queries'] += 1
+
+    for iteration in range(warmup + iterations):
+        for url, body in scenario.setup:
+            client.post(url, json=body)
+
+        counter['queries'] = 0
+        event.listen(db.engine, 'before_cursor_execute', count_query)
+        try:
+            started = time.perf_counter()
+            response = client.open(scenario.url, method=scenario.method, json=scenario.json_body)
+            response.get_data()  # Include streamed bodies
+            elapsed = time.perf_counter() - started
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_query)
+
+        if iteration < warmup:
+            continue
+        latencies.append(elapsed * 1000)
+        query_counts.append(counter['queries'])
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    return {
+        'iterations': iterations,
+        **latency_summary(latencies),
+        'mean_queries': round(statistics.mean(query_counts), 1) if query_counts else 0.0,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())}
+    }
+
+
+def run_benchmarks(app, iterations=BENCHMARK_ITERATIONS, warmup=BENCHMARK_WARMUP, only=None):
+    """Drive the key endpoints through the test client. Must run inside an application context."""
+    doctor, scenarios = default_scenarios()
+    client = app.test_client()
+    _login(client, doctor)
+
+    results = {}
+    for scenario in scenarios:
+        if only and scenario.name not in only:
+            continue
+        results[scenario.name] = run_scenario(client, scenario, iterations, warmup)
+    return results
+
+
+def format_results(results, baseline=None):
+    header = f"{'scenario':<20}{'p50':>10}{'p90':>10}{'p95':>10}{'p99':>10}{'max':>10}{'queries':>9}  statuses"
+    lines = [header, '-' * len(header)]
+    for name, result in results.items():
+        line = (f"{name:<20}{result['p50_ms']:>10.2f}{result['p90_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+                f"{result['p99_ms']:>10.2f}{result['max_ms']:>10.2f}{result['mean_queries']:>9.1f}  "
+                f"{result['statuses']}")
+        previous = (baseline or {}).get(name)
+        if previous and previous['p50_ms']:
+            change = (result['p50_ms'] - previous['p50_ms']) / previous['p50_ms'] * 100
+            line += f"  (p50 {change:+.1f}% vs baseline, queries {previous['mean_queries']:.1f})"
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+@click.group('bench')
+def bench_cli():
+    """Synthetic data, endpoint, Socket.IO load and startup benchmarks."""
+
+
+@bench_cli.command('seed')
+@click.option('--patients', default=1000, show_default=True)
+@click.option('--attentions', default=10000, show_default=True)
+@click.option('--messages', default=50000, show_default=True)
+@click.option('--doctors', default=50, show_default=True)
+@click.option('--seed', default=42, show_default=True, help='Random seed; same seed, same data.')
+@click.option('--chunk-size', default=5000, show_default=True)
+@with_appcontext
+def seed_command(patients, attentions, messages, doctors, seed, chunk_size):
+    """Populate the configured database with synthetic clinical data."""
+    from utils.synthetic_data import generate_dataset, enable_sqlite_collations
+
+    enable_sqlite_collations(db.engine)
+    db.create_all()
+    started = time.perf_counter()
+    counts = generate_dataset(
+        patients=patients, attentions=attentions, messages=messages, doctors=doctors,
+        seed=seed, chunk_size=chunk_size, progress=lambda message: click.echo(f'  {message}')
+    )
+    for table, count in counts.items():
+        click.echo(f'{table}: {count}')
+    click.echo(f'Done in {time.perf_counter() - started:.1f}s')
+
+
+@bench_cli.command('run')
+@click.option('--iterations', default=BENCHMARK_ITERATIONS, show_default=True)
+@click.option('--warmup', default=BENCHMARK_WARMUP, show_default=True)
+@click.option('--scenario', 'only', multiple=True, help='Run only these scenarios (repeatable).')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the results as JSON.')
+@click.option('--baseline', type=click.Path(exists=True, dir_okay=False), help='JSON results to compare against.')
+@with_appcontext
+def run_command(iterations, warmup, only, output, baseline):
+    """Measure latency percentiles (ms) and query counts of the key endpoints."""
+    from flask import current_app
+    from utils.synthetic_data import enable_sqlite_collations
+
+    enable_sqlite_collations(db.engine)
+    results = run_benchmarks(current_app._get_current_object(), iterations, warmup, only)
+
+    previous = None
+    if baseline:
+        with open(baseline, encoding='utf-8') as handle:
+            previous = json.load(handle)
+    click.echo(format_results(results, previous))
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump(results, handle, indent=2)
+        click.echo(f'Results written to {output}')
+
+
+@bench_cli.command('explain')
+@click.option('--scenario', 'only', multiple=True, help='Explain only these scenarios (repeatable).')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the report as JSON.')
+@with_appcontext
+def explain_command(only, output):
+    """EXPLAIN the queries of the benchmark scenarios and list the model indexes they never use."""
+    from flask import current_app
+    from utils.explain_report import index_usage_report, format_index_report
+    from utils.synthetic_data import enable_sqlite_collations
+
+    enable_sqlite_collations(db.engine)
+    report = index_usage_report(current_app._get_current_object(), only)
+    click.echo(format_index_report(report))
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        click.echo(f'Report written to {output}')
+
+
+@bench_cli.command('socketio')
+@click.option('--server', 'server_url', default='http://localhost:5000', show_default=True,
+              help='Running server (python index.py) to load.')
+@click.option('--doctors', default=50, show_default=True, help='Simulated doctors, one connection each.')
+@click.option('--duration', default=60, show_default=True, help='Seconds of load after the ramp-up.')
+@click.option('--rate', default=1.0, show_default=True, help='Actions per doctor per second.')
+@click.option('--messages', 'message_weight', default=0.5, show_default=True, help='Weight of send_message.')
+@click.option('--typing', 'typing_weight', default=0.45, show_default=True, help='Weight of typing.')
+@click.option('--reconnects', 'reconnect_weight', default=0.05, show_default=True,
+              help='Weight of disconnect + connect.')
+@click.option('--ramp', default=10.0, show_default=True, help='Seconds to connect all doctors.')
+@click.option('--transport', type=click.Choice(['websocket', 'polling']), default='websocket', show_default=True)
+@click.option('--origin', default='http://localhost:3000', show_default=True,
+              help='Origin header; must be allowed by the server CORS settings.')
+@click.option('--metrics-token', envvar='METRICS_TOKEN', help='Token for the server /metrics endpoint.')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the report as JSON.')
+@with_appcontext
+def socketio_command(server_url, doctors, duration, rate, message_weight, typing_weight, reconnect_weight,
+                     ramp, transport, origin, metrics_token, output):
+    """Load the chat and presence events of a running server with simulated doctors.
+
+    Sessions are created with this app's SECRET_KEY or session store, which must match the server's.
+    """
+    from flask import current_app
+    from utils.socket_load import run_load_test, format_report
+
+    if doctors < 2:
+        raise click.BadParameter('At least two doctors are needed to exchange messages', param_hint='--doctors')
+
+    report = run_load_test(
+        current_app._get_current_object(), server_url, doctors=doctors, duration=duration, rate=rate,
+        mix={'message': message_weight, 'typing': typing_weight, 'reconnect': reconnect_weight},
+        ramp=ramp, transport=transport, origin=origin, metrics_token=metrics_token
+    )
+    click.echo(format_report(report))
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        click.echo(f'Report written to {output}')
+
+
+@bench_cli.command('startup')
+@click.option('--runs', default=5, show_default=True, help='Fresh interpreter processes to measure.')
+@click.option('--module', default='index', show_default=True, help='Entry module to import.')
+@click.option('--top', default=15, show_default=True, help='Rows per table in the report.')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write the report as JSON.')
+def startup_command(runs, module, top, output):
+    """Measure cold-start time and profile imports; exits 1 over STARTUP_BUDGET_MS."""
+    from utils.startup_profile import profile_startup, format_profile
+
+    report = profile_startup(runs=runs, module=module, top=top)
+    click.echo(format_profile(report))
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as handle:
+            json.dump(report, handle, indent=2)
+        click.echo(f'Report written to {output}')
+    if report['median_ms'] > report['budget_ms']:
+        raise SystemExit(1)
@@ -0,0 +1,75 @@
+from utils.db import db
+from sqlalchemy import Date
+from datetime import datetime
+
+
+def _coerce(column, value):
+    """Convert ISO date strings to date objects for Date columns so values compare correctly"""
+    if isinstance(value, str) and isinstance(column.type, Date):
+        try:
+            return datetime.strptime(value[:10], '%Y-%m-%d').date()
+        except ValueError:
+            return value
+    return value
+
+
+def merge_children(model, parent_column, parent_id, items, field_map, required, defaults, user):
+    """Apply a full-replacement payload to a child collection with the minimum of writes.
+
+    ``items`` is the incoming list; ``field_map`` maps payload keys to model
+    columns. Items whose ``id`` matches a current (non-deleted) row update that
+    row only when a value actually changed, items without a known id are
+    inserted, and current rows absent from the payload are soft-deleted. Items
+    missing a ``required`` key are ignored, as before. Changes are added to the
+    session (the unit of work batches same-shape UPDATEs into executemany);
+    the caller commits. created_at/updated_at come from the column defaults
+    (database clock), never from the application clock.
+
+    Returns (rows, stats): the resulting rows in payload order and the
+    number of inserted/updated/deleted rows.
+    """
+    existing = {
+        row.id: row for row in model.query.filter(
+            getattr(model, parent_column) == parent_id,
+            model.is_deleted == False
+        )
+    }
+    columns = model.__table__.c
+    rows = []
+    stats = {'inserted': 0, 'updated': 0, 'deleted': 0}
+
+    for item in items:
+        if not all(item.get(key) for key in required):
+            continue
+
+        values = {
+            column: _coerce(columns[column], item.get(key, defaults.get(key)))
+            for key, column in field_map.items()
+        }
+
+        try:
+            item_id = int(item.get('id')) if item.get('id') is not None else None
+        except (TypeError, ValueError):
+            item_id = None
+
+        row = existing.pop(item_id, None)
+        if row is None:
+            row = model(**values, created_by=user, updated_by=user)
+            setattr(row, parent_column, parent_id)
+            db.session.add(row)
+            stats['inserted'] += 1
+        else:
+            changed = {column: value for column, value in values.items() if getattr(row, column) != value}
+            if changed:
+                for column, value in changed.items():
+                    setattr(row, column, value)
+                row.updated_by = user
+                stats['updated'] += 1
+        rows.append(row)
+
+    for row in existing.values():
+        row.is_deleted = True
+        row.updated_by = user
+        stats['deleted'] += 1
+
+    return rows, stats
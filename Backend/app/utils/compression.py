@@ -0,0 +1,75 @@
+from flask import request
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # Brotli es opcional: sin él solo se ofrece gzip
+    brotli = None
+
+COMPRESS_RESPONSES = os.environ.get('COMPRESS_RESPONSES', 'true').lower() == 'true'
+# Respuestas más pequeñas que esto (bytes) no se comprimen
+COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'application/x-ndjson',
+    'text/html',
+    'text/css',
+    'text/csv',
+    'text/plain',
+    'text/javascript'
+}
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br'] and accepted['br'] >= accepted['gzip']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(response):
+    """Compress eligible responses with brotli or gzip, according to Accept-Encoding"""
+    if (
+        response.status_code < 200
+        or response.status_code in (204, 206, 304)
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding == 'br':
+        compressed = brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    elif encoding == 'gzip':
+        compressed = gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL)
+    else:
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    # The encoded body differs byte for byte, so a strong ETag must become weak
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Register response compression unless COMPRESS_RESPONSES=false"""
+    if COMPRESS_RESPONSES:
+        app.after_request(compress_response)
@@ -0,0 +1,53 @@
+from utils.db import db
+from flask import request, Response
+from sqlalchemy import func, select
+from werkzeug.http import is_resource_modified
+from datetime import timedelta
+import hashlib
+
+
+def resource_validators(sources, variant=''):
+    """Compute (etag, last_modified) for the rows a response is built from.
+
+    ``sources`` is a list of ``(model, *criteria)`` tuples. Every source adds
+    max(updated_at) and count(*) over its rows as scalar subqueries of one
+    single SELECT, so the cost is one cheap aggregate query. updated_at keeps
+    sub-second precision (DATETIME(6) on MySQL), so two edits within the same
+    second still give different ETags. The count makes rows that disappear
+    from a collection change the version too. ``variant``
+    separates representations of the same rows (e.g. JSON vs HTML).
+    """
+    columns = []
+    for model, *criteria in sources:
+        columns.append(select(func.max(model.updated_at)).where(*criteria).scalar_subquery())
+        columns.append(select(func.count()).select_from(model).where(*criteria).scalar_subquery())
+
+    values = db.session.execute(select(*columns)).one()
+
+    seed = '|'.join([variant] + [str(value) for value in values])
+    etag = hashlib.sha1(seed.encode('utf-8')).hexdigest()[:20]
+    timestamps = [value for value in values[0::2] if value is not None]
+    return etag, max(timestamps) if timestamps else None
+
+
+def not_modified_response(etag, last_modified):
+    """Return a 304 response if the client's validators match, otherwise None"""
+    # If-Modified-Since solo tiene segundos: un cambio dentro del segundo ya servido cuenta como
+    # modificado (redondeo hacia arriba). Con If-None-Match manda el ETag, que sí lo distingue.
+    compare_modified = last_modified
+    if compare_modified is not None and compare_modified.microsecond:
+        compare_modified = compare_modified.replace(microsecond=0) + timedelta(seconds=1)
+    if is_resource_modified(request.environ, etag=etag, last_modified=compare_modified):
+        return None
+    return with_validators(Response(status=304), etag, last_modified)
+
+
+def with_validators(response, etag, last_modified):
+    """Attach ETag/Last-Modified and force revalidation on every use (never to error responses)"""
+    if isinstance(response, tuple) or response.status_code >= 400:
+        return response
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
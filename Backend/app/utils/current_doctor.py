@@ -0,0 +1,136 @@
+from flask import session, request, g
+from sqlalchemy import text
+from utils.db import db
+import copy
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Tiempo que se reutiliza la información del doctor de una misma sesión (segundos)
+DOCTOR_CACHE_SECONDS = int(os.environ.get('DOCTOR_CACHE_SECONDS', 60))
+
+
+class DoctorInfoCache:
+    """Short-TTL cache of doctor_info dicts keyed by the session identity"""
+
+    def __init__(self, ttl=DOCTOR_CACHE_SECONDS):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, info = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return copy.deepcopy(info)
+
+    def set(self, key, info):
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, copy.deepcopy(info))
+            # Barrido sencillo para no crecer sin límite
+            if len(self._entries) > 1000:
+                for stale in [k for k, (expires_at, _) in self._entries.items() if expires_at < now]:
+                    del self._entries[stale]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+doctor_cache = DoctorInfoCache()
+
+
+def database_available():
+    """USE_DATABASE is on and the database answers; checked once per request"""
+    if 'database_available' not in g:
+        available = os.environ.get('USE_DATABASE', 'false').lower() == 'true'
+        if available:
+            try:
+                db.session.execute(text('SELECT 1'))
+            except Exception as e:
+                logger.error(f"Error de conexión a base de datos: {str(e)}")
+                available = False
+        g.database_available = available
+    return g.database_available
+
+
+def _identity_key():
+    if session.get('auth_provider') == 'supabase':
+        return ('supabase', session.get('user_id', 'demo'), session.get('email', 'Doctor'))
+    if 'cedula' in session:
+        return ('cedula', session['cedula'])
+    return None
+
+
+def _supabase_doctor_info():
+    # Para Supabase, creamos información ficticia del doctor
+    email = session.get('email', 'Doctor')
+    user_id = session.get('user_id', 'demo')
+    name_parts = email.split('@')[0].split('.')
+    return {
+        'id': user_id,
+        'firstName': name_parts[0].capitalize() if len(name_parts) > 0 else 'Doctor',
+        'lastName1': name_parts[1].capitalize() if len(name_parts) > 1 else 'Supabase',
+        'speciality': 'Medicina General'
+    }
+
+
+def _local_doctor_info():
+    # Login local por cédula (solo si hay base de datos)
+    from models.models_flask import Doctor
+
+    if not database_available():
+        return None
+    try:
+        doctor = Doctor.query.filter_by(identifierCode=session['cedula'], is_deleted=False).first()
+    except Exception as e:
+        logger.error(f"Error fetching doctor info: {str(e)}")
+        return None
+    if doctor is None:
+        return None
+    return {
+        'id': doctor.id,
+        'firstName': doctor.firstName,
+        'lastName1': doctor.lastName1,
+        'speciality': doctor.speciality
+    }
+
+
+def _resolve():
+    key = _identity_key()
+    if key is None:
+        return None, None
+
+    info = doctor_cache.get(key)
+    if info is None:
+        info = _supabase_doctor_info() if key[0] == 'supabase' else _local_doctor_info()
+        if info is None:
+            return None, None
+        doctor_cache.set(key, info)
+    return info, key[1]
+
+
+def get_doctor_info_and_session(api_fallback=False):
+    """Obtiene información del doctor y sessionID de manera compatible con Supabase.
+
+    Resolved once per request (and cached briefly per session identity);
+    with ``api_fallback`` JSON requests without a session get a generic API doctor.
+    """
+    if 'current_doctor' not in g:
+        g.current_doctor = _resolve()
+    doctor_info, sessionID = g.current_doctor
+
+    if doctor_info is None and api_fallback and (
+            request.is_json or request.headers.get('Content-Type') == 'application/json'):
+        # For API requests without proper session, create a dummy doctor
+        return {'firstName': 'API', 'lastName1': 'Doctor', 'speciality': 'Medicina General'}, 'api_user'
+    return copy.deepcopy(doctor_info), sessionID
@@ -1,3 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from utils.replica import RoutingSession
 
-db = SQLAlchemy()
\ No newline at end of file
+# Las lecturas de las vistas con @replica_reads van a la réplica (DATABASE_REPLICA_URL), si existe
+db = SQLAlchemy(session_options={'class_': RoutingSession})
\ No newline at end of file
@@ -0,0 +1,177 @@
+from flask.cli import with_appcontext
+from utils.db import db
+import click
+
+
+def _prepare_engine():
+    import models.models_flask  # noqa: F401  Registra los modelos en los metadatos
+    from utils.synthetic_data import enable_sqlite_collations
+
+    enable_sqlite_collations(db.engine)
+
+
+def _config():
+    from utils.migrations import alembic_config
+
+    _prepare_engine()
+    return alembic_config()
+
+
+@click.group('db')
+def db_cli():
+    """Database schema and migration commands."""
+
+
+@db_cli.command('create')
+@with_appcontext
+def create_command():
+    """Create the tables of a new database and mark it as migrated to the latest revision."""
+    from alembic import command
+
+    config = _config()
+    db.create_all()
+    command.stamp(config, 'head')
+    click.echo(f'Tables ready: {len(db.metadata.tables)}')
+
+
+@db_cli.command('revision')
+@click.option('-m', '--message', required=True, help='Short description of the change.')
+@click.option('--autogenerate/--empty', default=True, show_default=True,
+              help='Compare models_flask.py with the database to write the operations.')
+@click.option('--rev-id', help='Revision id (default: random).')
+@with_appcontext
+def revision_command(message, autogenerate, rev_id):
+    """Create a new migration in migrations/versions."""
+    from alembic import command
+
+    command.revision(_config(), message=message, autogenerate=autogenerate, rev_id=rev_id)
+
+
+@db_cli.command('upgrade')
+@click.argument('revision', default='head')
+@click.option('--sql', is_flag=True, help='Print the SQL instead of running it.')
+@with_appcontext
+def upgrade_command(revision, sql):
+    """Apply migrations up to REVISION (default: head)."""
+    from alembic import command
+
+    command.upgrade(_config(), revision, sql=sql)
+
+
+@db_cli.command('downgrade', context_settings={'ignore_unknown_options': True})
+@click.argument('revision', default='-1')
+@click.option('--sql', is_flag=True, help='Print the SQL instead of running it.')
+@with_appcontext
+def downgrade_command(revision, sql):
+    """Revert migrations down to REVISION (default: -1, the previous one)."""
+    from alembic import command
+
+    command.downgrade(_config(), revision, sql=sql)
+
+
+@db_cli.command('stamp')
+@click.argument('revision', default='head')
+@with_appcontext
+def stamp_command(revision):
+    """Record REVISION as applied without running it (databases created before migrations)."""
+    from alembic import command
+
+    command.stamp(_config(), revision)
+
+
+@db_cli.command('current')
+@with_appcontext
+def current_command():
+    """Show the revision applied to the database."""
+    from alembic import command
+
+    command.current(_config(), verbose=True)
+
+
+@db_cli.command('history')
+@with_appcontext
+def history_command():
+    """List the migrations."""
+    from alembic import command
+
+    command.history(_config(), indicate_current=True)
+
+
+@db_cli.command('archive')
+@click.option('--days', type=int, help='Archive rows soft-deleted more than DAYS ago (default: ARCHIVE_AFTER_DAYS).')
+@click.option('--dry-run', is_flag=True, help='Count the first batch without moving anything.')
+@with_appcontext
+def archive_command(days, dry_run):
+    """Move long soft-deleted rows into the <table>_archive tables."""
+    from utils.archive import ARCHIVE_AFTER_DAYS, archive_deleted_rows
+
+    _prepare_engine()
+    totals = archive_deleted_rows(days if days is not None else ARCHIVE_AFTER_DAYS, dry_run=dry_run,
+                                  progress=lambda message: click.echo(f'  {message}'))
+    for table, count in totals.items():
+        if count:
+            click.echo(f'{table}: {count}')
+    click.echo(f"{'Would archive' if dry_run else 'Archived'} {sum(totals.values())} rows")
+
+
+@db_cli.group('partitions')
+def partitions_cli():
+    """Monthly RANGE partitioning of attention by date (MySQL)."""
+
+
+def _run_statements(statements, dry_run):
+    if not statements:
+        click.echo('Nothing to do')
+        return
+    if dry_run or db.engine.dialect.name != 'mysql':
+        if not dry_run:
+            click.echo('-- Partitioning needs MySQL; statements only:')
+        click.echo(';\n'.join(statements) + ';')
+        return
+    with db.engine.connect() as connection:
+        for statement in statements:
+            click.echo(statement[:120])
+            connection.exec_driver_sql(statement)
+
+
+@partitions_cli.command('status')
+@with_appcontext
+def partitions_status_command():
+    """List the partitions of attention with their estimated rows."""
+    from utils.partitioning import existing_partitions
+
+    with db.engine.connect() as connection:
+        partitions = existing_partitions(connection)
+    if not partitions:
+        click.echo('attention is not partitioned')
+    for name, bound, rows in partitions:
+        click.echo(f"{name:<10}< {bound.isoformat() if bound else 'MAXVALUE':<12}{rows:>12}")
+
+
+@partitions_cli.command('init')
+@click.option('--dry-run', is_flag=True, help='Print the DDL instead of running it.')
+@with_appcontext
+def partitions_init_command(dry_run):
+    """Partition attention by month (drops the FKs from and to attention; copies the table)."""
+    from utils.partitioning import is_partitioned, partition_statements
+
+    _prepare_engine()
+    with db.engine.connect() as connection:
+        if is_partitioned(connection):
+            raise click.ClickException('attention is already partitioned; use "flask db partitions maintain"')
+        statements = partition_statements(connection)
+    _run_statements(statements, dry_run)
+
+
+@partitions_cli.command('maintain')
+@click.option('--dry-run', is_flag=True, help='Print the DDL instead of running it.')
+@with_appcontext
+def partitions_maintain_command(dry_run):
+    """Add the months ahead and merge old months into yearly partitions (run monthly, e.g. from cron)."""
+    from utils.partitioning import existing_partitions, maintenance_statements
+
+    with db.engine.connect() as connection:
+        partitions = existing_partitions(connection)
+    if not partitions:
+        raise click.ClickException('attention is not partitioned; run "flask db partitions init" first')
+    _run_statements(maintenance_statements(partitions), dry_run)
@@ -0,0 +1,117 @@
+from models.models_flask import RegistrationDraft
+from utils.db import db
+from datetime import datetime, timedelta
+import copy
+import json
+import os
+import threading
+import time
+
+# Tiempo de vida de un borrador sin actividad (segundos)
+DRAFT_TTL_SECONDS = int(os.environ.get('DRAFT_TTL_SECONDS', 2 * 60 * 60))
+
+
+class MemoryDraftStore:
+    """Process-local draft store with per-key TTL.
+
+    Suitable for a single worker process (and for the SQLite in-memory mode).
+    Expired entries are dropped when read and swept periodically on writes.
+    """
+
+    SWEEP_EVERY = 100
+
+    def __init__(self, ttl=DRAFT_TTL_SECONDS):
+        self.ttl = ttl
+        self._drafts = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._drafts.get(key)
+            if entry is None:
+                return None
+            expires_at, draft = entry
+            if expires_at < time.monotonic():
+                del self._drafts[key]
+                return None
+            return copy.deepcopy(draft)
+
+    def set(self, key, draft):
+        now = time.monotonic()
+        with self._lock:
+            self._drafts[key] = (now + self.ttl, copy.deepcopy(draft))
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                self._sweep(now)
+
+    def delete(self, key):
+        with self._lock:
+            self._drafts.pop(key, None)
+
+    def evict_expired(self):
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def _sweep(self, now):
+        expired = [key for key, (expires_at, _) in self._drafts.items() if expires_at < now]
+        for key in expired:
+            del self._drafts[key]
+        return len(expired)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._drafts)
+
+
+class DatabaseDraftStore:
+    """Draft store backed by the registration_drafts table, shared by every worker process.
+
+    Writes commit immediately, so callers must not hold unrelated pending
+    changes in the session when saving or deleting a draft.
+    """
+
+    SWEEP_EVERY = 100
+
+    def __init__(self, ttl=DRAFT_TTL_SECONDS):
+        self.ttl = ttl
+        self._writes = 0
+
+    def get(self, key):
+        row = db.session.get(RegistrationDraft, key)
+        if row is None or row.expires_at < datetime.now():
+            return None
+        return json.loads(row.data)
+
+    def set(self, key, draft):
+        db.session.merge(RegistrationDraft(
+            key=key,
+            data=json.dumps(draft),
+            expires_at=datetime.now() + timedelta(seconds=self.ttl)
+        ))
+        db.session.commit()
+        self._writes += 1
+        if self._writes % self.SWEEP_EVERY == 0:
+            self.evict_expired()
+
+    def delete(self, key):
+        RegistrationDraft.query.filter_by(key=key).delete()
+        db.session.commit()
+
+    def evict_expired(self):
+        deleted = RegistrationDraft.query.filter(RegistrationDraft.expires_at < datetime.now()).delete()
+        db.session.commit()
+        return deleted
+
+    def __len__(self):
+        return RegistrationDraft.query.filter(RegistrationDraft.expires_at >= datetime.now()).count()
+
+
+def create_draft_store():
+    """Pick the draft backend: DRAFT_STORE=memory|database, database by default when USE_DATABASE=true"""
+    backend = os.environ.get('DRAFT_STORE')
+    if not backend:
+        backend = 'database' if os.environ.get('USE_DATABASE', 'false').lower() == 'true' else 'memory'
+    if backend == 'database':
+        return DatabaseDraftStore()
+    return MemoryDraftStore()
@@ -0,0 +1,110 @@
+from sqlalchemy import event
+from utils.db import db
+from utils.query_guard import normalize_statement
+import re
+
+_SQLITE_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\S+)')
+_SQLITE_SCAN = re.compile(r'^SCAN (?!CONSTANT ROW)(\S+)(?!.*USING)')
+
+
+def capture_benchmark_statements(app, only=None):
+    """Run each benchmark scenario once and keep one SELECT per statement shape.
+
+    Returns {shape: {'scenario', 'statement', 'parameters'}}; must run inside an application context.
+    """
+    from utils.benchmark import _login, default_scenarios, run_scenario
+
+    doctor, scenarios = default_scenarios()
+    client = app.test_client()
+    _login(client, doctor)
+
+    captured = {}
+    current = {'scenario': None}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith('SELECT'):
+            return
+        shape = normalize_statement(statement)
+        if shape not in captured:
+            captured[shape] = {'scenario': current['scenario'], 'statement': statement, 'parameters': parameters}
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        for scenario in scenarios:
+            if only and scenario.name not in only:
+                continue
+            current['scenario'] = scenario.name
+            run_scenario(client, scenario, iterations=1, warmup=0)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return captured
+
+
+def _explain_sqlite(connection, statement, parameters):
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    steps = [row[-1] for row in rows]
+    indexes = [match.group(1) for step in steps for match in [_SQLITE_INDEX.search(step)] if match]
+    full_scans = [match.group(1) for step in steps for match in [_SQLITE_SCAN.match(step)] if match]
+    return {'plan': steps, 'indexes': indexes, 'full_scans': full_scans, 'rows': None}
+
+
+def _explain_mysql(connection, statement, parameters):
+    rows = connection.exec_driver_sql(f'EXPLAIN {statement}', parameters).mappings().all()
+    steps = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}".strip()
+             for row in rows]
+    return {
+        'plan': steps,
+        'indexes': [row['key'] for row in rows if row['key']],
+        'full_scans': [row['table'] for row in rows if row['type'] == 'ALL'],
+        'rows': sum(int(row['rows'] or 0) for row in rows)
+    }
+
+
+def explain_statements(captured):
+    """EXPLAIN every captured statement with the dialect's planner"""
+    explain = _explain_mysql if db.engine.dialect.name == 'mysql' else _explain_sqlite
+    report = []
+    with db.engine.connect() as connection:
+        for shape, entry in captured.items():
+            try:
+                result = explain(connection, entry['statement'], entry['parameters'])
+            except Exception as e:
+                result = {'plan': [f'EXPLAIN failed: {e}'], 'indexes': [], 'full_scans': [], 'rows': None}
+            report.append({'scenario': entry['scenario'], 'statement': shape, **result})
+    return report
+
+
+def model_indexes():
+    """{index name: (table, columns)} for the secondary indexes declared in models_flask.py"""
+    import models.models_flask  # noqa: F401  Registra los modelos en los metadatos
+
+    return {
+        index.name: (table.name, [column.name for column in index.columns])
+        for table in db.metadata.tables.values() for index in table.indexes
+    }
+
+
+def index_usage_report(app, only=None):
+    """Plans of the benchmark queries plus the declared indexes that none of them used"""
+    statements = explain_statements(capture_benchmark_statements(app, only))
+    used = {name for entry in statements for name in entry['indexes']}
+    declared = model_indexes()
+    return {
+        'dialect': db.engine.dialect.name,
+        'statements': statements,
+        'used_indexes': sorted(name for name in used if name in declared),
+        'unused_indexes': sorted(name for name in declared if name not in used)
+    }
+
+
+def format_index_report(report):
+    lines = [f"Index usage over the benchmark queries ({report['dialect']})", '']
+    for entry in report['statements']:
+        flags = f"  FULL SCAN: {', '.join(entry['full_scans'])}" if entry['full_scans'] else ''
+        estimate = f"  ~{entry['rows']} rows" if entry['rows'] is not None else ''
+        lines.append(f"[{entry['scenario']}] {entry['statement'][:160]}")
+        lines.append(f"    indexes: {', '.join(entry['indexes']) or '-'}{estimate}{flags}")
+        lines += [f"    | {step}" for step in entry['plan']]
+    lines += ['', f"Used model indexes ({len(report['used_indexes'])}): {', '.join(report['used_indexes']) or '-'}"]
+    lines.append(f"Unused model indexes ({len(report['unused_indexes'])}): {', '.join(report['unused_indexes']) or '-'}")
+    return '\n'.join(lines)
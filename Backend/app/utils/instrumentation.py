@@ -0,0 +1,136 @@
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import functools
+import heapq
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+PERF_INSTRUMENTATION = os.environ.get('PERF_INSTRUMENTATION', 'true').lower() == 'true'
+SERVER_TIMING = os.environ.get('SERVER_TIMING', 'true').lower() == 'true'
+# Peticiones más lentas que esto (ms) se registran con sus consultas más costosas
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+SLOW_REQUEST_TOP_QUERIES = 5
+
+
+class RequestStats:
+    """Timings collected for a single request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.query_count = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+        self.top_queries = []  # min-heap of (duration, statement)
+
+    def add_query(self, statement, duration):
+        self.query_count += 1
+        self.db_time += duration
+        entry = (duration, statement)
+        if len(self.top_queries) < SLOW_REQUEST_TOP_QUERIES:
+            heapq.heappush(self.top_queries, entry)
+        elif duration > self.top_queries[0][0]:
+            heapq.heapreplace(self.top_queries, entry)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current_stats():
+    """Stats of the running request, or None outside an instrumented request"""
+    if not has_request_context():
+        return None
+    return g.get('request_stats')
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    duration = time.perf_counter() - started.pop()
+    stats = current_stats()
+    if stats is not None:
+        stats.add_query(statement, duration)
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get('query_started'):
+        conn.info['query_started'].pop()
+
+
+def _timed_serialization(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats = current_stats()
+            if stats is not None:
+                stats.serialization_time += time.perf_counter() - started
+    return wrapper
+
+
+def _start_request():
+    g.request_stats = RequestStats()
+
+
+def _add_server_timing(response):
+    stats = current_stats()
+    if stats is None:
+        return response
+    # For streamed bodies this covers the work done before the first byte
+    response.headers['Server-Timing'] = ', '.join([
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.query_count} queries"',
+        f'ser;dur={stats.serialization_time * 1000:.1f}',
+        f'total;dur={stats.elapsed() * 1000:.1f}'
+    ])
+    return response
+
+
+def _log_slow_request(exc):
+    stats = current_stats()
+    if stats is None:
+        return
+    # Teardown runs after streamed bodies are fully sent, so this is the real total
+    total_ms = stats.elapsed() * 1000
+    if total_ms < SLOW_REQUEST_MS:
+        return
+    top = '\n'.join(
+        f"    {duration * 1000:.1f} ms  {' '.join(statement.split())[:300]}"
+        for duration, statement in sorted(stats.top_queries, reverse=True)
+    )
+    logger.warning(
+        f"Slow request {request.method} {request.path} ({request.endpoint}): "
+        f"{total_ms:.1f} ms total, {stats.query_count} queries in {stats.db_time * 1000:.1f} ms, "
+        f"serialization {stats.serialization_time * 1000:.1f} ms\n{top}"
+    )
+
+
+def init_instrumentation(app):
+    """Record query count, DB time, serialization time and latency for every request.
+
+    Must run after the JSON provider is installed, since its encoding methods
+    are wrapped to measure serialization. Disabled with PERF_INSTRUMENTATION=false.
+    """
+    if not PERF_INSTRUMENTATION:
+        return
+
+    app.json.dumps = _timed_serialization(app.json.dumps)
+    app.json.response = _timed_serialization(app.json.response)
+
+    app.before_request(_start_request)
+    if SERVER_TIMING:
+        app.after_request(_add_server_timing)
+    app.teardown_request(_log_slow_request)
@@ -0,0 +1,68 @@
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+from datetime import date
+from decimal import Decimal
+import os
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el codificador estándar
+    orjson = None
+
+
+def _default(obj):
+    """Fallback for types orjson does not handle, matching Flask's default output"""
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson.
+
+    Output stays compatible with Flask's default provider: dates as HTTP
+    dates and ``Numeric`` columns (Decimal) as strings. Keys are emitted in
+    insertion order instead of sorted. Anything orjson cannot encode (e.g.
+    integers above 64 bits) falls back to the stdlib encoder.
+    """
+
+    sort_keys = False
+
+    def _options(self):
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _dumps_bytes(self, obj):
+        try:
+            return orjson.dumps(obj, default=_default, option=self._options())
+        except orjson.JSONEncodeError:
+            return super().dumps(obj).encode('utf-8')
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the JSON provider selected by JSON_PROVIDER (orjson by default when available)"""
+    provider = os.environ.get('JSON_PROVIDER', 'orjson').lower()
+    if provider == 'orjson' and orjson is not None:
+        app.json = FastJSONProvider(app)
@@ -0,0 +1,148 @@
+from flask import g, request, Response
+import functools
+import logging
+import os
+import time
+
+try:
+    from prometheus_client import Counter, Histogram, generate_latest, CONTENT_TYPE_LATEST, REGISTRY
+    from prometheus_client.core import GaugeMetricFamily
+except ImportError:  # prometheus_client es opcional: sin él no se expone /metrics
+    REGISTRY = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true' and REGISTRY is not None
+# Token opcional para proteger /metrics (Authorization: Bearer <token>)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+if METRICS_ENABLED:
+    REQUEST_LATENCY = Histogram(
+        'medsc_http_request_duration_seconds',
+        'HTTP request latency by endpoint (includes streamed bodies)',
+        ['endpoint', 'method', 'status'],
+        buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+    )
+    SOCKETIO_EVENTS = Counter(
+        'medsc_socketio_events_total',
+        'Socket.IO events received from clients and emitted by the server',
+        ['event', 'direction']
+    )
+
+_state_collector = None
+
+
+def record_socket_event(event):
+    """Count a Socket.IO event received by one of the handlers"""
+    if METRICS_ENABLED:
+        SOCKETIO_EVENTS.labels(event, 'received').inc()
+
+
+class AppStateCollector:
+    """Gauges read at scrape time: DB pool, Socket.IO clients/rooms and draft store size"""
+
+    def __init__(self, engine, socketio):
+        self.engine = engine
+        self.socketio = socketio
+
+    def describe(self):
+        # Avoid a collect() at registration time, outside of an app context
+        return []
+
+    def collect(self):
+        pool = self.engine.pool
+        pool_metrics = (
+            ('medsc_db_pool_size', 'Configured size of the DB connection pool', 'size'),
+            ('medsc_db_pool_checked_out', 'DB connections currently checked out', 'checkedout'),
+            ('medsc_db_pool_checked_in', 'Idle DB connections in the pool', 'checkedin'),
+            ('medsc_db_pool_overflow', 'DB connections opened above the pool size', 'overflow')
+        )
+        for name, documentation, method in pool_metrics:
+            # SQLite pools do not implement every counter
+            if hasattr(pool, method):
+                # QueuePool.overflow() is negative until the pool is full
+                yield GaugeMetricFamily(name, documentation, value=max(getattr(pool, method)(), 0))
+
+        server = getattr(self.socketio, 'server', None)
+        if server is not None:
+            namespace_rooms = server.manager.rooms.get('/', {})
+            clients = len(namespace_rooms.get(None, {}))
+            # Every client has a private room named after its sid; count only the others
+            rooms = sum(
+                1 for room, members in namespace_rooms.items()
+                if room is not None and room not in members
+            )
+            yield GaugeMetricFamily('medsc_socketio_connected_clients', 'Connected Socket.IO clients', value=clients)
+            yield GaugeMetricFamily('medsc_socketio_rooms', 'Socket.IO rooms with members (user rooms)', value=rooms)
+
+        try:
+            from routes.patients import registration_drafts
+            yield GaugeMetricFamily(
+                'medsc_registration_drafts', 'Patient registration drafts in the draft store',
+                value=len(registration_drafts)
+            )
+        except Exception as e:
+            logger.error(f"Error reading draft store size: {str(e)}")
+
+
+def _count_emits(emit):
+    @functools.wraps(emit)
+    def wrapper(event, *args, **kwargs):
+        SOCKETIO_EVENTS.labels(event, 'emitted').inc()
+        return emit(event, *args, **kwargs)
+    return wrapper
+
+
+def _start_timer():
+    g.metrics_started = time.perf_counter()
+
+
+def _remember_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+
+def _observe_latency(exc):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    status = g.pop('metrics_status', 500 if exc else 200)
+    REQUEST_LATENCY.labels(
+        request.endpoint or 'unmatched', request.method, str(status)
+    ).observe(time.perf_counter() - started)
+
+
+def metrics_view():
+    """Prometheus text exposition of this process's metrics"""
+    if METRICS_TOKEN and request.headers.get('Authorization') != f'Bearer {METRICS_TOKEN}':
+        return Response('Unauthorized\n', status=401, mimetype='text/plain')
+    return Response(generate_latest(REGISTRY), mimetype=CONTENT_TYPE_LATEST)
+
+
+def init_metrics(app, socketio):
+    """Expose /metrics and start collecting HTTP, DB pool and Socket.IO metrics.
+
+    Must run after socketio.init_app. Metrics are per process. Disabled with
+    METRICS_ENABLED=false or when prometheus_client is not installed.
+    """
+    global _state_collector
+    if not METRICS_ENABLED:
+        return
+
+    from utils.db import db
+
+    with app.app_context():
+        engine = db.engine
+
+    # create_app puede llamarse más de una vez en el mismo proceso
+    if _state_collector is not None:
+        REGISTRY.unregister(_state_collector)
+    _state_collector = AppStateCollector(engine, socketio)
+    REGISTRY.register(_state_collector)
+    if getattr(socketio, 'server', None) is not None:
+        socketio.server.emit = _count_emits(socketio.server.emit)
+
+    app.before_request(_start_timer)
+    app.after_request(_remember_status)
+    app.teardown_request(_observe_latency)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
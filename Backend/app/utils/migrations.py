@@ -0,0 +1,117 @@
+from alembic.autogenerate import renderers
+from alembic.autogenerate.rewriter import Rewriter
+from alembic.config import Config
+from alembic.operations import MigrateOperation, Operations, ops
+import os
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+# En MySQL los índices se crean sin bloquear escrituras; MIGRATION_ONLINE_DDL=false usa el DDL por defecto
+MIGRATION_ONLINE_DDL = os.environ.get('MIGRATION_ONLINE_DDL', 'true').lower() == 'true'
+ONLINE_DDL_OPTIONS = 'ALGORITHM=INPLACE, LOCK=NONE'
+
+
+def alembic_config():
+    """Alembic configuration for migrations/ (no alembic.ini needed)"""
+    config = Config()
+    config.set_main_option('script_location', MIGRATIONS_DIR)
+    return config
+
+
+def _quote(operations, name):
+    return operations.migration_context.dialect.identifier_preparer.quote(name)
+
+
+@Operations.register_operation('create_index_online')
+class CreateIndexOnlineOp(MigrateOperation):
+    """CREATE INDEX that runs as online DDL (ALGORITHM=INPLACE, LOCK=NONE) on MySQL"""
+
+    def __init__(self, index_name, table_name, columns, unique=False):
+        self.index_name = index_name
+        self.table_name = table_name
+        self.columns = list(columns)
+        self.unique = unique
+
+    @classmethod
+    def create_index_online(cls, operations, index_name, table_name, columns, unique=False):
+        return operations.invoke(cls(index_name, table_name, columns, unique))
+
+    def reverse(self):
+        return DropIndexOnlineOp(self.index_name, self.table_name, self.columns, self.unique)
+
+
+@Operations.register_operation('drop_index_online')
+class DropIndexOnlineOp(MigrateOperation):
+    """DROP INDEX that runs as online DDL on MySQL"""
+
+    def __init__(self, index_name, table_name, columns=(), unique=False):
+        self.index_name = index_name
+        self.table_name = table_name
+        self.columns = list(columns)
+        self.unique = unique
+
+    @classmethod
+    def drop_index_online(cls, operations, index_name, table_name):
+        return operations.invoke(cls(index_name, table_name))
+
+    def reverse(self):
+        return CreateIndexOnlineOp(self.index_name, self.table_name, self.columns, self.unique)
+
+
+def _online(operations):
+    # migration_context.dialect también existe en modo --sql (sin conexión)
+    return MIGRATION_ONLINE_DDL and operations.migration_context.dialect.name == 'mysql'
+
+
+@Operations.implementation_for(CreateIndexOnlineOp)
+def _create_index_online(operations, operation):
+    if not _online(operations):
+        operations.create_index(operation.index_name, operation.table_name, operation.columns,
+                                unique=operation.unique)
+        return
+    columns = ', '.join(_quote(operations, column) for column in operation.columns)
+    kind = 'UNIQUE INDEX' if operation.unique else 'INDEX'
+    operations.execute(
+        f"ALTER TABLE {_quote(operations, operation.table_name)} "
+        f"ADD {kind} {_quote(operations, operation.index_name)} ({columns}), {ONLINE_DDL_OPTIONS}"
+    )
+
+
+@Operations.implementation_for(DropIndexOnlineOp)
+def _drop_index_online(operations, operation):
+    if not _online(operations):
+        operations.drop_index(operation.index_name, table_name=operation.table_name)
+        return
+    operations.execute(
+        f"ALTER TABLE {_quote(operations, operation.table_name)} "
+        f"DROP INDEX {_quote(operations, operation.index_name)}, {ONLINE_DDL_OPTIONS}"
+    )
+
+
+@renderers.dispatch_for(CreateIndexOnlineOp)
+def _render_create_index_online(autogen_context, op):
+    unique = ', unique=True' if op.unique else ''
+    return f"op.create_index_online({op.index_name!r}, {op.table_name!r}, {op.columns!r}{unique})"
+
+
+@renderers.dispatch_for(DropIndexOnlineOp)
+def _render_drop_index_online(autogen_context, op):
+    return f"op.drop_index_online({op.index_name!r}, {op.table_name!r})"
+
+
+# Autogenerate: los índices sobre columnas de tablas existentes se escriben como operaciones online
+online_indexes = Rewriter()
+
+
+@online_indexes.rewrites(ops.CreateIndexOp)
+def _online_create_index(context, revision, op):
+    columns = [getattr(column, 'name', column) for column in op.columns]
+    if not all(isinstance(column, str) for column in columns):
+        return op  # Índices funcionales: se dejan como CREATE INDEX normal
+    return CreateIndexOnlineOp(op.index_name, op.table_name, columns, bool(op.unique))
+
+
+@online_indexes.rewrites(ops.DropIndexOp)
+def _online_drop_index(context, revision, op):
+    index = op.to_index()
+    columns = [getattr(column, 'name', column) for column in index.expressions]
+    return DropIndexOnlineOp(op.index_name, op.table_name, columns, bool(index.unique))
@@ -0,0 +1,159 @@
+from sqlalchemy import func, inspect, select, text
+from datetime import date, datetime
+import os
+
+# Ventana "caliente" por defecto (meses) de los listados y estadísticas de atenciones
+ATTENTION_HOT_MONTHS = int(os.environ.get('ATTENTION_HOT_MONTHS', 12))
+# Particiones mensuales creadas por adelantado
+ATTENTION_PARTITION_MONTHS_AHEAD = int(os.environ.get('ATTENTION_PARTITION_MONTHS_AHEAD', 3))
+# Meses recientes con partición propia; los años anteriores completos se agrupan en una partición anual
+ATTENTION_MONTHLY_PARTITIONS = int(os.environ.get('ATTENTION_MONTHLY_PARTITIONS', 24))
+
+PARTITIONED_TABLE = 'attention'
+MAXVALUE_PARTITION = 'pmax'
+
+
+def add_months(day, months):
+    """First day of the month ``months`` away from the month of ``day``"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def hot_window_start(months=ATTENTION_HOT_MONTHS, today=None):
+    """Lower date bound of the last ``months`` months (None when months is 0: no bound)"""
+    if not months:
+        return None
+    return datetime.combine(add_months(today or date.today(), -(months - 1)), datetime.min.time())
+
+
+def _month_name(day):
+    return f'p{day.year}{day.month:02d}'
+
+
+def _year_name(year):
+    return f'p{year}'
+
+
+def partition_layout(first_date, today=None, months_ahead=ATTENTION_PARTITION_MONTHS_AHEAD,
+                     monthly=ATTENTION_MONTHLY_PARTITIONS):
+    """[(name, upper bound)] for attention: yearly partitions, recent months, months ahead and pmax"""
+    today = today or date.today()
+    monthly_from = add_months(today, -(monthly - 1))
+    start = add_months(first_date or today, 0)
+
+    layout = []
+    year = start.year
+    while date(year + 1, 1, 1) <= monthly_from:
+        layout.append((_year_name(year), date(year + 1, 1, 1)))
+        year += 1
+    month = max(start, date(year, 1, 1))
+    last = add_months(today, months_ahead)
+    while month <= last:
+        layout.append((_month_name(month), add_months(month, 1)))
+        month = add_months(month, 1)
+    layout.append((MAXVALUE_PARTITION, None))
+    return layout
+
+
+def _partition_definitions(layout):
+    return ', '.join(
+        f"PARTITION {name} VALUES LESS THAN ('{bound.isoformat()}')" if bound else
+        f"PARTITION {name} VALUES LESS THAN (MAXVALUE)"
+        for name, bound in layout
+    )
+
+
+def _attention_foreign_keys(connection):
+    """(table, constraint name) of every FK from or to attention; MySQL forbids both on partitioned tables"""
+    from utils.attention_aggregate import ATTENTION_CHILDREN
+
+    inspector = inspect(connection)
+    keys = [(PARTITIONED_TABLE, fk['name']) for fk in inspector.get_foreign_keys(PARTITIONED_TABLE)]
+    for _, model, _ in ATTENTION_CHILDREN:
+        keys += [(model.__tablename__, fk['name']) for fk in inspector.get_foreign_keys(model.__tablename__)
+                 if fk['referred_table'] == PARTITIONED_TABLE]
+    return keys
+
+
+def partition_statements(connection, today=None):
+    """DDL that turns attention into a RANGE COLUMNS(date) partitioned table"""
+    from models.models_flask import Attention
+
+    first_date = connection.execute(select(func.min(Attention.date))).scalar()
+    if isinstance(first_date, datetime):
+        first_date = first_date.date()
+    statements = [f'ALTER TABLE `{table}` DROP FOREIGN KEY `{name or "?"}`'
+                  for table, name in _attention_foreign_keys(connection)]
+    # Toda clave única debe incluir la columna de partición
+    statements.append(f'ALTER TABLE `{PARTITIONED_TABLE}` DROP PRIMARY KEY, ADD PRIMARY KEY (`id`, `date`)')
+    statements.append(f'ALTER TABLE `{PARTITIONED_TABLE}` PARTITION BY RANGE COLUMNS(`date`) '
+                      f'({_partition_definitions(partition_layout(first_date, today))})')
+    return statements
+
+
+def existing_partitions(connection):
+    """[(name, upper bound, estimated rows)] of attention, in order; empty when it is not partitioned"""
+    if connection.dialect.name != 'mysql':
+        return []
+    rows = connection.execute(text(
+        'SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS FROM information_schema.PARTITIONS '
+        'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL '
+        'ORDER BY PARTITION_ORDINAL_POSITION'
+    ), {'table': PARTITIONED_TABLE}).fetchall()
+    partitions = []
+    for name, description, table_rows in rows:
+        bound = None
+        if description and description.upper() != 'MAXVALUE':
+            bound = datetime.fromisoformat(description.strip("'")).date()
+        partitions.append((name, bound, table_rows))
+    return partitions
+
+
+def is_partitioned(connection):
+    return bool(existing_partitions(connection))
+
+
+def maintenance_statements(partitions, today=None, months_ahead=ATTENTION_PARTITION_MONTHS_AHEAD,
+                           monthly=ATTENTION_MONTHLY_PARTITIONS):
+    """Rolling maintenance: add the months ahead and fold old complete years into one partition each"""
+    today = today or date.today()
+    statements = []
+    bounded = [(name, bound) for name, bound, _ in partitions if bound]
+    has_maxvalue = any(bound is None for _, bound, _ in partitions)
+
+    # Meses por delante, partiendo pmax (vacía) o añadiéndolos al final
+    upper = bounded[-1][1] if bounded else add_months(today, 0)
+    target = add_months(today, months_ahead + 1)
+    new = []
+    while upper < target:
+        new.append((_month_name(upper), add_months(upper, 1)))
+        upper = add_months(upper, 1)
+    if new and has_maxvalue:
+        statements.append(f'ALTER TABLE `{PARTITIONED_TABLE}` REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO '
+                          f'({_partition_definitions(new + [(MAXVALUE_PARTITION, None)])})')
+    elif new:
+        statements.append(f'ALTER TABLE `{PARTITIONED_TABLE}` ADD PARTITION ({_partition_definitions(new)})')
+
+    # Años completos fuera de la ventana mensual: sus meses pasan a una sola partición
+    monthly_from = add_months(today, -(monthly - 1))
+    by_year = {}
+    for name, bound in bounded:
+        if len(name) == 7:
+            by_year.setdefault(add_months(bound, -1).year, []).append((name, bound))
+    for year, months in sorted(by_year.items()):
+        closing = date(year + 1, 1, 1)
+        if closing > monthly_from or months[-1][1] != closing:
+            continue
+        names = ', '.join(name for name, _ in months)
+        statements.append(f'ALTER TABLE `{PARTITIONED_TABLE}` REORGANIZE PARTITION {names} INTO '
+                          f'({_partition_definitions([(_year_name(year), closing)])})')
+    return statements
+
+
+def skip_partitioned_foreign_keys(partitioned):
+    """Alembic include_object hook: once attention is partitioned its FKs no longer exist in MySQL"""
+    def include_object(object, name, type_, reflected, compare_to):
+        if partitioned and type_ == 'foreign_key_constraint':
+            return not (object.table.name == PARTITIONED_TABLE or object.referred_table.name == PARTITIONED_TABLE)
+        return True
+    return include_object
@@ -0,0 +1,209 @@
+from models.models_flask import Patient
+from utils.db import db
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import datetime
+import csv
+import io
+import json
+
+# Filas por transacción (validación, búsqueda de duplicados e inserción)
+IMPORT_CHUNK_SIZE = 1000
+
+# Campos de entrada (mismos nombres que POST /api/patients) -> columna de Patient
+PATIENT_IMPORT_FIELDS = {
+    'identification_type': 'identifierType',
+    'identification_number': 'identifierCode',
+    'first_name': 'firstName',
+    'middle_name': 'middleName',
+    'last_name': 'lastName1',
+    'last_name2': 'lastName2',
+    'nationality': 'nationality',
+    'address': 'address',
+    'phone': 'phoneNumber',
+    'date_of_birth': 'birthdate',
+    'gender': 'gender',
+    'sex': 'sex',
+    'civil_status': 'civilStatus',
+    'job': 'job',
+    'blood_type': 'bloodType',
+    'email': 'email'
+}
+
+REQUIRED_IMPORT_FIELDS = (
+    'identification_type', 'identification_number', 'first_name', 'last_name', 'address', 'date_of_birth'
+)
+
+# Valores permitidos tomados de los Enum del modelo, para no duplicarlos aquí
+ENUM_IMPORT_FIELDS = {
+    field: frozenset(Patient.__table__.c[column].type.enums)
+    for field, column in PATIENT_IMPORT_FIELDS.items()
+    if hasattr(Patient.__table__.c[column].type, 'enums')
+}
+
+
+def iter_import_rows(stream, import_format):
+    """Yield (row_number, dict_or_None, parse_error) from a CSV or NDJSON text stream"""
+    if import_format == 'csv':
+        for row_number, row in enumerate(csv.DictReader(stream), start=1):
+            yield row_number, row, None
+        return
+
+    row_number = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f'JSON inválido: {str(e)}'
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, 'Se esperaba un objeto JSON por línea'
+            continue
+        yield row_number, row, None
+
+
+def _normalize(row):
+    """Strip string values and turn empty strings into None"""
+    values = {}
+    for field in PATIENT_IMPORT_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip() or None
+        values[field] = value
+    return values
+
+
+def validate_chunk(rows):
+    """Validate a chunk of (row_number, values) pairs column by column.
+
+    Returns {row_number: error_message} for the invalid rows. Each rule is
+    applied to the whole chunk at once, so the cost per row is a dict lookup.
+    """
+    errors = {}
+
+    for field in REQUIRED_IMPORT_FIELDS:
+        for row_number, values in rows:
+            if values[field] is None:
+                errors.setdefault(row_number, f'El campo {field} es requerido')
+
+    for field, allowed in ENUM_IMPORT_FIELDS.items():
+        invalid = {values[field] for _, values in rows if values[field] is not None} - allowed
+        if not invalid:
+            continue
+        for row_number, values in rows:
+            if values[field] in invalid:
+                errors.setdefault(row_number, f"Valor inválido para {field}: {values[field]}")
+
+    for row_number, values in rows:
+        if row_number in errors or values['date_of_birth'] is None:
+            continue
+        try:
+            values['date_of_birth'] = datetime.strptime(str(values['date_of_birth']), '%Y-%m-%d').date()
+        except ValueError:
+            errors[row_number] = 'Formato de fecha inválido en date_of_birth (use YYYY-MM-DD)'
+
+    return errors
+
+
+def _insert_rows(to_insert, errors):
+    """Insert ``[(row_number, record)]`` with one executemany; on failure split it in halves.
+
+    Each attempt runs in a SAVEPOINT, so a failing half is rolled back alone
+    and only the offending rows end up in ``errors``. Returns rows inserted.
+    """
+    try:
+        with db.session.begin_nested():
+            # executemany: una sentencia INSERT con todos los parámetros del lote
+            db.session.execute(insert(Patient.__table__), [record for _, record in to_insert])
+        return len(to_insert)
+    except SQLAlchemyError as e:
+        if len(to_insert) == 1:
+            errors[to_insert[0][0]] = f'Error al insertar la fila: {str(e.__cause__ or e)}'
+            return 0
+    middle = len(to_insert) // 2
+    return _insert_rows(to_insert[:middle], errors) + _insert_rows(to_insert[middle:], errors)
+
+
+def _import_chunk(chunk, seen_codes, created_by, dry_run, result):
+    """Validate, de-duplicate and insert one chunk in a single transaction"""
+    errors = validate_chunk(chunk)
+    valid = [(row_number, values) for row_number, values in chunk if row_number not in errors]
+
+    # Una sola consulta IN por lote (incluye pacientes eliminados: identifierCode es único)
+    codes = {str(values['identification_number']) for _, values in valid}
+    existing = set(db.session.execute(
+        select(Patient.identifierCode).where(Patient.identifierCode.in_(codes))
+        .execution_options(include_deleted=True)
+    ).scalars()) if codes else set()
+
+    to_insert = []
+    for row_number, values in valid:
+        code = str(values['identification_number'])
+        if code in existing:
+            errors[row_number] = 'Ya existe un paciente con este número de identificación'
+        elif code in seen_codes:
+            errors[row_number] = 'Número de identificación duplicado en el archivo'
+        else:
+            seen_codes.add(code)
+            record = {column: values[field] for field, column in PATIENT_IMPORT_FIELDS.items()}
+            record['identifierCode'] = code
+            record['created_by'] = created_by
+            record['updated_by'] = created_by
+            record['is_deleted'] = False
+            to_insert.append((row_number, record))
+
+    inserted = len(to_insert)
+    if to_insert and not dry_run:
+        try:
+            inserted = _insert_rows(to_insert, errors)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            for row_number, _ in to_insert:
+                errors.setdefault(row_number, f'Error al insertar el lote: {str(e.__cause__ or e)}')
+            inserted = 0
+
+    result['inserted'] += inserted
+    result['errors'].extend(
+        {'row': row_number, 'error': message} for row_number, message in sorted(errors.items())
+    )
+
+
+def import_patients(rows, created_by, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False):
+    """Import patients from an iterable produced by iter_import_rows.
+
+    Rows are processed in chunks of ``chunk_size``: validation, one duplicate
+    lookup and one executemany insert per chunk, each chunk committed on its
+    own. Invalid rows are skipped and reported; they never abort the import,
+    and a row the database rejects is isolated by splitting the insert.
+    Returns {'total', 'inserted', 'dry_run', 'errors': [{'row', 'error'}]};
+    with ``dry_run`` nothing is written and 'inserted' counts the rows that
+    would have been inserted.
+    """
+    result = {'total': 0, 'inserted': 0, 'dry_run': dry_run, 'errors': []}
+    seen_codes = set()
+    chunk = []
+
+    for row_number, row, parse_error in rows:
+        result['total'] += 1
+        if parse_error:
+            result['errors'].append({'row': row_number, 'error': parse_error})
+            continue
+        chunk.append((row_number, _normalize(row)))
+        if len(chunk) >= chunk_size:
+            _import_chunk(chunk, seen_codes, created_by, dry_run, result)
+            chunk = []
+
+    if chunk:
+        _import_chunk(chunk, seen_codes, created_by, dry_run, result)
+
+    result['errors'].sort(key=lambda error: error['row'])
+    return result
+
+
+def open_import_stream(binary_stream):
+    """Wrap an uploaded binary stream as text (UTF-8, tolerating a BOM)"""
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
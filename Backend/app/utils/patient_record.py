@@ -0,0 +1,165 @@
+from models.models_flask import (
+    Patient, Doctor, Attention, Allergy, EmergencyContact, PreExistingCondition, FamilyBackground
+)
+from utils.db import db
+from utils.attention_aggregate import load_attention_children, serialize_attention_clinical
+from sqlalchemy import select
+
+# Número máximo de ids por cláusula IN al cargar hijos de atenciones
+IN_CLAUSE_CHUNK = 1000
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def serialize_patient_demographics(patient):
+    """Serialize the demographic columns of a patient"""
+    return {
+        'id': patient.id,
+        'identifierType': patient.identifierType,
+        'identifierCode': patient.identifierCode,
+        'firstName': patient.firstName,
+        'middleName': patient.middleName,
+        'lastName1': patient.lastName1,
+        'lastName2': patient.lastName2,
+        'nationality': patient.nationality,
+        'address': patient.address,
+        'phoneNumber': patient.phoneNumber,
+        'birthdate': patient.birthdate.isoformat() if patient.birthdate else None,
+        'gender': patient.gender,
+        'sex': patient.sex,
+        'civilStatus': patient.civilStatus,
+        'job': patient.job,
+        'bloodType': patient.bloodType,
+        'email': patient.email,
+        'created_at': patient.created_at.isoformat() if patient.created_at else None,
+        'updated_at': patient.updated_at.isoformat() if patient.updated_at else None
+    }
+
+
+# Tablas hijas de un paciente: (clave en la respuesta, modelo, serializador)
+PATIENT_CHILDREN = (
+    ('allergies', Allergy, lambda allergy: {
+        'id': allergy.id,
+        'allergy': allergy.allergies
+    }),
+    ('emergencyContacts', EmergencyContact, lambda contact: {
+        'id': contact.id,
+        'firstName': contact.firstName,
+        'lastName': contact.lastName,
+        'relationship': contact.relationship,
+        'phoneNumber1': contact.phoneNumber1,
+        'phoneNumber2': contact.phoneNumber2,
+        'address': contact.address
+    }),
+    ('preExistingConditions', PreExistingCondition, lambda condition: {
+        'id': condition.id,
+        'diseaseName': condition.diseaseName,
+        'time': condition.time.isoformat() if condition.time else None,
+        'medicament': condition.medicament,
+        'treatment': condition.treatment
+    }),
+    ('familyBackgrounds', FamilyBackground, lambda background: {
+        'id': background.id,
+        'familyBackground': background.familyBackground,
+        'time': background.time.isoformat() if background.time else None,
+        'degreeRelationship': background.degreeRelationship
+    }),
+)
+
+
+def load_patient_child_rows(patient_ids):
+    """Load the non-deleted allergies, contacts, conditions and backgrounds of several patients.
+
+    Issues one IN query per child table. Returns {patient_id: {child_key: [row, ...]}}.
+    """
+    children = {patient_id: {key: [] for key, _, _ in PATIENT_CHILDREN} for patient_id in patient_ids}
+    if not patient_ids:
+        return children
+
+    for key, model, _ in PATIENT_CHILDREN:
+        rows = model.query.filter(
+            model.idPatient.in_(patient_ids),
+            model.is_deleted == False
+        ).order_by(model.idPatient, model.id).all()
+        for row in rows:
+            children[row.idPatient][key].append(row)
+
+    return children
+
+
+def load_patient_children(patient_ids):
+    """Same as load_patient_child_rows, with every row serialized for export"""
+    serializers = {key: serialize for key, _, serialize in PATIENT_CHILDREN}
+    return {
+        patient_id: {key: [serializers[key](row) for row in rows] for key, rows in child_rows.items()}
+        for patient_id, child_rows in load_patient_child_rows(patient_ids).items()
+    }
+
+
+def load_patient_attentions(patient_ids):
+    """Load every non-deleted attention (with doctor and child tables) of several patients.
+
+    Returns {patient_id: [attention_dict, ...]} ordered by date, using one query
+    for attentions and one UNION ALL query per IN_CLAUSE_CHUNK attentions.
+    """
+    attentions = {patient_id: [] for patient_id in patient_ids}
+    if not patient_ids:
+        return attentions
+
+    rows = db.session.execute(
+        select(Attention, Doctor)
+        .join(Attention.doctor)
+        .where(Attention.idPatient.in_(patient_ids), Attention.is_deleted == False)
+        .order_by(Attention.idPatient, Attention.date, Attention.id)
+    ).all()
+
+    children = {}
+    for id_chunk in _chunks([attention_record.id for attention_record, _ in rows], IN_CLAUSE_CHUNK):
+        children.update(load_attention_children(id_chunk))
+
+    for attention_record, doctor in rows:
+        attention_data = serialize_attention_clinical({
+            'attention': attention_record,
+            'patient': None,
+            'doctor': doctor,
+            'children': children[attention_record.id]
+        })
+        attention_data.pop('patient')
+        attentions[attention_record.idPatient].append(attention_data)
+
+    return attentions
+
+
+def iter_patient_records(patient_ids=None, batch_size=100):
+    """Yield complete clinical records (patient, related data and all attentions).
+
+    When ``patient_ids`` is None every non-deleted patient is exported. Patients
+    are processed in batches of ``batch_size``, so the number of queries grows
+    with the number of batches rather than with the number of patients.
+    """
+    if patient_ids is None:
+        patient_ids = db.session.execute(
+            select(Patient.id).where(Patient.is_deleted == False).order_by(Patient.id)
+        ).scalars().all()
+
+    for id_batch in _chunks(list(patient_ids), batch_size):
+        patients_batch = Patient.query.filter(
+            Patient.id.in_(id_batch),
+            Patient.is_deleted == False
+        ).order_by(Patient.id).all()
+        found_ids = [patient.id for patient in patients_batch]
+
+        children = load_patient_children(found_ids)
+        attentions = load_patient_attentions(found_ids)
+
+        for patient in patients_batch:
+            record = {'patient': serialize_patient_demographics(patient)}
+            record.update(children[patient.id])
+            record['attentions'] = attentions[patient.id]
+            yield record
+
+        # Liberar los objetos del lote antes de cargar el siguiente
+        db.session.expunge_all()
@@ -0,0 +1,171 @@
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from collections import Counter
+from contextlib import contextmanager
+import logging
+import os
+import re
+import threading
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# off | warn | raise. Por defecto solo avisa en modo debug
+N_PLUS_ONE_GUARD = os.environ.get('N_PLUS_ONE_GUARD')
+# Veces que puede repetirse la misma forma de consulta antes de considerarse N+1
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+STACK_DEPTH = 8
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%\(\w+\)s|%s|\?|:\w+')
+_PLACEHOLDER_LIST = re.compile(r'\?(?:\s*,\s*\?)+')
+_WHITESPACE = re.compile(r'\s+')
+
+_local = threading.local()
+
+
+class NPlusOneError(AssertionError):
+    """Raised when a statement shape repeats more often than the threshold allows"""
+
+
+def normalize_statement(statement):
+    """Reduce a SQL statement to its shape: literals, placeholders and IN lists collapsed"""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _PLACEHOLDER.sub('?', shape)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('?', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def _app_stack():
+    """Call stack limited to frames inside the application code"""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(APP_ROOT) and frame.filename != __file__
+    ]
+    return ''.join(traceback.format_list(frames[-STACK_DEPTH:]))
+
+
+class QueryShapeDetector:
+    """Counts executed statements by shape and keeps the stack of the first repetition past the threshold"""
+
+    def __init__(self, threshold=N_PLUS_ONE_THRESHOLD, label=''):
+        self.threshold = threshold
+        self.label = label
+        self.counts = Counter()
+        self.stacks = {}
+
+    def record(self, statement):
+        shape = normalize_statement(statement)
+        self.counts[shape] += 1
+        if self.counts[shape] == self.threshold + 1:
+            self.stacks[shape] = _app_stack()
+
+    def violations(self):
+        return [
+            (shape, count, self.stacks.get(shape, ''))
+            for shape, count in self.counts.most_common()
+            if count > self.threshold
+        ]
+
+    def report(self):
+        lines = [f"Possible N+1 queries{' in ' + self.label if self.label else ''} "
+                 f"(threshold {self.threshold}):"]
+        for shape, count, stack in self.violations():
+            lines.append(f"  {count}x  {shape[:300]}")
+            if stack:
+                lines.append('    at:\n' + '\n'.join(f'    {line}' for line in stack.rstrip().splitlines()))
+        return '\n'.join(lines)
+
+    def check(self, mode='raise'):
+        if mode == 'off' or not self.violations():
+            return
+        if mode == 'raise':
+            raise NPlusOneError(self.report())
+        logger.warning(self.report())
+
+
+def _active_detectors():
+    detectors = list(getattr(_local, 'detectors', ()))
+    if has_request_context() and g.get('query_guard') is not None:
+        detectors.append(g.query_guard)
+    return detectors
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    for detector in _active_detectors():
+        detector.record(statement)
+
+
+@contextmanager
+def detect_n_plus_one(threshold=N_PLUS_ONE_THRESHOLD, mode='raise', label=''):
+    """Check the statements executed inside the block for repeated shapes.
+
+    Example:
+        with detect_n_plus_one(threshold=3):
+            client.get('/api/patients')
+    """
+    detector = QueryShapeDetector(threshold, label)
+    if not hasattr(_local, 'detectors'):
+        _local.detectors = []
+    _local.detectors.append(detector)
+    try:
+        yield detector
+    finally:
+        _local.detectors.remove(detector)
+    detector.check(mode)
+
+
+def query_guard_fixture(threshold=N_PLUS_ONE_THRESHOLD):
+    """Generator usable as a pytest fixture; fails the test on N+1 patterns.
+
+    In conftest.py:
+        n_plus_one = pytest.fixture(query_guard_fixture)
+    """
+    with detect_n_plus_one(threshold=threshold, mode='raise', label='test') as detector:
+        yield detector
+
+
+def _guard_mode(app):
+    return (N_PLUS_ONE_GUARD or ('warn' if app.debug or app.testing else 'off')).lower()
+
+
+def _start_guard():
+    mode = _guard_mode(current_app)
+    if mode != 'off':
+        g.query_guard = QueryShapeDetector(label=f'{request.method} {request.path}')
+        g.query_guard_mode = mode
+
+
+def _check_response(response):
+    detector = g.get('query_guard')
+    if detector is not None and not response.is_streamed:
+        g.query_guard = None
+        detector.check(g.query_guard_mode)
+    return response
+
+
+def _check_streamed(exc):
+    detector = g.pop('query_guard', None)
+    if detector is not None:
+        detector.check('warn')
+
+
+def init_query_guard(app):
+    """Check every request for N+1 patterns (N_PLUS_ONE_GUARD=off|warn|raise).
+
+    Defaults to warn in debug/testing mode and off otherwise. In raise mode the
+    error propagates to the test client or debugger; streamed responses are
+    checked once the body has been sent and can only be logged.
+    """
+    if (N_PLUS_ONE_GUARD or '').lower() == 'off':
+        return
+
+    app.before_request(_start_guard)
+    app.after_request(_check_response)
+    app.teardown_request(_check_streamed)
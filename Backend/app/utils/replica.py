@@ -0,0 +1,140 @@
+from flask import g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, text
+from functools import wraps
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+# Retraso máximo (segundos) aceptado de la réplica; con más, las lecturas vuelven al primario
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+# Cada cuánto se vuelve a medir el retraso (segundos)
+REPLICA_LAG_CHECK_SECONDS = float(os.environ.get('REPLICA_LAG_CHECK_SECONDS', 5))
+# Tras escribir, el mismo cliente lee del primario durante este tiempo (cookie db_primary)
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 10))
+PRIMARY_COOKIE = 'db_primary'
+
+_lag = {'value': None, 'checked_at': 0.0}
+_lag_lock = threading.Lock()
+
+
+def _measure_lag(engine):
+    """Seconds the replica is behind its source; inf when unknown (replication stopped or no access)"""
+    if engine.dialect.name != 'mysql':
+        return 0.0
+    with engine.connect() as connection:
+        for statement, column in (('SHOW REPLICA STATUS', 'Seconds_Behind_Source'),
+                                  ('SHOW SLAVE STATUS', 'Seconds_Behind_Master')):
+            try:
+                row = connection.execute(text(statement)).mappings().first()
+            except Exception:
+                continue
+            if row is None:
+                return 0.0  # No es una réplica (p. ej. el mismo servidor)
+            lag = row.get(column)
+            return float('inf') if lag is None else float(lag)
+    return float('inf')
+
+
+def replica_lag(engine):
+    """Replica lag in seconds, measured at most every REPLICA_LAG_CHECK_SECONDS"""
+    with _lag_lock:
+        if _lag['value'] is not None and time.monotonic() - _lag['checked_at'] < REPLICA_LAG_CHECK_SECONDS:
+            return _lag['value']
+        try:
+            lag = _measure_lag(engine)
+        except Exception as e:
+            logger.error(f"Error checking replica lag: {str(e)}")
+            lag = float('inf')
+        _lag['value'] = lag
+        _lag['checked_at'] = time.monotonic()
+        return lag
+
+
+def _replica_engine():
+    from utils.db import db
+    return db.engines.get(REPLICA_BIND)
+
+
+def choose_read_engine(max_lag=REPLICA_MAX_LAG_SECONDS):
+    """Replica engine for this request's reads, or None to stay on the primary"""
+    engine = _replica_engine()
+    if engine is None:
+        return None
+    if has_request_context() and request.cookies.get(PRIMARY_COOKIE):
+        return None  # Read-your-writes: este cliente escribió hace poco
+    lag = replica_lag(engine)
+    if lag > max_lag:
+        logger.warning(f"Replica lag {lag}s over {max_lag}s, reading from primary")
+        return None
+    return engine
+
+
+def replica_reads(view=None, max_lag=REPLICA_MAX_LAG_SECONDS):
+    """Send the plain SELECTs of a read-only view to the replica bind (DATABASE_REPLICA_URL).
+
+    Writes, SELECT ... FOR UPDATE and every read after the request's first
+    flush stay on the primary. Without a replica, or when it lags more than
+    ``max_lag`` seconds, the view reads from the primary as before.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            g.read_engine = choose_read_engine(max_lag)
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator(view) if view is not None else decorator
+
+
+def read_engine():
+    """Engine for dedicated read sessions (streaming): the request's replica, else the primary"""
+    from utils.db import db
+    engine = g.get('read_engine') if has_app_context() else None
+    return engine if engine is not None else db.engine
+
+
+def _is_plain_select(clause):
+    return clause is not None and getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+
+class RoutingSession(Session):
+    """db.session that sends the reads of @replica_reads views to the replica bind"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and not self.info.get('wrote') and has_app_context():
+            replica = g.get('read_engine')
+            if replica is not None and _is_plain_select(clause):
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _mark_write(session):
+    session.info['wrote'] = True
+    if has_request_context():
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    _mark_write(session)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _after_bulk_write(execute_state):
+    if execute_state.is_insert or execute_state.is_update or execute_state.is_delete:
+        _mark_write(execute_state.session)
+
+
+def _read_your_writes_cookie(response):
+    if g.get('db_wrote') and _replica_engine() is not None:
+        response.set_cookie(PRIMARY_COOKIE, '1', max_age=READ_YOUR_WRITES_SECONDS, httponly=True, samesite='Lax')
+    return response
+
+
+def init_replica(app):
+    """Mark clients that just wrote so their next reads skip the replica"""
+    app.after_request(_read_your_writes_cookie)
@@ -0,0 +1,295 @@
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects import mysql, sqlite
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Sesiones en memoria de proceso: cuántas y durante cuánto tiempo (segundos) se reutilizan.
+# Desactivado por defecto (0): un logout en otro worker no invalida esta copia local.
+# Activarlo solo con un único proceso por store.
+SESSION_CACHE_SIZE = int(os.environ.get('SESSION_CACHE_SIZE', 2048))
+SESSION_CACHE_SECONDS = float(os.environ.get('SESSION_CACHE_SECONDS', 0))
+
+_SID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{32}$')
+
+
+class ServerSession(CallbackDict, SessionMixin):
+    """Session whose data lives in a SessionStore; the cookie only carries ``sid``"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+            self.accessed = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.accessed = False
+        self.replaced_sids = []
+
+    def regenerate(self):
+        """Move the data to a new sid (on login, against session fixation); the old row is deleted on save"""
+        if not self.new:
+            self.replaced_sids.append(self.sid)
+        self.sid = secrets.token_urlsafe(24)
+        self.new = True
+        self.modified = True
+
+    def __getitem__(self, key):
+        self.accessed = True
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        self.accessed = True
+        return super().get(key, default)
+
+    def setdefault(self, key, default=None):
+        self.accessed = True
+        return super().setdefault(key, default)
+
+
+class SqliteSessionStore:
+    """Sessions in a local SQLite file, shared by the worker processes of one machine"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS sessions (sid TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, sid):
+        row = self._connection().execute(
+            'SELECT data FROM sessions WHERE sid = ? AND expires_at > ?', (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, sid, data, ttl):
+        with self._connection() as connection:
+            connection.execute('INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)',
+                               (sid, data, time.time() + ttl))
+
+    def delete(self, sid):
+        with self._connection() as connection:
+            connection.execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+
+    def evict_expired(self):
+        with self._connection() as connection:
+            return connection.execute('DELETE FROM sessions WHERE expires_at <= ?', (time.time(),)).rowcount
+
+
+class DatabaseSessionStore:
+    """Sessions in the server_sessions table, shared by every worker and host.
+
+    Uses its own connection, so it never commits pending ORM changes of the request.
+    """
+
+    def __init__(self):
+        from models.models_flask import ServerSession as ServerSessionRow
+        self.table = ServerSessionRow.__table__
+
+    @property
+    def engine(self):
+        from utils.db import db
+        return db.engine
+
+    def get(self, sid):
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(self.table.c.data).where(self.table.c.sid == sid, self.table.c.expires_at > datetime.now())
+            ).scalar()
+
+    def _upsert(self, dialect, values):
+        """Single-statement INSERT or UPDATE on sid (no DELETE + INSERT race on the primary key)"""
+        if dialect == 'mysql':
+            stmt = mysql.insert(self.table).values(**values)
+            return stmt.on_duplicate_key_update(data=stmt.inserted.data, expires_at=stmt.inserted.expires_at)
+        if dialect == 'sqlite':
+            stmt = sqlite.insert(self.table).values(**values)
+            return stmt.on_conflict_do_update(index_elements=[self.table.c.sid],
+                                              set_={'data': stmt.excluded.data, 'expires_at': stmt.excluded.expires_at})
+        return None
+
+    def set(self, sid, data, ttl):
+        values = {'sid': sid, 'data': data, 'expires_at': datetime.now() + timedelta(seconds=ttl)}
+        with self.engine.begin() as connection:
+            stmt = self._upsert(connection.dialect.name, values)
+            if stmt is not None:
+                connection.execute(stmt)
+            else:
+                connection.execute(delete(self.table).where(self.table.c.sid == sid))
+                connection.execute(insert(self.table).values(**values))
+
+    def delete(self, sid):
+        with self.engine.begin() as connection:
+            connection.execute(delete(self.table).where(self.table.c.sid == sid))
+
+    def evict_expired(self):
+        with self.engine.begin() as connection:
+            return connection.execute(delete(self.table).where(self.table.c.expires_at <= datetime.now())).rowcount
+
+
+class CachedSessionStore:
+    """LRU of hot sessions in front of another store (write-through).
+
+    Entries are reused for ``ttl`` seconds only, so a session changed by
+    another worker process is seen again after at most that long.
+    """
+
+    def __init__(self, backend, size=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_SECONDS):
+        self.backend = backend
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, sid, data):
+        with self._lock:
+            self._entries[sid] = (time.monotonic() + self.ttl, data)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def get(self, sid):
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._entries.move_to_end(sid)
+                    return entry[1]
+                del self._entries[sid]
+        data = self.backend.get(sid)
+        if data is not None:
+            self._remember(sid, data)
+        return data
+
+    def set(self, sid, data, ttl):
+        self.backend.set(sid, data, ttl)
+        self._remember(sid, data)
+
+    def delete(self, sid):
+        with self._lock:
+            self._entries.pop(sid, None)
+        self.backend.delete(sid)
+
+    def evict_expired(self):
+        return self.backend.evict_expired()
+
+
+class ServerSessionInterface(SessionInterface):
+    """Flask session interface storing session data server-side under a random 32-character id"""
+
+    serializer = TaggedJSONSerializer()
+    SWEEP_EVERY = 500
+
+    def __init__(self, store):
+        self.store = store
+        self._writes = 0
+
+    def _ttl(self, app):
+        return int(app.permanent_session_lifetime.total_seconds())
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and _SID_PATTERN.match(sid):
+            try:
+                data = self.store.get(sid)
+            except Exception as e:
+                logger.error(f"Error reading session {sid[:6]}...: {str(e)}")
+                data = None
+            if data is not None:
+                try:
+                    return ServerSession(self.serializer.loads(data), sid=sid)
+                except ValueError:
+                    pass
+        return ServerSession(sid=secrets.token_urlsafe(24), new=True)
+
+    def issue(self, app, data):
+        """Store ``data`` as a new session and return its id (the cookie value)"""
+        sid = secrets.token_urlsafe(24)
+        self.store.set(sid, self.serializer.dumps(dict(data)), self._ttl(app))
+        return sid
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        for sid in session.replaced_sids:
+            self.store.delete(sid)
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+
+        if session.modified:
+            self.store.set(session.sid, self.serializer.dumps(dict(session)), self._ttl(app))
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                self.store.evict_expired()
+        if session.new or session.modified or self.should_set_cookie(app, session):
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=httponly, domain=domain, path=path, secure=secure, samesite=samesite)
+            response.vary.add('Cookie')
+
+
+def create_session_store(app):
+    """Pick the session backend: SESSION_STORE=cookie|sqlite|database; database by default when USE_DATABASE=true"""
+    backend = os.environ.get('SESSION_STORE')
+    if not backend:
+        backend = 'database' if os.environ.get('USE_DATABASE', 'false').lower() == 'true' else 'sqlite'
+    if backend == 'cookie':
+        return None
+    if backend == 'database':
+        store = DatabaseSessionStore()
+    else:
+        path = os.environ.get('SESSION_SQLITE_PATH') or os.path.join(app.instance_path, 'sessions.db')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        store = SqliteSessionStore(path)
+    return CachedSessionStore(store) if SESSION_CACHE_SECONDS > 0 else store
+
+
+def regenerate_session(session):
+    """Issue a new session id when the user logs in; no-op with signed-cookie sessions"""
+    regenerate = getattr(session, 'regenerate', None)
+    if regenerate is not None:
+        regenerate()
+
+
+def init_session_store(app):
+    """Keep sessions server-side; the cookie carries only the session id"""
+    store = create_session_store(app)
+    if store is not None:
+        app.session_interface = ServerSessionInterface(store)
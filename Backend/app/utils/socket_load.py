@@ -0,0 +1,342 @@
+from utils.benchmark import latency_summary
+from collections import Counter
+import logging
+import random
+import re
+import threading
+import time
+import uuid
+
+import requests
+import socketio
+
+logger = logging.getLogger(__name__)
+
+# Tiempo de espera tras la carga para recibir los eventos pendientes
+DRAIN_SECONDS = 5
+CONNECT_TIMEOUT = 10
+RESOURCE_SAMPLE_INTERVAL = 1.0
+
+_METRIC_LINE = re.compile(r'^(\w+)(?:\{[^}]*\})? ([0-9.eE+-]+|NaN)$')
+
+
+class LoadStats:
+    """Counters and latencies shared by all simulated doctors"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = Counter()
+        self.pending = {}  # tag -> send time of messages not delivered yet
+        self.delivery_latencies = []
+        self.connect_latencies = []
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] += amount
+
+    def message_sent(self, tag):
+        with self.lock:
+            self.counters['messages_sent'] += 1
+            self.pending[tag] = time.perf_counter()
+
+    def message_not_sent(self, tag):
+        # The emit failed on the client side, so it is not counted as dropped
+        with self.lock:
+            self.counters['messages_sent'] -= 1
+            self.pending.pop(tag, None)
+
+    def message_delivered(self, tag):
+        received = time.perf_counter()
+        with self.lock:
+            sent = self.pending.pop(tag, None)
+            if sent is None:
+                self.counters['messages_unexpected'] += 1
+                return
+            self.counters['messages_delivered'] += 1
+            self.delivery_latencies.append((received - sent) * 1000)
+
+    def connected(self, elapsed):
+        with self.lock:
+            self.counters['connects'] += 1
+            self.connect_latencies.append(elapsed * 1000)
+
+
+def _close_quietly(client):
+    try:
+        client.disconnect()
+    except Exception:
+        pass
+
+
+class SimulatedDoctor:
+    """One doctor with its own Socket.IO connection and authenticated session cookie"""
+
+    def __init__(self, index, server_url, cookie, origin, user_id, stats, transport):
+        self.index = index
+        self.server_url = server_url
+        self.cookie = cookie
+        self.origin = origin
+        self.user_id = user_id
+        self.stats = stats
+        self.transport = transport
+        self.sequence = 0
+        self.client = None
+        self.failed_connects = 0
+
+    @property
+    def online(self):
+        return self.client is not None and self.client.connected
+
+    def connect(self):
+        # websocket-client sets its own Origin header, so it is passed as an option there
+        client = socketio.Client(reconnection=False, websocket_extra_options={'origin': self.origin})
+        headers = {'Cookie': self.cookie}
+        if self.transport == 'polling':
+            headers['Origin'] = self.origin
+        client.on('new_message', self._on_new_message)
+        client.on('message_sent', lambda data: self.stats.count('messages_acked'))
+        client.on('message_error', lambda data: self.stats.count('message_errors'))
+        client.on('user_typing', lambda data: self.stats.count('typing_received'))
+        client.on('user_status', lambda data: self.stats.count('presence_received'))
+        started = time.perf_counter()
+        try:
+            client.connect(self.server_url, headers=headers,
+                           transports=[self.transport], wait_timeout=CONNECT_TIMEOUT)
+        except Exception as e:
+            if not self.failed_connects:
+                logger.error(f"Doctor {self.index} failed to connect: {str(e)}")
+            self.failed_connects += 1
+            self.stats.count('connect_failures')
+            return False
+        self.stats.connected(time.perf_counter() - started)
+        self.client = client
+        return True
+
+    def disconnect(self, wait=True):
+        """Close the connection; with ``wait=False`` the close handshake runs in the background"""
+        client, self.client = self.client, None
+        if client is None:
+            return None
+        closer = threading.Thread(target=_close_quietly, args=(client,), daemon=True)
+        closer.start()
+        if wait:
+            closer.join()
+        return closer
+
+    def _on_new_message(self, data):
+        text = (data or {}).get('message', '')
+        if text.startswith('load '):
+            self.stats.message_delivered(text.split(' ', 1)[1])
+
+    def _emit(self, event, data):
+        try:
+            self.client.emit(event, data)
+            return True
+        except Exception:
+            self.stats.count('emit_failures')
+            return False
+
+    def send_message(self, peer):
+        if not peer.online:
+            # El receptor está reconectando: el mensaje no se entregará en tiempo real
+            self.stats.count('messages_to_offline')
+            return
+        self.sequence += 1
+        tag = f'{self.index}-{self.sequence}'
+        self.stats.message_sent(tag)
+        if not self._emit('send_message', {'receiver_id': peer.user_id, 'message': f'load {tag}'}):
+            self.stats.message_not_sent(tag)
+
+    def send_typing(self, peer):
+        if not peer.online:
+            self.stats.count('typing_to_offline')
+            return
+        if self._emit('typing', {'receiver_id': peer.user_id, 'is_typing': True}):
+            self.stats.count('typing_sent')
+
+    def reconnect(self):
+        # Like a page reload: the new connection does not wait for the old one to close
+        self.disconnect(wait=False)
+        self.stats.count('reconnects')
+        self.connect()
+
+    def run(self, peers, deadline, rate, mix, rng):
+        """Perform actions at ``rate`` per second (Poisson arrivals) until ``deadline``"""
+        actions, weights = zip(*mix.items())
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(rng.expovariate(rate), remaining))
+            if time.monotonic() >= deadline:
+                return
+            if not self.online:
+                self.connect()
+                continue
+            action = rng.choices(actions, weights)[0]
+            if action == 'reconnect':
+                self.reconnect()
+                continue
+            peer = rng.choice(peers)
+            while peer is self:
+                peer = rng.choice(peers)
+            if action == 'message':
+                self.send_message(peer)
+            else:
+                self.send_typing(peer)
+
+
+class ServerResourceSampler(threading.Thread):
+    """Polls the server's /metrics for CPU, resident memory and connected clients"""
+
+    def __init__(self, server_url, token=None, interval=RESOURCE_SAMPLE_INTERVAL):
+        super().__init__(daemon=True)
+        self.url = server_url.rstrip('/') + '/metrics'
+        self.headers = {'Authorization': f'Bearer {token}'} if token else {}
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+        self.available = True
+
+    def scrape(self):
+        response = requests.get(self.url, headers=self.headers, timeout=5)
+        response.raise_for_status()
+        values = {}
+        for line in response.text.splitlines():
+            match = _METRIC_LINE.match(line)
+            if match:
+                values[match.group(1)] = float(match.group(2))
+        return {
+            'time': time.monotonic(),
+            'cpu_seconds': values.get('process_cpu_seconds_total'),
+            'rss_bytes': values.get('process_resident_memory_bytes'),
+            'clients': values.get('medsc_socketio_connected_clients')
+        }
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.samples.append(self.scrape())
+            except Exception as e:
+                if self.available:
+                    logger.error(f"Server metrics not available at {self.url}: {str(e)}")
+                self.available = False
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def summary(self):
+        samples = [sample for sample in self.samples if sample['cpu_seconds'] is not None]
+        if len(samples) < 2:
+            return {}
+        elapsed = samples[-1]['time'] - samples[0]['time']
+        cpu = samples[-1]['cpu_seconds'] - samples[0]['cpu_seconds']
+        rss = [sample['rss_bytes'] for sample in samples if sample['rss_bytes'] is not None]
+        clients = [sample['clients'] for sample in samples if sample['clients'] is not None]
+        return {
+            'cpu_percent_avg': round(cpu / elapsed * 100, 1) if elapsed else 0.0,
+            'rss_mb_start': round(rss[0] / 2 ** 20, 1) if rss else None,
+            'rss_mb_peak': round(max(rss) / 2 ** 20, 1) if rss else None,
+            'connected_clients_peak': max(clients) if clients else None
+        }
+
+
+def session_cookie(app, user_id):
+    """Session cookie for a simulated doctor (signed with the server's SECRET_KEY, or stored in its session store)"""
+    data = {
+        'autenticado': True, 'auth_provider': 'supabase', 'user_id': user_id,
+        'supabase_id': user_id, 'email': f'{user_id[:8]}@load.medsc'
+    }
+    interface = app.session_interface
+    if hasattr(interface, 'issue'):
+        value = interface.issue(app, data)
+    else:
+        value = interface.get_signing_serializer(app).dumps(data)
+    return f"{app.config['SESSION_COOKIE_NAME']}={value}"
+
+
+def run_load_test(app, server_url, doctors=50, duration=60, rate=1.0, mix=None, ramp=10,
+                  transport='websocket', origin='http://localhost:3000', metrics_token=None, seed=42):
+    """Connect ``doctors`` clients to a running server, drive the workload and return a report.
+
+    ``rate`` is the number of actions per doctor per second; ``mix`` maps
+    message/typing/reconnect to relative weights. ``origin`` must be one of the
+    server's CORS origins or the handshake is rejected.
+    """
+    mix = mix or {'message': 0.5, 'typing': 0.45, 'reconnect': 0.05}
+    stats = LoadStats()
+    sampler = ServerResourceSampler(server_url, metrics_token)
+    sampler.start()
+
+    simulated = []
+    for index in range(doctors):
+        user_id = str(uuid.UUID(int=random.Random(seed + index).getrandbits(128), version=4))
+        simulated.append(SimulatedDoctor(index, server_url, session_cookie(app, user_id), origin,
+                                         user_id, stats, transport))
+
+    # Conexión escalonada durante ``ramp`` segundos
+    for doctor in simulated:
+        doctor.connect()
+        time.sleep(ramp / max(doctors, 1))
+
+    load_started = time.monotonic()
+    deadline = load_started + duration
+    workers = [
+        threading.Thread(target=doctor.run, args=(simulated, deadline, rate, mix, random.Random(seed * 1000 + i)),
+                         daemon=True)
+        for i, doctor in enumerate(simulated)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - load_started
+
+    time.sleep(DRAIN_SECONDS)
+    for closer in [doctor.disconnect(wait=False) for doctor in simulated]:
+        if closer is not None:
+            closer.join()
+    sampler.stop()
+
+    counters = stats.counters
+    return {
+        'doctors': doctors,
+        'duration_s': round(elapsed, 1),
+        'messages_per_second': round(counters['messages_sent'] / elapsed, 1) if elapsed else 0.0,
+        'delivery': latency_summary(stats.delivery_latencies),
+        'connect': latency_summary(stats.connect_latencies),
+        'dropped_messages': len(stats.pending),
+        'counters': dict(sorted(counters.items())),
+        'server': sampler.summary()
+    }
+
+
+def format_report(report):
+    counters = report['counters']
+    delivery = report['delivery']
+    connect = report['connect']
+    server = report['server'] or {}
+    lines = [
+        f"Doctors: {report['doctors']}  duration: {report['duration_s']}s  "
+        f"messages/s: {report['messages_per_second']}",
+        f"Delivery latency ms  p50 {delivery['p50_ms']}  p90 {delivery['p90_ms']}  p95 {delivery['p95_ms']}  "
+        f"p99 {delivery['p99_ms']}  max {delivery['max_ms']}",
+        f"Connect latency ms   p50 {connect['p50_ms']}  p95 {connect['p95_ms']}  max {connect['max_ms']}",
+        f"Messages  sent {counters.get('messages_sent', 0)}  delivered {counters.get('messages_delivered', 0)}  "
+        f"dropped {report['dropped_messages']}  acked {counters.get('messages_acked', 0)}  "
+        f"errors {counters.get('message_errors', 0)}  to offline peers {counters.get('messages_to_offline', 0)}",
+        f"Typing    sent {counters.get('typing_sent', 0)}  received {counters.get('typing_received', 0)}  "
+        f"to offline peers {counters.get('typing_to_offline', 0)}",
+        f"Presence  reconnects {counters.get('reconnects', 0)}  connect failures {counters.get('connect_failures', 0)}  "
+        f"status events received {counters.get('presence_received', 0)}"
+    ]
+    if server:
+        lines.append(
+            f"Server    CPU avg {server['cpu_percent_avg']}%  RSS {server['rss_mb_start']} -> "
+            f"peak {server['rss_mb_peak']} MB  clients peak {server['connected_clients_peak']}"
+        )
+    else:
+        lines.append('Server    no /metrics samples (is the server exposing /metrics?)')
+    return '\n'.join(lines)
@@ -0,0 +1,42 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session, with_loader_criteria
+import os
+
+# Filtro global is_deleted=False en todas las consultas ORM; SOFT_DELETE_FILTER=false lo desactiva
+SOFT_DELETE_FILTER = os.environ.get('SOFT_DELETE_FILTER', 'true').lower() == 'true'
+
+_criteria = None
+
+
+def _soft_delete_criteria():
+    global _criteria
+    if _criteria is None:
+        from models.models_flask import SOFT_DELETE_MODELS
+        _criteria = [
+            with_loader_criteria(model, model.is_deleted == False, include_aliases=True)
+            for model in SOFT_DELETE_MODELS
+        ]
+    return _criteria
+
+
+def _add_soft_delete_criteria(execute_state):
+    """Hide soft-deleted rows from every ORM SELECT unless it opts out.
+
+    Opt out per statement with ``.execution_options(include_deleted=True)``. Lazy
+    loads inherit the criteria of the query that loaded the parent; column loads
+    (refresh of an expired object) are left alone so a row deleted in this
+    session can still be read back.
+    """
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get('include_deleted', False)
+    ):
+        execute_state.statement = execute_state.statement.options(*_soft_delete_criteria())
+
+
+def init_soft_delete(app):
+    """Apply the soft-delete filter to every Session (db.session and dedicated streaming sessions)"""
+    if SOFT_DELETE_FILTER and not event.contains(Session, 'do_orm_execute', _add_soft_delete_criteria):
+        event.listen(Session, 'do_orm_execute', _add_soft_delete_criteria)
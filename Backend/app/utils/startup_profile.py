@@ -0,0 +1,82 @@
+from collections import defaultdict
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+# Presupuesto de arranque en frío de un proceso (import de index.py, incluye create_app)
+STARTUP_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 1500))
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIRST_PARTY = ('app', 'index', 'config', 'routes', 'models', 'utils')
+
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+_PROBE = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print('startup_ms', (time.perf_counter() - started) * 1000)"
+)
+
+
+def parse_importtime(output):
+    """(module, depth, self_us, cumulative_us) rows of ``python -X importtime`` output"""
+    rows = []
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            rows.append((match.group(4), len(match.group(3)) // 2, int(match.group(1)), int(match.group(2))))
+    return rows
+
+
+def measure_once(module='index'):
+    """Start a fresh interpreter, import ``module`` and return (wall ms, importtime rows)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(module=module)],
+        cwd=APP_DIR, capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f'Startup probe failed:\n{result.stderr[-2000:]}')
+    wall_ms = float(result.stdout.strip().splitlines()[-1].split()[-1])
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def profile_startup(runs=5, module='index', top=15):
+    """Cold-start wall times over ``runs`` processes and the import profile of the last one"""
+    walls = []
+    rows = []
+    for _ in range(runs):
+        wall_ms, rows = measure_once(module)
+        walls.append(wall_ms)
+
+    # Tiempo propio agregado por paquete de primer nivel
+    by_package = defaultdict(int)
+    for name, _, self_us, _ in rows:
+        by_package[name.split('.')[0]] += self_us
+    first_party = [(name, cumulative / 1000) for name, _, _, cumulative in rows
+                   if name.split('.')[0] in FIRST_PARTY]
+
+    return {
+        'runs': runs,
+        'median_ms': round(statistics.median(walls), 1),
+        'max_ms': round(max(walls), 1),
+        'budget_ms': STARTUP_BUDGET_MS,
+        'import_ms': round(sum(cumulative for _, depth, _, cumulative in rows if depth == 0) / 1000, 1),
+        'packages': [(name, round(us / 1000, 1)) for name, us in
+                     sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]],
+        'first_party': [(name, round(ms, 1)) for name, ms in
+                        sorted(first_party, key=lambda item: item[1], reverse=True)[:top]]
+    }
+
+
+def format_profile(report):
+    status = 'OK' if report['median_ms'] <= report['budget_ms'] else 'OVER BUDGET'
+    lines = [
+        f"Cold start ({report['runs']} runs): median {report['median_ms']} ms  max {report['max_ms']} ms  "
+        f"budget {report['budget_ms']:.0f} ms  [{status}]",
+        f"Imports: {report['import_ms']} ms (the rest is create_app and module-level work)",
+        '',
+        'Self time by package (ms)'
+    ]
+    lines += [f"  {name:<30}{ms:>10.1f}" for name, ms in report['packages']]
+    lines += ['', 'First-party modules, cumulative (ms)']
+    lines += [f"  {name:<30}{ms:>10.1f}" for name, ms in report['first_party']]
+    return '\n'.join(lines)
@@ -0,0 +1,92 @@
+from utils.db import db
+from utils.replica import read_engine
+from utils.compression import COMPRESS_RESPONSES
+from flask import request, jsonify, Response, stream_with_context
+from sqlalchemy.orm import Session
+import itertools
+import zlib
+
+# Filas leídas por lote desde el cursor del servidor
+STREAM_BATCH_SIZE = 500
+# Tamaño aproximado (caracteres) de cada fragmento de JSON enviado
+JSON_CHUNK_SIZE = 64 * 1024
+
+
+def gzip_stream(chunks, level=6):
+    """Compress an iterable of text chunks into a gzip byte stream, incrementally"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_partitions(stmt, batch_size=STREAM_BATCH_SIZE):
+    """Run a select through a server-side cursor (yield_per) and yield batches of rows.
+
+    The cursor lives on a dedicated session/connection, so db.session stays
+    free for per-batch queries while the result is still being read. In
+    @replica_reads views that connection goes to the replica.
+    """
+    stream_session = Session(read_engine())
+    try:
+        result = stream_session.execute(stmt.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        stream_session.close()
+
+
+def iter_json_array(items, dumps, chunk_size=JSON_CHUNK_SIZE):
+    """Encode an iterable as a JSON array, yielding text chunks of about ``chunk_size``"""
+    buffer = ['[']
+    size = 1
+    separator = ''
+    for item in items:
+        text = dumps(item)
+        buffer.append(separator)
+        buffer.append(text)
+        separator = ','
+        size += len(text) + 1
+        if size >= chunk_size:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    buffer.append(']')
+    yield ''.join(buffer)
+
+
+def _prefetch(chunks, size=JSON_CHUNK_SIZE):
+    """Produce the first ``size`` characters now, before the status line and headers are sent"""
+    chunks = iter(chunks)
+    head = []
+    produced = 0
+    for chunk in chunks:
+        head.append(chunk)
+        produced += len(chunk)
+        if produced >= size:
+            break
+    return itertools.chain(head, chunks)
+
+
+def json_stream_response(chunks, error_message='Error al generar la respuesta'):
+    """Stream JSON text chunks, gzip-compressed on the fly when the client accepts it.
+
+    The first JSON_CHUNK_SIZE characters are produced before responding, so a
+    failure there (the whole body, for most lists) becomes a plain 500 without
+    validators. Later failures must propagate out of ``chunks``: the server then
+    drops the connection without the final chunk and the client never takes the
+    truncated body as complete.
+    """
+    try:
+        chunks = _prefetch(chunks)
+    except Exception:
+        return jsonify({'success': False, 'error': error_message}), 500
+    if COMPRESS_RESPONSES and request.accept_encodings['gzip']:
+        response = Response(stream_with_context(gzip_stream(chunks)), mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = Response(stream_with_context(chunks), mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,257 @@
+from utils.db import db
+from models.models_flask import (
+    Patient, Doctor, Attention, Allergy, EmergencyContact, PreExistingCondition, FamilyBackground,
+    Diagnostic, Treatment, Laboratory, Imaging, Histopathology, RegionalPhysicalExamination,
+    ReviewOrgansSystem, ChatMessage, precise_now
+)
+from sqlalchemy import insert, func, event, select
+from datetime import date, datetime, timedelta
+import random
+import uuid
+
+GENERATED_BY = 'synthetic'
+INSERT_CHUNK_SIZE = 5000
+
+FIRST_NAMES = ['María', 'José', 'Ana', 'Luis', 'Carmen', 'Carlos', 'Rosa', 'Jorge', 'Lucía', 'Pedro',
+               'Elena', 'Miguel', 'Sofía', 'Andrés', 'Valeria', 'Diego', 'Gabriela', 'Fernando']
+LAST_NAMES = ['García', 'Rodríguez', 'López', 'Martínez', 'Pérez', 'Sánchez', 'Ramírez', 'Torres',
+              'Flores', 'Vásquez', 'Castillo', 'Morales', 'Herrera', 'Mendoza', 'Guerrero', 'Vera']
+CITIES = ['Quito', 'Guayaquil', 'Cuenca', 'Loja', 'Ambato', 'Manta', 'Riobamba', 'Ibarra']
+SPECIALITIES = ['Medicina General', 'Pediatría', 'Cardiología', 'Dermatología', 'Ginecología', 'Traumatología']
+ALLERGIES = ['Penicilina', 'Polen', 'Mariscos', 'Látex', 'Ácaros', 'Ibuprofeno', 'Lactosa']
+CONDITIONS = ['Hipertensión', 'Diabetes tipo 2', 'Asma', 'Hipotiroidismo', 'Migraña', 'Gastritis']
+DISEASES = [('J06.9', 'Infección aguda de las vías respiratorias superiores'), ('I10', 'Hipertensión esencial'),
+            ('E11.9', 'Diabetes mellitus tipo 2'), ('K29.7', 'Gastritis'), ('M54.5', 'Lumbago'),
+            ('J45.9', 'Asma'), ('N39.0', 'Infección de vías urinarias'), ('R51', 'Cefalea')]
+MEDICAMENTS = ['Paracetamol', 'Ibuprofeno', 'Amoxicilina', 'Losartán', 'Metformina', 'Omeprazol', 'Salbutamol']
+REASONS = ['Dolor de cabeza', 'Fiebre', 'Control de presión', 'Dolor abdominal', 'Tos persistente',
+           'Control de glucosa', 'Dolor lumbar', 'Chequeo general']
+EXAMS = [('Hematología', 'Biometría hemática'), ('Química', 'Glucosa en ayunas'), ('Química', 'Perfil lipídico'),
+         ('Orina', 'Elemental y microscópico de orina')]
+REGIONS = ['Cabeza', 'Cuello', 'Tórax', 'Abdomen', 'Extremidades']
+SYSTEMS = ['Cardiovascular', 'Respiratorio', 'Digestivo', 'Nervioso', 'Genitourinario']
+
+
+def enable_sqlite_collations(engine):
+    """Register the MySQL collations used by the models so SQLite can create and query the tables"""
+    if engine.dialect.name != 'sqlite':
+        return
+
+    def compare(a, b):
+        return (a > b) - (a < b)
+
+    @event.listens_for(engine, 'connect')
+    def _register(dbapi_connection, connection_record):
+        dbapi_connection.create_collation('utf8mb4_general_ci', compare)
+        dbapi_connection.create_collation('utf8mb4_0900_ai_ci', compare)
+
+    # Connections opened before the listener need to be replaced
+    engine.dispose()
+
+
+def _audit(now):
+    return {'created_by': GENERATED_BY, 'updated_by': GENERATED_BY,
+            'created_at': now, 'updated_at': now, 'is_deleted': False}
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+class _ChunkedInserter:
+    """Buffers rows per table and writes them with one executemany per chunk.
+
+    All buffers are flushed together, parents first (tables are written in the
+    order they were first seen), so child rows never reference missing ids.
+    """
+
+    def __init__(self, chunk_size):
+        self.chunk_size = chunk_size
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, model, row):
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        for model, rows in self.buffers.items():
+            if rows:
+                db.session.execute(insert(model.__table__), rows)
+                self.counts[model.__tablename__] = self.counts.get(model.__tablename__, 0) + len(rows)
+                self.buffers[model] = []
+        db.session.commit()
+
+
+def _person_name(rng):
+    return rng.choice(FIRST_NAMES), rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rng.choice(LAST_NAMES)
+
+
+def generate_doctors(rng, count, writer, now, audited_at=None):
+    """Insert doctors and return their (id, supabase_id) pairs"""
+    first_id = _next_id(Doctor)
+    doctors = []
+    for offset in range(count):
+        doctor_id = first_id + offset
+        supabase_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        first, middle, last1, last2 = _person_name(rng)
+        writer.add(Doctor, {
+            'id': doctor_id, 'identifierCode': f'SYN-D{doctor_id:06d}', 'supabase_id': supabase_id,
+            'firstName': first, 'middleName': middle, 'lastName1': last1, 'lastName2': last2,
+            'phoneNumber': f'09{rng.randint(10000000, 99999999)}', 'address': rng.choice(CITIES),
+            'gender': rng.choice(['Masculino', 'Femenino']), 'sex': rng.choice(['Masculino', 'Femenino']),
+            'speciality': rng.choice(SPECIALITIES), 'email': f'doctor{doctor_id}@synthetic.medsc',
+            'role': 'medico', 'status': 'active', **_audit(audited_at or now)
+        })
+        doctors.append((doctor_id, supabase_id))
+    writer.flush()
+    return doctors
+
+
+def generate_patients(rng, count, writer, now, audited_at=None):
+    """Insert patients with allergies, contacts, conditions and family history; return the patient id range"""
+    first_id = _next_id(Patient)
+    audit = _audit(audited_at or now)
+    for offset in range(count):
+        patient_id = first_id + offset
+        first, middle, last1, last2 = _person_name(rng)
+        writer.add(Patient, {
+            'id': patient_id, 'identifierType': 'Cedula', 'identifierCode': f'SYN{patient_id:010d}',
+            'firstName': first, 'middleName': middle, 'lastName1': last1, 'lastName2': last2,
+            'nationality': 'Ecuatoriana', 'address': f'{rng.choice(CITIES)}, calle {rng.randint(1, 300)}',
+            'phoneNumber': f'09{rng.randint(10000000, 99999999)}',
+            'birthdate': date(1940, 1, 1) + timedelta(days=rng.randint(0, 30000)),
+            'gender': rng.choice(['Masculino', 'Femenino', 'Otro']), 'sex': rng.choice(['Masculino', 'Femenino']),
+            'civilStatus': rng.choice(['Soltero/a', 'Casado/a', 'Divorciado/a', 'Viudo/a']),
+            'job': 'Empleado', 'bloodType': rng.choice(['A+', 'A-', 'B+', 'O+', 'O-', 'AB+']),
+            'email': f'paciente{patient_id}@synthetic.medsc', **audit
+        })
+        for _ in range(rng.randint(0, 2)):
+            writer.add(Allergy, {'allergies': rng.choice(ALLERGIES), 'idPatient': patient_id, **audit})
+        for _ in range(rng.randint(1, 2)):
+            contact_first, _, contact_last, _ = _person_name(rng)
+            writer.add(EmergencyContact, {
+                'firstName': contact_first, 'lastName': contact_last, 'address': rng.choice(CITIES),
+                'relationship': rng.choice(['Madre', 'Padre', 'Cónyuge', 'Hijo/a']),
+                'phoneNumber1': f'09{rng.randint(10000000, 99999999)}', 'phoneNumber2': None,
+                'idPatient': patient_id, **audit
+            })
+        for _ in range(rng.randint(0, 3)):
+            writer.add(PreExistingCondition, {
+                'diseaseName': rng.choice(CONDITIONS), 'time': date(2000, 1, 1) + timedelta(days=rng.randint(0, 9000)),
+                'medicament': rng.choice(MEDICAMENTS), 'treatment': 'Tratamiento continuo',
+                'idPatient': patient_id, **audit
+            })
+        for _ in range(rng.randint(0, 2)):
+            writer.add(FamilyBackground, {
+                'familyBackground': rng.choice(CONDITIONS), 'degreeRelationship': rng.choice(['1', '2', '3', '4']),
+                'time': date(1990, 1, 1) + timedelta(days=rng.randint(0, 12000)), 'idPatient': patient_id, **audit
+            })
+    writer.flush()
+    return first_id, first_id + count - 1
+
+
+def generate_attentions(rng, count, patient_range, doctors, writer, now, days=730, audited_at=None):
+    """Insert attentions spread over the last ``days`` days with their clinical child rows"""
+    first_id = _next_id(Attention)
+    audit = _audit(audited_at or now)
+    for offset in range(count):
+        attention_id = first_id + offset
+        code, disease = rng.choice(DISEASES)
+        writer.add(Attention, {
+            'id': attention_id,
+            'date': now - timedelta(days=rng.randint(0, days), minutes=rng.randint(0, 600)),
+            'weight': round(rng.uniform(45, 110), 2), 'height': round(rng.uniform(1.45, 1.95), 2),
+            'temperature': round(rng.uniform(36.0, 39.5), 1),
+            'systolicPressure': rng.randint(105, 160), 'diastolicPressure': rng.randint(60, 100),
+            'heartRate': rng.randint(55, 120), 'oxygenSaturation': rng.randint(90, 100),
+            'breathingFrequency': rng.randint(12, 24), 'glucose': round(rng.uniform(70, 220), 1),
+            'hemoglobin': round(rng.uniform(10, 17), 1), 'reasonConsultation': rng.choice(REASONS),
+            'currentIllness': f'Cuadro de {rng.randint(1, 15)} días de evolución', 'evolution': 'Favorable',
+            'idPatient': rng.randint(*patient_range), 'idDoctor': rng.choice(doctors)[0], **audit
+        })
+        for _ in range(rng.randint(1, 3)):
+            writer.add(Diagnostic, {
+                'cie10Code': code, 'disease': disease, 'observations': 'Sin complicaciones',
+                'diagnosticCondition': rng.choice(['Presuntivo', 'Definitivo']),
+                'chronology': rng.choice(['Primera vez', 'Subsecuente']), 'idAttention': attention_id, **audit
+            })
+        for _ in range(rng.randint(0, 3)):
+            writer.add(Treatment, {
+                'medicament': rng.choice(MEDICAMENTS), 'via': 'Oral', 'dosage': f'{rng.choice([250, 500, 1000])}',
+                'unity': 'mg', 'frequency': f'Cada {rng.choice([6, 8, 12, 24])} horas',
+                'indications': f'Por {rng.randint(3, 10)} días', 'warning': None, 'idAttention': attention_id, **audit
+            })
+        for _ in range(rng.randint(0, 2)):
+            type_exam, exam = rng.choice(EXAMS)
+            writer.add(Laboratory, {'typeExam': type_exam, 'exam': exam, 'idAttention': attention_id, **audit})
+        for _ in range(rng.randint(0, 2)):
+            writer.add(RegionalPhysicalExamination, {
+                'typeExamination': rng.choice(REGIONS), 'examination': 'Sin alteraciones',
+                'idAttention': attention_id, **audit
+            })
+        for _ in range(rng.randint(0, 2)):
+            writer.add(ReviewOrgansSystem, {
+                'typeReview': rng.choice(SYSTEMS), 'review': 'Sin alteraciones', 'idAttention': attention_id, **audit
+            })
+        if rng.random() < 0.15:
+            writer.add(Imaging, {
+                'typeImaging': rng.choice(['Rayos X', 'Ecografía']), 'imaging': 'Estudio sin hallazgos patológicos',
+                'idAttention': attention_id, **audit
+            })
+        if rng.random() < 0.03:
+            writer.add(Histopathology, {
+                'histopathology': 'Tejido sin atipias', 'idAttention': attention_id, **audit
+            })
+    writer.flush()
+
+
+def generate_messages(rng, count, doctors, writer, now):
+    """Insert chat messages between doctor pairs, most of them already read"""
+    if len(doctors) < 2:
+        return
+    started = now - timedelta(seconds=count)
+    for offset in range(count):
+        (sender_id, sender_uuid), (receiver_id, receiver_uuid) = rng.sample(doctors, 2)
+        timestamp = started + timedelta(seconds=offset)
+        writer.add(ChatMessage, {
+            'sender_id': sender_id, 'receiver_id': receiver_id,
+            'sender_supabase_id': sender_uuid, 'sender_type': 'medico',
+            'receiver_supabase_id': receiver_uuid, 'receiver_type': 'medico',
+            'message': f'Mensaje de prueba {offset}', 'timestamp': timestamp,
+            'is_read': rng.random() < 0.9, 'created_by': sender_uuid
+        })
+    writer.flush()
+
+
+def generate_dataset(patients=1000, attentions=10000, messages=50000, doctors=50, seed=42,
+                     chunk_size=INSERT_CHUNK_SIZE, reference_date=None, progress=None):
+    """Populate the database with reproducible synthetic data.
+
+    The same seed and reference date on an empty database always produce the
+    same rows (except the audit stamps, taken from the database clock when the
+    reference time is later); attention dates are spread over the two years
+    before the reference date (today by default). Must run inside an
+    application context.
+    Returns the number of rows written per table.
+    """
+    rng = random.Random(seed)
+    now = datetime.combine(reference_date or date.today(), datetime.min.time()) + timedelta(hours=12)
+    # created_at/updated_at never in the future (database clock, like onupdate): real edits made
+    # after seeding must raise max(updated_at), or conditional GETs keep answering 304
+    audited_at = min(now, db.session.execute(select(precise_now())).scalar())
+    writer = _ChunkedInserter(chunk_size)
+    report = progress or (lambda message: None)
+
+    doctor_rows = generate_doctors(rng, doctors, writer, now, audited_at=audited_at)
+    report(f'{doctors} doctors')
+    patient_range = generate_patients(rng, patients, writer, now, audited_at=audited_at)
+    report(f'{patients} patients')
+    if patients:
+        generate_attentions(rng, attentions, patient_range, doctor_rows, writer, now, audited_at=audited_at)
+        report(f'{attentions} attentions')
+    generate_messages(rng, messages, doctor_rows, writer, now)
+    report(f'{messages} chat messages')
+    return writer.counts
@@ -0,0 +1,195 @@
+from flask import request, session, g
+from collections import OrderedDict
+from dotenv import load_dotenv
+import hashlib
+import jwt
+import logging
+import os
+import threading
+import time
+
+load_dotenv(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), '.env'))
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_URL = os.environ.get('SUPABASE_URL', 'https://vdhbgtgbxszzheftvaga.supabase.co').rstrip('/')
+# Proyectos con clave simétrica (HS256): Settings > API > JWT Secret
+SUPABASE_JWT_SECRET = os.environ.get('SUPABASE_JWT_SECRET')
+SUPABASE_JWT_AUDIENCE = os.environ.get('SUPABASE_JWT_AUDIENCE', 'authenticated')
+SUPABASE_JWT_ISSUER = os.environ.get('SUPABASE_JWT_ISSUER', f'{SUPABASE_URL}/auth/v1')
+# Claves asimétricas (RS256/ES256) publicadas por Supabase; se cachean JWKS_CACHE_SECONDS
+SUPABASE_JWKS_URL = os.environ.get('SUPABASE_JWKS_URL', f'{SUPABASE_URL}/auth/v1/.well-known/jwks.json')
+JWKS_CACHE_SECONDS = int(os.environ.get('JWKS_CACHE_SECONDS', 600))
+JWT_LEEWAY_SECONDS = int(os.environ.get('JWT_LEEWAY_SECONDS', 30))
+TOKEN_CACHE_SIZE = int(os.environ.get('TOKEN_CACHE_SIZE', 1024))
+# Sin modo estricto se sigue aceptando cualquier Authorization que no sea un JWT (p. ej. "Bearer demo-token")
+STRICT_TOKEN_AUTH = os.environ.get('STRICT_TOKEN_AUTH', 'false').lower() == 'true'
+
+ASYMMETRIC_ALGORITHMS = ('RS256', 'ES256')
+
+
+class TokenError(Exception):
+    """The bearer token is malformed, expired or not signed by Supabase"""
+
+
+class ClaimsCache:
+    """LRU of verified claims keyed by the SHA-256 of the token, valid until the token expires"""
+
+    def __init__(self, size=TOKEN_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            claims = self._entries.get(key)
+            if claims is None:
+                return None
+            if claims['exp'] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return claims
+
+    def set(self, key, claims):
+        with self._lock:
+            self._entries[key] = claims
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+claims_cache = ClaimsCache()
+_jwks_client = None
+_jwks_lock = threading.Lock()
+
+
+def _jwks():
+    global _jwks_client
+    if _jwks_client is None:
+        with _jwks_lock:
+            if _jwks_client is None:
+                headers = {'apikey': os.environ.get('SUPABASE_KEY', '')}
+                _jwks_client = jwt.PyJWKClient(SUPABASE_JWKS_URL, cache_keys=True, lifespan=JWKS_CACHE_SECONDS,
+                                               headers=headers, timeout=5)
+    return _jwks_client
+
+
+def _signing_key(token):
+    try:
+        algorithm = jwt.get_unverified_header(token).get('alg')
+    except jwt.PyJWTError as e:
+        raise TokenError(f'Malformed token: {str(e)}') from e
+
+    if algorithm == 'HS256':
+        if not SUPABASE_JWT_SECRET:
+            raise TokenError('HS256 token but SUPABASE_JWT_SECRET is not configured')
+        return SUPABASE_JWT_SECRET, algorithm
+    if algorithm in ASYMMETRIC_ALGORITHMS:
+        try:
+            return _jwks().get_signing_key_from_jwt(token).key, algorithm
+        except jwt.PyJWTError as e:
+            raise TokenError(f'Signing key not available: {str(e)}') from e
+    raise TokenError(f'Unsupported token algorithm: {algorithm}')
+
+
+def verify_token(token):
+    """Verify a Supabase access token locally and return its claims.
+
+    Signature, expiry, audience and issuer are checked without calling
+    Supabase; JWKS keys are fetched once and cached. Raises TokenError.
+    """
+    key = ClaimsCache.key(token)
+    claims = claims_cache.get(key)
+    if claims is not None:
+        return claims
+
+    signing_key, algorithm = _signing_key(token)
+    try:
+        claims = jwt.decode(
+            token, signing_key, algorithms=[algorithm], audience=SUPABASE_JWT_AUDIENCE,
+            issuer=SUPABASE_JWT_ISSUER or None, leeway=JWT_LEEWAY_SECONDS,
+            options={'require': ['exp', 'sub'], 'verify_iss': bool(SUPABASE_JWT_ISSUER)}
+        )
+    except jwt.PyJWTError as e:
+        raise TokenError(str(e)) from e
+
+    claims_cache.set(key, claims)
+    return claims
+
+
+def bearer_token():
+    """Access token from the Authorization header, or None"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return token.strip()
+
+
+def looks_like_jwt(token):
+    return token.count('.') == 2
+
+
+def current_claims():
+    """Verified claims of this request's bearer token, or None"""
+    return g.get('auth_claims')
+
+
+def _authenticate_bearer():
+    # La sesión de cookie tiene prioridad: no se vuelve a verificar nada
+    if session.get('autenticado'):
+        return
+    token = bearer_token()
+    if not token or not looks_like_jwt(token):
+        return
+    try:
+        claims = verify_token(token)
+    except TokenError as e:
+        logger.warning(f"Rejected bearer token on {request.path}: {str(e)}")
+        g.auth_error = str(e)
+        return
+
+    g.auth_claims = claims
+    # Identidad solo para esta petición; TokenSessionInterface no la guarda en la cookie
+    session['autenticado'] = True
+    session['auth_provider'] = 'supabase'
+    session['user_id'] = claims['sub']
+    session['supabase_id'] = claims['sub']
+    session['email'] = claims.get('email')
+
+
+class TokenSessionInterface:
+    """Wraps the app's session interface so token-authenticated requests never write a session cookie"""
+
+    def __init__(self, wrapped):
+        self.wrapped = wrapped
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped, name)
+
+    def open_session(self, app, request):
+        return self.wrapped.open_session(app, request)
+
+    def save_session(self, app, session, response):
+        if g.get('auth_claims') is not None:
+            return
+        self.wrapped.save_session(app, session, response)
+
+
+def init_token_auth(app):
+    """Accept Supabase bearer tokens (stateless) alongside the cookie session"""
+    if not isinstance(app.session_interface, TokenSessionInterface):
+        app.session_interface = TokenSessionInterface(app.session_interface)
+    app.before_request(_authenticate_bearer)
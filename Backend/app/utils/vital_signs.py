@@ -0,0 +1,90 @@
+import re
+
+# columna de Attention -> (claves aceptadas en el request, tipo, decimales, mínimo, máximo, nombre)
+# Los alias snake_case son los que envía el frontend (VitalSignsModal)
+VITAL_SIGN_FIELDS = {
+    'weight':             (('weight',), float, 2, 0.5, 500, 'Peso'),
+    'height':             (('height',), float, 2, 0.2, 250, 'Talla'),
+    'temperature':        (('temperature',), float, 1, 25, 45, 'Temperatura'),
+    'systolicPressure':   (('systolicPressure', 'blood_pressure_systolic'), int, 0, 40, 300, 'Presión sistólica'),
+    'diastolicPressure':  (('diastolicPressure', 'blood_pressure_diastolic'), int, 0, 20, 200, 'Presión diastólica'),
+    'heartRate':          (('heartRate', 'heart_rate'), int, 0, 20, 300, 'Frecuencia cardíaca'),
+    'oxygenSaturation':   (('oxygenSaturation', 'oxygen_saturation'), int, 0, 50, 100, 'Saturación de oxígeno'),
+    'breathingFrequency': (('breathingFrequency', 'breathing_frequency', 'respiratory_rate'), int, 0, 4, 80,
+                           'Frecuencia respiratoria'),
+    'glucose':            (('glucose',), float, 1, 10, 1500, 'Glucosa'),
+    'hemoglobin':         (('hemoglobin',), float, 1, 2, 25, 'Hemoglobina')
+}
+
+_BLOOD_PRESSURE = re.compile(r'^\s*(\d{2,3})\s*/\s*(\d{2,3})\s*(?:mm\s*hg)?\s*$', re.IGNORECASE)
+
+
+def parse_blood_pressure(text):
+    """'120/80' (optionally with mmHg) -> (120, 80); None when it does not match"""
+    match = _BLOOD_PRESSURE.match(str(text)) if text else None
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def _first(data, keys):
+    for key in keys:
+        value = data.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _number(value, kind, places):
+    if isinstance(value, str):
+        value = value.strip().replace(',', '.')
+    number = float(value)
+    if number != number or number in (float('inf'), float('-inf')):
+        raise ValueError(value)
+    return int(round(number)) if kind is int else round(number, places)
+
+
+def parse_vital_signs(data):
+    """Convert and validate every vital sign of a request in one pass.
+
+    Returns ``(values, errors)``: values keyed by Attention column, with
+    native ints/floats rounded to the column scale (missing, empty or zero
+    values are None), and a list of Spanish error messages. Blood pressure
+    comes as systolic/diastolic or as a "120/80" ``bloodPressure`` string.
+    """
+    values = {}
+    errors = []
+    pressure = {}
+    if (_first(data, VITAL_SIGN_FIELDS['systolicPressure'][0]) is None
+            and _first(data, VITAL_SIGN_FIELDS['diastolicPressure'][0]) is None and data.get('bloodPressure')):
+        parsed = parse_blood_pressure(data.get('bloodPressure'))
+        if parsed is None:
+            errors.append('Presión arterial: use el formato sistólica/diastólica (p. ej. 120/80)')
+        else:
+            pressure = {'systolicPressure': parsed[0], 'diastolicPressure': parsed[1]}
+
+    for column, (keys, kind, places, low, high, label) in VITAL_SIGN_FIELDS.items():
+        raw = pressure[column] if column in pressure else _first(data, keys)
+        try:
+            value = _number(raw, kind, places) if raw is not None else None
+        except (TypeError, ValueError):
+            errors.append(f'{label}: valor no numérico ({raw})')
+            value = None
+        if not value:
+            value = None  # 0 = no registrado, como hasta ahora
+        elif not low <= value <= high:
+            errors.append(f'{label}: fuera de rango ({low}-{high})')
+            value = None
+        values[column] = value
+
+    systolic, diastolic = values['systolicPressure'], values['diastolicPressure']
+    if (systolic is None) != (diastolic is None):
+        errors.append('Presión arterial: indique sistólica y diastólica')
+    elif systolic is not None and systolic <= diastolic:
+        errors.append('Presión arterial: la sistólica debe ser mayor que la diastólica')
+    return values, errors
+
+
+def format_blood_pressure(systolic, diastolic):
+    """(120, 80) -> '120/80'; None when either value is missing"""
+    if systolic is None or diastolic is None:
+        return None
+    return f'{systolic}/{diastolic}'